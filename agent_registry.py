@@ -0,0 +1,108 @@
+# agent_registry.py - Lazily built ADK agents
+# Agents are declared up front as specs but google.adk is only imported, and an
+# LlmAgent only constructed, the first time that agent is looked up. Tools-only
+# mode never touches ADK at all, for batch jobs that just run the analytics.
+
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence
+
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+
+# Set to 1 to run every orchestrator without ADK
+TOOLS_ONLY_ENV = "ADK_TOOLS_ONLY"
+
+
+def tools_only_default() -> bool:
+    return os.environ.get(TOOLS_ONLY_ENV, "").lower() in ("1", "true", "yes")
+
+
+class AgentsDisabledError(RuntimeError):
+    """An ADK agent was requested from a tools-only registry"""
+
+
+class AgentSpec:
+    """Everything needed to build one LlmAgent later"""
+
+    __slots__ = ("name", "model", "instruction", "tools")
+
+    def __init__(self, name: str, model: str, instruction: str, tools: Sequence[Callable]):
+        self.name = name
+        self.model = model
+        self.instruction = instruction
+        self.tools = list(tools)
+
+
+class AgentRegistry(Mapping):
+    """Read-only mapping of role -> LlmAgent, building each agent on first access
+
+    Iteration, ``len()`` and ``in`` only consult the specs, so listing roles
+    never imports ADK. Model callbacks are created once, with the first agent,
+    and ``on_first_build`` is called once that agent exists.
+    """
+
+    def __init__(self, specs: Dict[str, AgentSpec], tools_only: bool = False,
+                 callbacks: Optional[Callable[[], tuple]] = None,
+                 on_first_build: Optional[Callable[["AgentRegistry"], None]] = None):
+        self.specs = dict(specs)
+        self.tools_only = tools_only
+        self._callbacks_factory = callbacks
+        self._on_first_build = on_first_build
+        self._callbacks: Optional[tuple] = None
+        self._agents: Dict[str, "LlmAgent"] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, role: str) -> "LlmAgent":
+        agent = self._agents.get(role)
+        if agent is not None:
+            return agent
+        spec = self.specs[role]
+        if self.tools_only:
+            raise AgentsDisabledError(f"ADK agent {role!r} is unavailable in tools-only mode")
+        with self._lock:
+            agent = self._agents.get(role)
+            if agent is None:
+                first = not self._agents
+                agent = self._agents[role] = self._build(spec)
+                if first and self._on_first_build is not None:
+                    self._on_first_build(self)
+        return agent
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.specs)
+
+    def __len__(self) -> int:
+        return len(self.specs)
+
+    def __contains__(self, role: Any) -> bool:
+        return role in self.specs
+
+    @property
+    def built(self) -> List[str]:
+        """Roles whose agents have been constructed so far"""
+        return [role for role in self.specs if role in self._agents]
+
+    def build_all(self) -> Dict[str, "LlmAgent"]:
+        return {role: self[role] for role in self.specs}
+
+    def _build(self, spec: AgentSpec) -> "LlmAgent":
+        from google.adk.agents import LlmAgent
+
+        if self._callbacks is None:
+            self._callbacks = self._callbacks_factory() if self._callbacks_factory else (None, None)
+        before_model, after_model, *on_error = self._callbacks
+        extra = {}
+        # on_model_error_callback only exists in newer ADK releases
+        supports_errors = "on_model_error_callback" in getattr(LlmAgent, "model_fields", {})
+        if on_error and on_error[0] is not None and supports_errors:
+            extra["on_model_error_callback"] = on_error[0]
+        return LlmAgent(
+            name=spec.name,
+            model=spec.model,
+            instruction=spec.instruction,
+            tools=spec.tools,
+            before_model_callback=before_model,
+            after_model_callback=after_model,
+            **extra
+        )
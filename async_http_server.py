@@ -0,0 +1,217 @@
+# async_http_server.py - Minimal asyncio HTTP/1.1 server for the live data API
+# Supports keep-alive, pipelined requests (answered in order on each connection)
+# and streamed bodies via chunked transfer encoding. GET/HEAD only.
+
+import asyncio
+import logging
+import signal
+import socket
+from http import HTTPStatus
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+
+MAX_HEADER_BYTES = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class HTTPRequest:
+    """A parsed request line plus lower-cased headers"""
+
+    __slots__ = ("method", "target", "path", "query", "version", "headers")
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str]):
+        url = urlparse(target)
+        self.method = method
+        self.target = target
+        self.path = url.path
+        self.query = parse_qs(url.query)
+        self.version = version
+        self.headers = headers
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+
+class HTTPResponse:
+    """Status, headers and either a complete body or an async iterator of chunks"""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int = 200, headers: Optional[List[Tuple[str, str]]] = None,
+                 body: Union[bytes, AsyncIterator[bytes]] = b""):
+        self.status = status
+        self.headers = headers or []
+        self.body = body
+
+
+Handler = Callable[[HTTPRequest], Awaitable[HTTPResponse]]
+
+
+class AsyncHTTPServer:
+    """Serves one handler coroutine over keep-alive HTTP/1.1 connections"""
+
+    def __init__(self, handler: Handler, host: str = "", port: int = 8080,
+                 keepalive_timeout: float = 15.0, sock: Optional[socket.socket] = None):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.keepalive_timeout = keepalive_timeout
+        self.sock = sock
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._idle: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def start(self):
+        if self.sock is not None:
+            self._server = await asyncio.start_server(self._serve_connection, sock=self.sock,
+                                                      limit=MAX_HEADER_BYTES)
+        else:
+            self._server = await asyncio.start_server(self._serve_connection, self.host, self.port,
+                                                      limit=MAX_HEADER_BYTES, reuse_address=True)
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def serve_until_signal(self, signals=(signal.SIGTERM, signal.SIGINT),
+                                 drain_timeout: float = 10.0):
+        """Serve until one of `signals` arrives, then drain gracefully"""
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in signals:
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            for sig in signals:
+                loop.remove_signal_handler(sig)
+            await self.shutdown(drain_timeout)
+
+    async def shutdown(self, drain_timeout: float = 10.0):
+        """Stop accepting, close idle keep-alive connections and drain in-flight requests"""
+        if self._server is not None:
+            self._server.close()
+        # Closing an idle connection's transport ends its pending read cleanly
+        for writer in list(self._idle.values()):
+            writer.close()
+        if self._connections:
+            _, unfinished = await asyncio.wait(list(self._connections), timeout=drain_timeout)
+            for task in unfinished:
+                task.cancel()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[HTTPRequest]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keepalive_timeout)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise ValueError("Request header too large")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise ValueError("Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        # Bodies are not used by any route but must be consumed to keep the stream aligned
+        length = int(headers.get("content-length", "0") or 0)
+        if length:
+            await reader.readexactly(length)
+        return HTTPRequest(method, target, version, headers)
+
+    async def _write_response(self, writer: asyncio.StreamWriter, request: HTTPRequest,
+                              response: HTTPResponse, keep_alive: bool):
+        streaming = not isinstance(response.body, (bytes, bytearray))
+        chunked = streaming and request.version == "HTTP/1.1"
+        if streaming and not chunked:
+            keep_alive = False
+
+        head = [f"HTTP/1.1 {response.status} {HTTPStatus(response.status).phrase}"]
+        head.extend(f"{name}: {value}" for name, value in response.headers)
+        if chunked:
+            head.append("Transfer-Encoding: chunked")
+        elif not streaming and response.status not in (204, 304):
+            head.append(f"Content-Length: {len(response.body)}")
+        head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+
+        if not streaming:
+            if request.method != "HEAD":
+                writer.write(response.body)
+            return keep_alive
+
+        try:
+            async for chunk in response.body:
+                if not chunk:
+                    continue
+                writer.write(b"%x\r\n%b\r\n" % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+        finally:
+            await response.body.aclose()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+        return keep_alive
+
+    async def _respond(self, request: HTTPRequest) -> HTTPResponse:
+        """The handler's response, or a 500 if it raises, so later pipelined requests still get answers"""
+        if request.method not in ("GET", "HEAD"):
+            return HTTPResponse(405, [("Allow", "GET, HEAD")], b"")
+        try:
+            return await self.handler(request)
+        except Exception:
+            logger.exception("Unhandled error serving %s %s", request.method, request.target)
+            return HTTPResponse(500, [("Content-Type", "text/plain; charset=utf-8")],
+                                b"Internal Server Error")
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                self._idle[task] = writer
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as e:
+                    body = str(e).encode()
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nConnection: close\r\n"
+                                 b"Content-Length: %d\r\n\r\n%b" % (len(body), body))
+                    break
+                finally:
+                    self._idle.pop(task, None)
+                if request is None:
+                    break
+
+                response = await self._respond(request)
+                try:
+                    keep_alive = await self._write_response(writer, request, response,
+                                                            request.keep_alive and self._server.is_serving())
+                    await writer.drain()
+                except ConnectionError:
+                    raise
+                except Exception:
+                    # A streamed body failed after its status line went out; the only
+                    # way left to tell the client is to end the connection
+                    logger.exception("Error writing response to %s %s", request.method, request.target)
+                    break
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(task)
+            self._idle.pop(task, None)
+            writer.close()
@@ -0,0 +1,70 @@
+# bench_formats.py - Encode time and payload size per API response format
+#
+# Builds the payloads a pandas consumer would pull (full daily history and
+# per-customer columns) from a synthetic order store and encodes each one in
+# every available format.
+#
+#   python benchmarks/bench_formats.py --days 730 --customers 50000
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from order_store import OrderEventStore, current_day, seed_demo_orders
+from response_formats import available_formats, encode_payload, pack_msgpack
+
+
+def build_payloads(days: int, customers: int, orders_per_day: int):
+    store = OrderEventStore()
+    seed_demo_orders(store, days=days, orders_per_day=orders_per_day, customers=customers)
+    end_day = current_day()
+    start_day = end_day - days + 1
+    history = store.sales_summary(start_day, end_day)
+    history["day"] = list(range(start_day, end_day + 1))
+    return {
+        "history": history,
+        "customers": store.customer_activity(start_day, end_day),
+    }
+
+
+def time_encode(encode, payload, repeats: int):
+    """(best-of-N encode time in milliseconds, encoded body)"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        body = encode(payload)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare API response formats")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--orders-per-day", type=int, default=400)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.days, args.customers, args.orders_per_day)
+    formats = available_formats()
+    if "arrow" not in formats:
+        print("ℹ️ pyarrow not installed; skipping Arrow IPC")
+
+    for name, payload in payloads.items():
+        rows = max(len(value) for value in payload.values() if hasattr(value, "__len__"))
+        print(f"\n📦 {name} payload ({rows:,} rows)")
+        print(f"   {'format':<20}{'encode ms':>12}{'bytes':>14}{'gzip bytes':>14}")
+        variants = [(fmt, lambda data, fmt=fmt: encode_payload(data, fmt)) for fmt in formats]
+        # The fallback encoder used when the msgpack package is not installed
+        variants.append(("msgpack (built-in)", pack_msgpack))
+        for label, encode in variants:
+            millis, body = time_encode(encode, payload, args.repeats)
+            print(f"   {label:<20}{millis:>12.2f}{len(body):>14,}{len(gzip.compress(body, 6)):>14,}")
+
+
+if __name__ == "__main__":
+    main()
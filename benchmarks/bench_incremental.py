@@ -0,0 +1,80 @@
+# bench_incremental.py - Delta refresh vs full recompute of segments and pricing
+#
+# Seeds a store with a large order history, builds the incremental state once,
+# then appends batches of new orders of growing size and times the incremental
+# refresh against the full segment and elasticity recompute over the same window.
+#
+#   python benchmarks/bench_incremental.py --orders-per-day 20000 --customers 200000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from customer_segmentation import segment_customers
+from incremental_analysis import IncrementalAnalysis
+from order_store import OrderEventStore, current_day, seed_demo_orders
+from pricing_simulator import estimate_elasticities
+from rolling_aggregates import COUNT, SUM
+
+
+def timed(func, repeat: int = 3) -> float:
+    """Best of `repeat` wall times in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def full_recompute(store: OrderEventStore):
+    end_day = current_day()
+    activity = store.customer_activity(end_day - 29, end_day)
+    recency_days = np.maximum(time.time() - activity["last_order"], 0) / 86400
+    segment_customers(activity["spend"], activity["frequency"], recency_days)
+    window = store.aggregates.window(end_day - 89, end_day)[:, :len(store.categories)]
+    estimate_elasticities(window[:, :, SUM], window[:, :, COUNT])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental workflow refresh")
+    parser.add_argument("--orders-per-day", type=int, default=5000)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    store = OrderEventStore()
+    seeded = seed_demo_orders(store, orders_per_day=args.orders_per_day, customers=args.customers,
+                              seed=args.seed)
+    analysis = IncrementalAnalysis(store)
+    build_ms = timed(lambda: (analysis.segments.refresh(current_day(), time.time()),
+                              analysis.moments.refresh(current_day())), repeat=1)
+    full_ms = timed(lambda: full_recompute(store))
+
+    print(f"🔁 {seeded:,} orders, {args.customers:,} customers")
+    print(f"   Initial build:     {build_ms:9.2f} ms")
+    print(f"   Full recompute:    {full_ms:9.2f} ms")
+
+    rng = np.random.default_rng(args.seed)
+    next_order = 10 ** 9
+    for batch in (10, 100, 1000):
+        now = int(time.time())
+        store.append_batch(np.full(batch, now), np.arange(next_order, next_order + batch),
+                           rng.integers(0, args.customers, batch),
+                           rng.integers(0, len(store.categories), batch).astype(np.int16),
+                           rng.uniform(10, 200, batch).round(2))
+        next_order += batch
+        started = time.perf_counter()
+        changed = analysis.segments.refresh(current_day(), time.time())
+        analysis.moments.refresh(current_day())
+        refresh_ms = (time.perf_counter() - started) * 1000
+        print(f"   +{batch:<5,} orders:     {refresh_ms:9.2f} ms  ({changed:,} customers rescored)")
+
+
+if __name__ == "__main__":
+    main()
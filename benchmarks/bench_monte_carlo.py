@@ -0,0 +1,53 @@
+# bench_monte_carlo.py - Trials/sec of the revenue-impact Monte Carlo engine
+#
+# Builds a model from pricing actions on a synthetic store and times runs
+# in-process and across worker processes (results are identical for a seed).
+#
+#   python benchmarks/bench_monte_carlo.py --trials 2000000 --processes 4
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from order_store import OrderEventStore, current_day, seed_demo_orders
+from pricing_simulator import simulate_pricing
+from revenue_monte_carlo import build_model, demand_uncertainty, run_monte_carlo
+from rolling_aggregates import SUM
+
+SEGMENTS = {
+    "premium": {"count": 120, "avg_value": 180.0, "revenue": 420000.0},
+    "regular": {"count": 900, "avg_value": 75.0, "revenue": 510000.0},
+    "budget": {"count": 2400, "avg_value": 32.0, "revenue": 300000.0},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Monte Carlo revenue engine")
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=2024)
+    args = parser.parse_args()
+
+    store = OrderEventStore()
+    seed_demo_orders(store, days=180, orders_per_day=400, seed=args.seed)
+    end_day = current_day()
+    window = store.aggregates.window(end_day - 179, end_day)[:, :len(store.categories)]
+    simulation = simulate_pricing(window, store.categories, SEGMENTS, top_k=args.top_k, churn_rate=0.2)
+    model = build_model(simulation["actions"], store.categories, simulation["category_revenue"],
+                        demand_uncertainty(window[:, :, SUM]), churn_rate=0.2)
+
+    print(f"🎲 {args.trials:,} trials x {len(simulation['actions'])} actions")
+    for processes in sorted({1, args.processes}):
+        started = time.perf_counter()
+        result = run_monte_carlo(model, trials=args.trials, seed=args.seed, processes=processes)
+        elapsed = time.perf_counter() - started
+        print(f"   {processes:>2} process(es): {elapsed:6.2f}s  ({args.trials / elapsed:,.0f} trials/s)  "
+              f"p5 {result['p5']:+.2%}  p50 {result['p50']:+.2%}  p95 {result['p95']:+.2%}")
+
+
+if __name__ == "__main__":
+    main()
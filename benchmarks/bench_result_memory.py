@@ -0,0 +1,64 @@
+# bench_result_memory.py - Resident memory of workflow results
+#
+# Runs the workflow for N tenants (tools-only) and measures, with tracemalloc,
+# how much memory keeping every result resident costs: as result models, and as
+# the equivalent nested dicts from to_dict().
+#
+#   python benchmarks/bench_result_memory.py --tenants 2000
+
+import argparse
+import asyncio
+import gc
+import os
+import pickle
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import adk_hackathon_full_file as app
+from order_store import set_demo_data
+from step_cache import StepCache
+
+
+def retained_bytes(build) -> int:
+    """Traced bytes freed by dropping build()'s return value, i.e. what it keeps alive"""
+    kept = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    del kept
+    gc.collect()
+    return held - tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory of resident workflow results")
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    set_demo_data(True)
+    # No step cache, so every tenant's results are distinct objects
+    orchestrator = app.EcommerceAnalyticsOrchestrator(tools_only=True, step_cache=StepCache(max_bytes=0))
+    tenants = [f"tenant-{i}" for i in range(args.tenants)]
+
+    async def run_all():
+        return {tenant: results async for tenant, results in orchestrator.execute_batch(tenants, args.concurrency)}
+
+    asyncio.run(run_all())  # seed the tenants' order stores outside the measurement
+    tracemalloc.start()
+    models = retained_bytes(lambda: asyncio.run(run_all()))
+    results = asyncio.run(run_all())
+    dicts = retained_bytes(lambda: [result.to_dict() for result in results.values()])
+    sample = next(iter(results.values()))
+    orchestrator.close()
+
+    print(f"🧠 {args.tenants:,} resident workflow results")
+    print(f"   result models  {models / args.tenants:9,.0f} B/result  "
+          f"({len(pickle.dumps(sample)):,} B pickled)")
+    print(f"   nested dicts   {dicts / args.tenants:9,.0f} B/result  "
+          f"({len(pickle.dumps(sample.to_dict())):,} B pickled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# bench_startup.py - Cold-start cost of short-lived orchestrator processes
+#
+# Times fresh interpreters for each startup scenario (median of N runs) and
+# lists the slowest imports of the main module from `python -X importtime`.
+#
+#   python benchmarks/bench_startup.py --repeats 10
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCENARIOS = {
+    "interpreter": "pass",
+    "import": "import adk_hackathon_full_file",
+    "orchestrator (tools-only)": (
+        "import adk_hackathon_full_file as app\n"
+        "app.EcommerceAnalyticsOrchestrator(tools_only=True).close()"),
+    "workflow run (tools-only)": (
+        "import asyncio, adk_hackathon_full_file as app\n"
+        "o = app.EcommerceAnalyticsOrchestrator(tools_only=True)\n"
+        "asyncio.run(o.execute_analysis_workflow(verbose=False)); o.close()"),
+    "orchestrator + all ADK agents": (
+        "import adk_hackathon_full_file as app\n"
+        "o = app.EcommerceAnalyticsOrchestrator(); o.agents.build_all(); o.close()"),
+}
+
+
+def run(code: str, extra_args=()) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *extra_args, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+
+
+def time_scenario(code: str, repeats: int):
+    """Median and min wall time (ms) of a fresh interpreter running code, or None if it fails"""
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = run(code)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1:]
+        timings.append(elapsed)
+    return (statistics.median(timings), min(timings)), None
+
+
+def slowest_imports(module: str, top: int):
+    """(cumulative ms, module) for the slowest imports under -X importtime"""
+    result = run(f"import {module}", ["-X", "importtime"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestrator process start-up")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--top", type=int, default=12, help="Slowest imports to list")
+    args = parser.parse_args()
+
+    print(f"🚀 Fresh-process start-up, median of {args.repeats} runs")
+    for name, code in SCENARIOS.items():
+        timing, error = time_scenario(code, args.repeats)
+        if timing is None:
+            print(f"   {name:<32} skipped ({' '.join(error) or 'failed'})")
+        else:
+            print(f"   {name:<32} {timing[0]:8.1f} ms  (min {timing[1]:.1f} ms)")
+
+    print(f"\n📦 Slowest imports of adk_hackathon_full_file (cumulative):")
+    for cumulative_ms, name in slowest_imports("adk_hackathon_full_file", args.top):
+        print(f"   {cumulative_ms:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
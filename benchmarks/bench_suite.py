@@ -0,0 +1,269 @@
+# bench_suite.py - End-to-end benchmarks of the analytics tools and orchestrator
+#
+# For each order-history size a synthetic store is written to disk, then every
+# stage is run at each concurrency level in a fresh process, recording
+# throughput, latency percentiles and peak RSS. Runs are appended to a JSON
+# history and compared with the previous run so regressions stand out.
+#
+#   python benchmarks/bench_suite.py --sizes 1K,1M,100M --concurrency 1,8 --label v1.3
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+STAGES = ("collect_sales_data", "analyze_customer_segments", "generate_pricing_recommendations",
+          "generate_business_insights", "create_demo_html", "execute_analysis_workflow")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.json")
+HISTORY_DAYS = 90
+TENANT = "bench"
+
+# Metrics where a lower value is better; everything else compared is higher-is-better
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+
+
+def parse_count(value: str) -> int:
+    """'1K' / '2.5M' / '1B' / '1000' -> int"""
+    value = value.strip().upper()
+    scale = {"K": 10 ** 3, "M": 10 ** 6, "B": 10 ** 9}.get(value[-1:], 1)
+    return int(float(value[:-1] if scale > 1 else value) * scale)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# =============================================================================
+# STAGE RUNNERS (executed in a fresh process per data size)
+# =============================================================================
+
+def _stage_calls(app, orchestrator, seed: int) -> Dict[str, Callable[[], Any]]:
+    """Zero-argument callables per stage, with upstream inputs computed once"""
+    sales = app.collect_sales_data(tenant_id=TENANT)
+    customers = app.analyze_customer_segments(sales["total_sales"], tenant_id=TENANT)
+    pricing = app.generate_pricing_recommendations(customers, seed=seed, tenant_id=TENANT)
+    results = asyncio.run(orchestrator.execute_analysis_workflow(TENANT, verbose=False))
+    return {
+        "collect_sales_data": lambda: app.collect_sales_data(tenant_id=TENANT),
+        "analyze_customer_segments": lambda: app.analyze_customer_segments(sales["total_sales"],
+                                                                           tenant_id=TENANT),
+        "generate_pricing_recommendations": lambda: app.generate_pricing_recommendations(
+            customers, seed=seed, tenant_id=TENANT),
+        "generate_business_insights": lambda: app.generate_business_insights(sales, customers, pricing),
+        "create_demo_html": lambda: app.create_demo_html(results),
+    }
+
+
+def _time_threads(call: Callable[[], Any], concurrency: int, duration: float,
+                  min_calls: int) -> List[float]:
+    """Latencies (s) of back-to-back calls from `concurrency` threads"""
+    def worker() -> List[float]:
+        latencies = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline or len(latencies) < min_calls:
+            started = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker) for _ in range(concurrency)]
+        return [latency for future in futures for latency in future.result()]
+
+
+async def _time_workflows(orchestrator, concurrency: int, duration: float,
+                          min_calls: int) -> List[float]:
+    """Latencies (s) of back-to-back workflow runs from `concurrency` tasks"""
+    async def worker() -> List[float]:
+        latencies = []
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline or len(latencies) < min_calls:
+            started = time.perf_counter()
+            await orchestrator.execute_analysis_workflow(TENANT, verbose=False)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    results = await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return [latency for latencies in results for latency in latencies]
+
+
+def run_size(data_dir: str, orders: int, stages: List[str], concurrency: List[int],
+             duration: float, min_calls: int, seed: int) -> List[Dict[str, Any]]:
+    """Benchmark every stage x concurrency against one store; runs in a child process"""
+    import adk_hackathon_full_file as app
+    from order_store import OrderEventStore, set_order_store
+    from step_cache import StepCache
+
+    set_order_store(OrderEventStore(data_dir), TENANT)
+    # A zero-byte step cache makes every workflow run recompute its steps
+    orchestrator = app.EcommerceAnalyticsOrchestrator(max_workers=max(concurrency) * 4,
+                                                      step_cache=StepCache(max_bytes=0))
+    calls = _stage_calls(app, orchestrator, seed)
+
+    rows = []
+    for stage in stages:
+        for level in concurrency:
+            started = time.perf_counter()
+            if stage == "execute_analysis_workflow":
+                latencies = asyncio.run(_time_workflows(orchestrator, level, duration, min_calls))
+            else:
+                latencies = _time_threads(calls[stage], level, duration, min_calls)
+            elapsed = time.perf_counter() - started
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            rows.append({
+                "stage": stage,
+                "orders": orders,
+                "concurrency": level,
+                "calls": len(latencies),
+                "throughput": round(len(latencies) / elapsed, 2),
+                "p50_ms": round(float(p50), 3),
+                "p95_ms": round(float(p95), 3),
+                "p99_ms": round(float(p99), 3),
+                # Process high-water mark so far, including earlier stages for this size
+                "peak_rss_mb": peak_rss_mb(),
+            })
+    orchestrator.close()
+    return rows
+
+
+# =============================================================================
+# HISTORY AND REGRESSION REPORT
+# =============================================================================
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: List[Dict[str, Any]]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp, path)
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """Human-readable regressions of current vs previous beyond a relative threshold"""
+    baseline = {(row["stage"], row["orders"], row["concurrency"]): row for row in previous["results"]}
+    regressions = []
+    for row in current["results"]:
+        old = baseline.get((row["stage"], row["orders"], row["concurrency"]))
+        if old is None:
+            continue
+        for metric in ("throughput", "p95_ms", "peak_rss_mb"):
+            if not old[metric]:
+                continue
+            change = (row[metric] - old[metric]) / old[metric]
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            if worse:
+                regressions.append(f"{row['stage']} @ {row['orders']:,} orders x{row['concurrency']}: "
+                                   f"{metric} {old[metric]} -> {row[metric]} ({change:+.0%})")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the analytics tools and orchestrator")
+    parser.add_argument("--sizes", default="1K,100K,1M",
+                        help="Comma-separated order counts, e.g. 1K,1M,100M")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated concurrency levels")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per stage and level")
+    parser.add_argument("--min-calls", type=int, default=3, help="Minimum calls per worker")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--label", default=None, help="Version label for the history (default: git commit)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--no-history", action="store_true", help="Do not append this run")
+    parser.add_argument("--regression-threshold", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--data-dir", default=None,
+                        help="Where synthetic stores are written (default: a temporary directory)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    from synthetic_data import SyntheticOrderGenerator, write_synthetic_store
+    from order_store import current_day
+
+    args = parse_args()
+    sizes = [parse_count(size) for size in args.sizes.split(",")]
+    concurrency = [int(level) for level in args.concurrency.split(",")]
+    stages = [stage.strip() for stage in args.stages.split(",")]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        sys.exit(f"Unknown stages: {', '.join(unknown)}")
+
+    commit = git_commit()
+    run = {
+        "label": args.label or commit,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": args.seed,
+        "results": [],
+    }
+
+    end_day = current_day()
+    with tempfile.TemporaryDirectory(dir=args.data_dir) as workdir:
+        for orders in sizes:
+            data_dir = os.path.join(workdir, f"orders-{orders}")
+            generator = SyntheticOrderGenerator(args.seed, orders_per_day=max(orders // HISTORY_DAYS, 1))
+            started = time.perf_counter()
+            written = write_synthetic_store(data_dir, generator, end_day - HISTORY_DAYS + 1, end_day)
+            print(f"🧪 {written:,} orders generated in {time.perf_counter() - started:.1f}s")
+
+            # A fresh process per size keeps peak RSS figures independent
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                rows = pool.submit(run_size, data_dir, orders, stages, concurrency,
+                                   args.duration, args.min_calls, args.seed).result()
+            for row in rows:
+                print(f"   {row['stage']:<34} x{row['concurrency']:<3} {row['throughput']:>9,.1f}/s  "
+                      f"p50 {row['p50_ms']:>9.2f} ms  p95 {row['p95_ms']:>9.2f} ms  "
+                      f"p99 {row['p99_ms']:>9.2f} ms  RSS {row['peak_rss_mb']:>7,.0f} MB")
+            run["results"].extend(rows)
+
+    history = load_history(args.history)
+    regressions = compare(history[-1], run, args.regression_threshold) if history else []
+    if history:
+        print(f"\n📈 Compared with {history[-1]['label']} ({history[-1]['timestamp']}):")
+        for line in regressions:
+            print(f"   ⚠️  {line}")
+        if not regressions:
+            print(f"   ✅ No regressions beyond {args.regression_threshold:.0%}")
+    if not args.no_history:
+        save_history(args.history, history + [run])
+        print(f"💾 Appended run '{run['label']}' to {args.history}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# load_test.py - Concurrent HTTP load generator for live_data_api.py
+#
+# Opens N keep-alive connections, optionally pipelines several requests per
+# round trip, and reports requests/sec plus latency percentiles.
+#
+#   python live_data_api.py --mode async --workers 8 &
+#   python benchmarks/load_test.py --url http://localhost:8080/sales --connections 64 --duration 10
+
+import argparse
+import asyncio
+import json
+import time
+from typing import List, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bool]:
+    """Read one response; returns (status, connection still usable)"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return status, False
+    return status, headers.get("connection", "").lower() != "close"
+
+
+async def client(host: str, port: int, target: str, deadline: float, pipeline: int,
+                 latencies: List[float], errors: List[str], headers: List[str]):
+    extra = "".join(f"{header}\r\n" for header in headers)
+    request = (f"GET {target} HTTP/1.1\r\nHost: {host}:{port}\r\n{extra}"
+               f"Connection: keep-alive\r\n\r\n").encode() * pipeline
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            started = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            reusable = True
+            for _ in range(pipeline):
+                status, reusable = await read_response(reader)
+                latencies.append(time.perf_counter() - started)
+                if status >= 500:
+                    errors.append(f"HTTP {status}")
+                if not reusable:
+                    break
+            if not reusable:
+                writer.close()
+                writer = None
+        except (OSError, asyncio.IncompleteReadError) as e:
+            # A keep-alive connection closed by the server before it answered
+            # is retried on a new connection, as browsers and HTTP clients do
+            if not (isinstance(e, asyncio.IncompleteReadError) and not e.partial):
+                errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run_load_test(url: str, connections: int, duration: float, pipeline: int,
+                        headers: List[str] = ()):
+    parsed = urlparse(url)
+    host, port = parsed.hostname or "localhost", parsed.port or 80
+    target = parsed.path or "/"
+    if parsed.query:
+        target += "?" + parsed.query
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(client(host, port, target, deadline, pipeline, latencies, errors,
+                                  list(headers)) for _ in range(connections)))
+    elapsed = time.perf_counter() - started
+
+    millis = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "url": url,
+        "connections": connections,
+        "pipeline": pipeline,
+        "duration_seconds": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(float(np.percentile(millis, 50)), 3),
+            "p90": round(float(np.percentile(millis, 90)), 3),
+            "p99": round(float(np.percentile(millis, 99)), 3),
+            "max": round(float(millis.max()), 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test for the live data API")
+    parser.add_argument("--url", default="http://localhost:8080/sales")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pipeline", type=int, default=1,
+                        help="requests sent back-to-back per round trip")
+    parser.add_argument("--header", action="append", default=[],
+                        help='extra request header, e.g. "Accept-Encoding: gzip" (repeatable)')
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_load_test(args.url, args.connections, args.duration,
+                                       args.pipeline, args.header))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    print(f"🎯 {result['url']}  ({args.connections} connections, pipeline {args.pipeline})")
+    print(f"   Requests:     {result['requests']:,} in {result['duration_seconds']}s "
+          f"({result['errors']} errors)")
+    print(f"   Throughput:   {result['requests_per_second']:,} req/s")
+    latency = result["latency_ms"]
+    print(f"   Latency (ms): p50 {latency['p50']}  p90 {latency['p90']}  "
+          f"p99 {latency['p99']}  max {latency['max']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+# customer_segmentation.py - Vectorized RFM customer segmentation
+# Scores every customer on recency, frequency and monetary value via quantile
+# binning and maps the combined score onto premium / regular / budget tiers.
+# A streaming mini-batch k-means mode discovers segments from the data instead.
+
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from result_models import SegmentTable
+
+RFM_BINS = 5
+
+# Combined R+F+M score (3..15) needed to reach each tier
+PREMIUM_MIN_SCORE = 12
+REGULAR_MIN_SCORE = 7
+
+SEGMENT_NAMES = ("premium", "regular", "budget")
+SEGMENT_CHARACTERISTICS = {
+    "premium": "frequent_high_value_buyers",
+    "regular": "occasional_buyers",
+    "budget": "price_sensitive",
+}
+
+
+def quantile_edges(values: np.ndarray, bins: int = RFM_BINS) -> np.ndarray:
+    """The bins - 1 inner quantiles that split values into equally sized bins"""
+    return np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1])
+
+
+def bin_scores(values: np.ndarray, edges: np.ndarray, higher_is_better: bool = True) -> np.ndarray:
+    """Score values 1..len(edges) + 1 against fixed bin edges; ties take the lowest bin"""
+    scores = np.searchsorted(edges, values, side="left").astype(np.int8) + 1
+    return scores if higher_is_better else (len(edges) + 2 - scores).astype(np.int8)
+
+
+def quantile_scores(values: np.ndarray, bins: int = RFM_BINS, higher_is_better: bool = True) -> np.ndarray:
+    """Score values 1..bins by quantile bin; tied values share the lowest bin they span"""
+    return bin_scores(values, quantile_edges(values, bins), higher_is_better)
+
+
+def rfm_edges(spend: np.ndarray, frequency: np.ndarray,
+              recency_days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(recency, frequency, monetary) quantile edges, for scoring later customers with rfm_scores"""
+    return quantile_edges(recency_days), quantile_edges(frequency), quantile_edges(spend)
+
+
+def rfm_scores(spend: np.ndarray, frequency: np.ndarray, recency_days: np.ndarray,
+               edges: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+               ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-customer (recency, frequency, monetary) scores, each 1..RFM_BINS
+
+    Quantiles come from these customers unless fixed `edges` from rfm_edges() are given.
+    """
+    if edges is None:
+        edges = rfm_edges(spend, frequency, recency_days)
+    recency_edges, frequency_edges, spend_edges = edges
+    return (bin_scores(recency_days, recency_edges, higher_is_better=False),
+            bin_scores(frequency, frequency_edges),
+            bin_scores(spend, spend_edges))
+
+
+def assign_segments(recency: np.ndarray, frequency: np.ndarray, monetary: np.ndarray) -> np.ndarray:
+    """Map RFM scores to indices into SEGMENT_NAMES"""
+    combined = recency.astype(np.int16) + frequency + monetary
+    labels = np.full(len(combined), SEGMENT_NAMES.index("budget"), dtype=np.int8)
+    labels[combined >= REGULAR_MIN_SCORE] = SEGMENT_NAMES.index("regular")
+    labels[combined >= PREMIUM_MIN_SCORE] = SEGMENT_NAMES.index("premium")
+    return labels
+
+
+def churn_risk(recency: np.ndarray, frequency: np.ndarray) -> np.ndarray:
+    """Least recent customers without a repeat-purchase habit are the churn risk"""
+    return (recency == 1) & (frequency <= 2)
+
+
+def segment_totals(labels: np.ndarray, spend: np.ndarray, frequency: np.ndarray,
+                   n_segments: int) -> np.ndarray:
+    """Per-segment (customers, revenue, orders, repeat customers) as a (4, n) array"""
+    return np.stack([
+        np.bincount(labels, minlength=n_segments),
+        np.bincount(labels, weights=spend, minlength=n_segments),
+        np.bincount(labels, weights=frequency, minlength=n_segments),
+        np.bincount(labels, weights=(frequency >= 2), minlength=n_segments),
+    ]).astype(np.float64)
+
+
+def build_segments(names, totals: np.ndarray) -> SegmentTable:
+    """Count, average order value and repeat-purchase retention per segment"""
+    counts, revenue, orders, repeat = totals
+    rows = [
+        (counts[i],
+         round(float(revenue[i] / orders[i]), 2) if orders[i] else 0.0,
+         round(float(100 * repeat[i] / counts[i]), 1) if counts[i] else 0.0,
+         round(float(revenue[i]), 2))
+        for i in range(len(names))
+    ]
+    characteristics = [SEGMENT_CHARACTERISTICS.get(name, "discovered_cluster") for name in names]
+    return SegmentTable(names, np.array(rows, dtype=np.float64), characteristics)
+
+
+def summarize_segments(labels: np.ndarray, spend: np.ndarray, frequency: np.ndarray,
+                       names=SEGMENT_NAMES) -> SegmentTable:
+    return build_segments(names, segment_totals(labels, spend, frequency, len(names)))
+
+
+def segment_customers(spend, frequency, recency_days) -> Dict[str, Any]:
+    """Run RFM segmentation over per-customer arrays"""
+    spend = np.asarray(spend, dtype=np.float64)
+    frequency = np.asarray(frequency, dtype=np.float64)
+    recency_days = np.asarray(recency_days, dtype=np.float64)
+    if not len(spend) == len(frequency) == len(recency_days):
+        raise ValueError("spend, frequency and recency_days must have the same length")
+    if len(spend) == 0:
+        empty = np.empty(0, dtype=np.int8)
+        return {"segments": summarize_segments(empty, spend, frequency),
+                "churn_risk_percentage": 0.0, "overall_retention": 0.0}
+
+    r, f, m = rfm_scores(spend, frequency, recency_days)
+    labels = assign_segments(r, f, m)
+    at_risk = churn_risk(r, f)
+
+    return {
+        "segments": summarize_segments(labels, spend, frequency),
+        "churn_risk_percentage": round(float(100 * at_risk.mean()), 1),
+        "overall_retention": round(float(100 * (frequency >= 2).mean()), 1),
+    }
+
+
+# =============================================================================
+# STREAMING MINI-BATCH K-MEANS
+# =============================================================================
+
+# A chunk is (spend, frequency, recency_days) for a slice of customers
+CustomerChunk = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def iter_customer_chunks(spend, frequency, recency_days,
+                         chunk_size: int = 65536) -> Callable[[], Iterator[CustomerChunk]]:
+    """Chunk source over arrays or np.memmap columns; slices are read lazily"""
+    def chunks() -> Iterator[CustomerChunk]:
+        for start in range(0, len(spend), chunk_size):
+            stop = start + chunk_size
+            yield (np.asarray(spend[start:stop], dtype=np.float64),
+                   np.asarray(frequency[start:stop], dtype=np.float64),
+                   np.asarray(recency_days[start:stop], dtype=np.float64))
+    return chunks
+
+
+def customer_features(chunk: CustomerChunk) -> np.ndarray:
+    """Log-scaled (monetary, frequency, recency) feature rows for a chunk"""
+    spend, frequency, recency_days = chunk
+    return np.column_stack([np.log1p(spend), np.log1p(frequency), np.log1p(recency_days)])
+
+
+class MiniBatchKMeans:
+    """Mini-batch k-means that only ever holds one batch of features in memory"""
+
+    def __init__(self, n_clusters: int = 3, batch_size: int = 4096, seed: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self._counts = np.zeros(n_clusters, dtype=np.float64)
+        # Rows held back until there are enough to seed n_clusters centroids
+        self._pending = np.empty((0, 3))
+
+    def _init_centroids(self, batch: np.ndarray):
+        # k-means++ seeding on the first batch
+        centroids = [batch[self.rng.integers(len(batch))]]
+        for _ in range(1, self.n_clusters):
+            distances = ((batch[:, None, :] - np.array(centroids)[None]) ** 2).sum(-1).min(1)
+            total = distances.sum()
+            probabilities = distances / total if total > 0 else None
+            centroids.append(batch[self.rng.choice(len(batch), p=probabilities)])
+        self.centroids = np.array(centroids)
+
+    def predict(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest-centroid labels and squared distances"""
+        distances = ((features[:, None, :] - self.centroids[None]) ** 2).sum(-1)
+        labels = distances.argmin(1)
+        return labels, distances[np.arange(len(features)), labels]
+
+    def partial_fit(self, features: np.ndarray) -> "MiniBatchKMeans":
+        """Update centroids from one chunk, in batch_size steps
+
+        Before the centroids are seeded, chunks smaller than n_clusters are
+        buffered and combined with the next ones instead of being skipped.
+        """
+        if self.centroids is None:
+            features = np.concatenate([self._pending, features])
+            if len(features) < self.n_clusters:
+                self._pending = features
+                return self
+            self._pending = np.empty((0, features.shape[1]))
+        for start in range(0, len(features), self.batch_size):
+            batch = features[start:start + self.batch_size]
+            if self.centroids is None:
+                self._init_centroids(batch if len(batch) >= self.n_clusters else features)
+            labels, _ = self.predict(batch)
+            batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            batch_sums = np.zeros_like(self.centroids)
+            np.add.at(batch_sums, labels, batch)
+            self._counts += batch_counts
+            moved = batch_counts > 0
+            # Per-centre learning rate 1/count, applied to the batch mean
+            step = (batch_counts[moved] / self._counts[moved])[:, None]
+            batch_means = batch_sums[moved] / batch_counts[moved][:, None]
+            self.centroids[moved] += step * (batch_means - self.centroids[moved])
+        return self
+
+
+def cluster_customers(chunk_source: Callable[[], Iterable[CustomerChunk]], n_clusters: int = 3,
+                      epochs: int = 2, batch_size: int = 4096,
+                      seed: Optional[int] = None) -> Dict[str, Any]:
+    """Discover customer segments with mini-batch k-means over streamed chunks
+
+    ``chunk_source`` is called once per pass and must yield the same customers
+    each time. Clusters are named by descending centroid spend: premium /
+    regular / budget for three clusters, cluster_1..n otherwise. With fewer
+    than ``n_clusters`` customers the segments are empty, as in RFM mode for a
+    tenant without customers.
+    """
+    names: List[str] = (list(SEGMENT_NAMES) if n_clusters == len(SEGMENT_NAMES)
+                        else [f"cluster_{i + 1}" for i in range(n_clusters)])
+
+    # Pass 1: feature scaling statistics
+    n, sums, squares, recency_sum = 0, np.zeros(3), np.zeros(3), 0.0
+    for chunk in chunk_source():
+        features = customer_features(chunk)
+        n += len(features)
+        sums += features.sum(0)
+        squares += (features ** 2).sum(0)
+        recency_sum += chunk[2].sum()
+    if n < n_clusters:
+        return {"segments": build_segments(names, np.zeros((4, n_clusters))), "centroids": [],
+                "inertia": 0.0, "churn_risk_percentage": 0.0, "overall_retention": 0.0}
+    mean = sums / n
+    scale = np.sqrt(np.maximum(squares / n - mean ** 2, 0)) + 1e-9
+
+    # Pass 2..: fit on standardized features
+    model = MiniBatchKMeans(n_clusters, batch_size, seed)
+    for _ in range(epochs):
+        for chunk in chunk_source():
+            model.partial_fit((customer_features(chunk) - mean) / scale)
+    if model.centroids is None:
+        raise ValueError(f"chunk_source yielded fewer than {n_clusters} customers while fitting")
+
+    # Name clusters by spend, highest first
+    centroids = model.centroids * scale + mean
+    order = np.argsort(-centroids[:, 0])
+    rank = np.empty(n_clusters, dtype=np.int64)
+    rank[order] = np.arange(n_clusters)
+
+    # Final pass: assignment, segment totals and inertia
+    totals = np.zeros((4, n_clusters))
+    inertia, at_risk, repeat = 0.0, 0, 0
+    mean_recency = recency_sum / n
+    for chunk in chunk_source():
+        labels, distances = model.predict((customer_features(chunk) - mean) / scale)
+        spend, frequency, recency_days = chunk
+        totals += segment_totals(rank[labels], spend, frequency, n_clusters)
+        inertia += float(distances.sum())
+        at_risk += int(((frequency < 2) & (recency_days > mean_recency)).sum())
+        repeat += int((frequency >= 2).sum())
+
+    return {
+        "segments": build_segments(names, totals),
+        "centroids": [
+            {"segment": names[rank[i]],
+             "spend": round(float(np.expm1(centroids[i, 0])), 2),
+             "frequency": round(float(np.expm1(centroids[i, 1])), 2),
+             "recency_days": round(float(np.expm1(centroids[i, 2])), 1)}
+            for i in order
+        ],
+        "inertia": round(inertia, 4),
+        "churn_risk_percentage": round(100 * at_risk / n, 1),
+        "overall_retention": round(100 * repeat / n, 1),
+    }
@@ -0,0 +1,356 @@
+# incremental_analysis.py - Delta refresh of the segment and pricing stages
+# Each tenant's stage state lives between workflow runs and is advanced from a
+# per-day row checkpoint into the order store, so a refresh reads only the
+# orders appended since the last one (plus days leaving the window). Customer
+# totals and segment counts are patched for the customers who ordered, and
+# elasticities come from running log-log moments per category.
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from customer_segmentation import (SEGMENT_NAMES, assign_segments, build_segments, churn_risk,
+                                   rfm_edges, rfm_scores, segment_totals)
+from order_store import (DEFAULT_TENANT, SECONDS_PER_DAY, OrderEventStore, current_day,
+                         get_order_store)
+from pricing_simulator import daily_log_points, elasticities_from_moments, rank_price_changes
+from result_models import CustomerIntelligence, ImpactInterval, PricingStrategy, RecommendationTable
+from revenue_monte_carlo import demand_sd, recommend_actions
+from rolling_aggregates import SUM, COUNT
+from tracing import tool_span
+
+# RFM quantile edges are re-derived from every customer once more than this
+# share of the active customers has changed since the last baseline
+REBASELINE_FRACTION = 0.2
+
+ACTIVITY_COLUMNS = ("customer_id", "amount", "timestamp")
+NO_ORDER = np.iinfo(np.int64).min
+
+
+# =============================================================================
+# CUSTOMER SEGMENTS
+# =============================================================================
+
+class IncrementalSegments:
+    """RFM segments over a rolling window of days, patched as orders arrive
+
+    Per-customer spend, order count and last order time are kept in slot
+    arrays. Scores use quantile edges fixed at the last baseline, with recency
+    measured at that time, so rescoring a changed customer never moves
+    anyone else; right after a baseline the result equals segment_customers().
+    """
+
+    def __init__(self, store: OrderEventStore, days: int = 30):
+        self.store = store
+        self.days = days
+        self.offsets: Dict[int, int] = {}  # day -> rows already consumed
+        self.edges: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self.baseline_time = 0.0
+        self.totals = np.zeros((4, len(SEGMENT_NAMES)))
+        self.at_risk_count = 0
+        self._index: Dict[int, int] = {}  # customer id -> slot
+        self.size = 0
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._reset_slots(np.empty(0, dtype=np.int64), 0)
+
+    def _reset_slots(self, customer_ids: np.ndarray, capacity: int):
+        self.size = len(customer_ids)
+        capacity = max(capacity, self.size, 256)
+        self._arrays = {
+            "customer_id": np.zeros(capacity, dtype=np.int64),
+            "spend": np.zeros(capacity),
+            "frequency": np.zeros(capacity, dtype=np.int64),
+            "last_order": np.full(capacity, NO_ORDER, dtype=np.int64),
+            "label": np.full(capacity, -1, dtype=np.int8),
+            "at_risk": np.zeros(capacity, dtype=bool),
+        }
+        self._arrays["customer_id"][:self.size] = customer_ids
+        self._index = {customer: slot for slot, customer in enumerate(customer_ids.tolist())}
+
+    def _reserve(self, extra: int):
+        capacity = len(self._arrays["spend"])
+        needed = self.size + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self._arrays.items():
+            grown = np.zeros(capacity, dtype=array.dtype)
+            grown[self.size:] = NO_ORDER if name == "last_order" else (-1 if name == "label" else 0)
+            grown[:self.size] = array[:self.size]
+            self._arrays[name] = grown
+
+    def _slots(self, customer_ids: np.ndarray) -> np.ndarray:
+        """Slot of each (unique) customer id, adding slots for new customers"""
+        slots = np.fromiter((self._index.get(customer, -1) for customer in customer_ids.tolist()),
+                            dtype=np.int64, count=len(customer_ids))
+        new = np.flatnonzero(slots < 0)
+        if len(new):
+            self._reserve(len(new))
+            slots[new] = np.arange(self.size, self.size + len(new))
+            self._arrays["customer_id"][slots[new]] = customer_ids[new]
+            self._index.update(zip(customer_ids[new].tolist(), slots[new].tolist()))
+            self.size += len(new)
+        return slots
+
+    def _delta(self, end_day: int) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """(orders added, orders expired) since the last checkpoint; advances the checkpoint"""
+        start_day = end_day - self.days + 1
+        added, expired = [], []
+        for day in sorted(day for day in self.offsets if day < start_day):
+            expired.append(self.store.read_day(day, 0, self.offsets.pop(day), ACTIVITY_COLUMNS))
+        for day in range(start_day, end_day + 1):
+            offset, size = self.offsets.get(day, 0), self.store.day_size(day)
+            if size > offset:
+                added.append(self.store.read_day(day, offset, size, ACTIVITY_COLUMNS))
+                self.offsets[day] = size
+        return _concat(added), _concat(expired)
+
+    def _accumulate(self, orders: Dict[str, np.ndarray], slots: np.ndarray,
+                    customer_ids: np.ndarray, sign: int):
+        """Add (sign=1) or take out (sign=-1) orders from the per-customer totals"""
+        if not len(orders["customer_id"]):
+            return
+        rows = slots[np.searchsorted(customer_ids, orders["customer_id"])]
+        arrays = self._arrays
+        np.add.at(arrays["spend"], rows, sign * orders["amount"])
+        np.add.at(arrays["frequency"], rows, sign)
+        if sign > 0:
+            np.maximum.at(arrays["last_order"], rows, orders["timestamp"])
+        else:
+            # Expired days are always the oldest, so anyone with orders left keeps their last order
+            gone = rows[arrays["frequency"][rows] == 0]
+            arrays["last_order"][gone] = NO_ORDER
+            arrays["spend"][gone] = 0.0
+
+    def _score(self, slots: np.ndarray, sign: int):
+        """Add (sign=1) or retract (sign=-1) customers' contributions to the segment totals"""
+        arrays = self._arrays
+        if sign > 0:
+            slots = slots[arrays["frequency"][slots] > 0]
+            recency_days = np.maximum(self.baseline_time - arrays["last_order"][slots], 0) / SECONDS_PER_DAY
+            r, f, m = rfm_scores(arrays["spend"][slots], arrays["frequency"][slots], recency_days, self.edges)
+            arrays["label"][slots] = assign_segments(r, f, m)
+            arrays["at_risk"][slots] = churn_risk(r, f)
+        else:
+            slots = slots[arrays["label"][slots] >= 0]
+        self.totals += sign * segment_totals(arrays["label"][slots], arrays["spend"][slots],
+                                             arrays["frequency"][slots], len(SEGMENT_NAMES))
+        self.at_risk_count += sign * int(arrays["at_risk"][slots].sum())
+        if sign < 0:
+            arrays["label"][slots] = -1
+            arrays["at_risk"][slots] = False
+
+    def _baseline(self, now: float):
+        """Re-derive the quantile edges and every score; drops customers who left the window"""
+        arrays = self._arrays
+        active = np.flatnonzero(arrays["frequency"][:self.size] > 0)
+        kept = {name: array[active] for name, array in arrays.items()}
+        self._reset_slots(kept["customer_id"], len(arrays["spend"]))
+        for name, values in kept.items():
+            self._arrays[name][:self.size] = values
+        self.baseline_time = now
+        self.totals[:] = 0.0
+        self.at_risk_count = 0
+        if self.size == 0:
+            self.edges = None
+            return
+        recency_days = np.maximum(now - kept["last_order"], 0) / SECONDS_PER_DAY
+        self.edges = rfm_edges(kept["spend"], kept["frequency"], recency_days)
+        self._score(np.arange(self.size), 1)
+
+    def refresh(self, end_day: int, now: float) -> int:
+        """Fold in the orders since the last refresh; returns how many customers changed"""
+        added, expired = self._delta(end_day)
+        customer_ids = np.unique(np.concatenate([added["customer_id"], expired["customer_id"]]))
+        if self.edges is not None and not len(customer_ids):
+            return 0
+        slots = self._slots(customer_ids)
+        active = self.totals[0].sum()
+        rebaseline = self.edges is None or len(customer_ids) > REBASELINE_FRACTION * active
+        if not rebaseline:
+            self._score(slots, -1)
+        self._accumulate(expired, slots, customer_ids, -1)
+        self._accumulate(added, slots, customer_ids, 1)
+        if rebaseline:
+            self._baseline(now)
+        else:
+            self._score(slots, 1)
+        return len(customer_ids)
+
+    def intelligence(self, sales_total: float = 0.0) -> CustomerIntelligence:
+        """The segment stage result, as analyze_customer_segments() returns it"""
+        customers = self.totals[0].sum()
+        segments = build_segments(SEGMENT_NAMES, self.totals)
+        return CustomerIntelligence(
+            segments=segments,
+            churn_risk_percentage=round(float(100 * self.at_risk_count / customers), 1) if customers else 0.0,
+            overall_retention=round(float(100 * self.totals[3].sum() / customers), 1) if customers else 0.0,
+            revenue_base=sales_total or float(segments.column("revenue").sum()) or 1.0
+        )
+
+
+def _concat(pieces) -> Dict[str, np.ndarray]:
+    if not pieces:
+        return {"customer_id": np.empty(0, dtype=np.int64), "amount": np.empty(0),
+                "timestamp": np.empty(0, dtype=np.int64)}
+    return {name: np.concatenate([piece[name] for piece in pieces]) for name in ACTIVITY_COLUMNS}
+
+
+# =============================================================================
+# CATEGORY ELASTICITY MOMENTS
+# =============================================================================
+
+# Rows of a day's contribution: log-log moments for elasticities_from_moments(),
+# then sales and squared sales for the demand uncertainty
+MOMENT_ROWS = 6
+SALES, SALES_SQ = 6, 7
+
+
+def day_moments(sales: np.ndarray, orders: np.ndarray) -> np.ndarray:
+    """One day's (8, categories) contribution to CategoryMoments"""
+    observed, price, volume = daily_log_points(sales, orders)
+    # Unobserved cells have zero log price and volume, so only the count needs the mask
+    return np.stack([observed.astype(np.float64), price, volume,
+                     price * price, price * volume, volume * volume, sales, sales * sales])
+
+
+class CategoryMoments:
+    """Per-category sums over a rolling window of days, for elasticity and demand spread
+
+    A day is recomputed from the rolling aggregates only when its order count
+    in the store has changed since the last refresh.
+    """
+
+    def __init__(self, store: OrderEventStore, days: int = 90):
+        self.store = store
+        self.days = days
+        self.categories = 0
+        self._seen: Dict[int, int] = {}  # day -> orders when last read
+        self._rows: Dict[int, np.ndarray] = {}
+        self.totals = np.zeros((SALES_SQ + 1, 0))
+
+    def refresh(self, end_day: int) -> int:
+        """Re-read changed days and drop expired ones; returns the days re-read"""
+        categories = len(self.store.categories)
+        if categories != self.categories:
+            # A new category widens every row; start over
+            self.categories = categories
+            self._seen, self._rows = {}, {}
+            self.totals = np.zeros((SALES_SQ + 1, categories))
+        start_day = end_day - self.days + 1
+        expired = [day for day in self._rows if day < start_day]
+        for day in expired:
+            del self._rows[day], self._seen[day]
+
+        changed = 0
+        for day in range(start_day, end_day + 1):
+            size = self.store.day_size(day)
+            if size == self._seen.get(day, 0):
+                continue
+            cells = self.store.aggregates.window(day, day)[0, :categories]
+            row = day_moments(cells[:, SUM], cells[:, COUNT])
+            self.totals += row - self._rows.get(day, 0.0)
+            self._rows[day], self._seen[day] = row, size
+            changed += 1
+        if expired:
+            # Re-sum rather than subtract so rounding error cannot build up over days
+            self.totals = sum(self._rows.values(), np.zeros((SALES_SQ + 1, categories)))
+        return changed
+
+    def elasticities(self) -> Tuple[np.ndarray, np.ndarray]:
+        return elasticities_from_moments(self.totals[:MOMENT_ROWS])
+
+    def demand_sd(self) -> np.ndarray:
+        mean = self.totals[SALES] / self.days
+        std = np.sqrt(np.maximum(self.totals[SALES_SQ] / self.days - mean * mean, 0.0))
+        return demand_sd(self.days, mean, std)
+
+
+# =============================================================================
+# PER-TENANT STATE
+# =============================================================================
+
+class IncrementalAnalysis:
+    """A tenant's incremental segment and pricing state, shared by its workflow runs"""
+
+    def __init__(self, store: OrderEventStore, segment_days: int = 30, pricing_days: int = 90):
+        self.store = store
+        self.segments = IncrementalSegments(store, segment_days)
+        self.moments = CategoryMoments(store, pricing_days)
+        self._lock = threading.Lock()
+
+    def customer_segments(self, sales_total: float = 0.0) -> CustomerIntelligence:
+        with self._lock:
+            with tool_span("segment_customers.incremental") as span:
+                changed = self.segments.refresh(current_day(), time.time())
+                if span is not None:
+                    span.set(changed_customers=changed)
+                return self.segments.intelligence(sales_total)
+
+    def pricing_recommendations(self, customer_data: Dict, top_k: int = 5, trials: int = 20000,
+                                seed: Optional[int] = None) -> PricingStrategy:
+        categories = self.store.categories
+        churn_rate = customer_data.get("churn_risk_percentage", 20) / 100
+        with self._lock:
+            with tool_span("simulate_pricing.incremental", categories=len(categories)) as span:
+                changed = self.moments.refresh(current_day())
+                if span is not None:
+                    span.set(changed_days=changed)
+                elasticity, std_error = self.moments.elasticities()
+                revenue = self.moments.totals[SALES].copy()
+                uncertainty = self.moments.demand_sd()
+                simulation = rank_price_changes(revenue, elasticity, std_error, categories,
+                                                customer_data.get("segments", {}), top_k=top_k,
+                                                churn_rate=churn_rate)
+
+        with tool_span("run_monte_carlo", trials=trials):
+            actions, impact = recommend_actions(simulation["actions"], categories,
+                                                simulation["category_revenue"], uncertainty, churn_rate,
+                                                trials=trials, seed=seed)
+        return PricingStrategy(
+            recommendations=RecommendationTable.from_actions(actions),
+            revenue_impact_interval=ImpactInterval(**impact),
+            elasticities=simulation["elasticities"],
+            combinations_evaluated=simulation["combinations_evaluated"]
+        )
+
+
+_analyses: Dict[str, IncrementalAnalysis] = {}
+_analyses_lock = threading.Lock()
+
+
+def get_incremental_analysis(tenant_id: str = DEFAULT_TENANT) -> IncrementalAnalysis:
+    """A tenant's incremental state, started over if its order store was replaced"""
+    store = get_order_store(tenant_id)
+    analysis = _analyses.get(tenant_id)
+    if analysis is None or analysis.store is not store:
+        with _analyses_lock:
+            analysis = _analyses.get(tenant_id)
+            if analysis is None or analysis.store is not store:
+                analysis = _analyses[tenant_id] = IncrementalAnalysis(store)
+    return analysis
+
+
+def reset_incremental_analyses():
+    """Drop every tenant's state; the next refresh rebuilds it from the store"""
+    with _analyses_lock:
+        _analyses.clear()
+
+
+# =============================================================================
+# WORKFLOW TOOLS
+# =============================================================================
+
+def refresh_customer_segments(sales_total: float = 0.0, tenant_id: str = DEFAULT_TENANT) -> CustomerIntelligence:
+    """analyze_customer_segments() over the last 30 days, updated from new orders only"""
+    return get_incremental_analysis(tenant_id).customer_segments(sales_total)
+
+
+def refresh_pricing_recommendations(customer_data: Dict, top_k: int = 5,
+                                    trials: int = 20000, seed: Optional[int] = None,
+                                    tenant_id: str = DEFAULT_TENANT) -> PricingStrategy:
+    """generate_pricing_recommendations() over the last 90 days, updated from new orders only"""
+    return get_incremental_analysis(tenant_id).pricing_recommendations(customer_data, top_k, trials, seed)
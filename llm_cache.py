@@ -0,0 +1,249 @@
+# llm_cache.py - Persistent response cache and in-flight deduplication for LLM calls
+# Responses are keyed by (model, instruction, prompt, tool outputs). Concurrent
+# identical prompts share one model call. Storage is a pluggable backend.
+
+import abc
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from step_cache import fingerprint
+
+
+# =============================================================================
+# STORAGE BACKENDS
+# =============================================================================
+
+class CacheBackend(abc.ABC):
+    """Key/value storage for serialized responses"""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """The stored value, or None on a miss"""
+
+    @abc.abstractmethod
+    def set(self, key: str, value: str):
+        """Store value under key, replacing any previous one"""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process backend, mostly for tests and short-lived runs"""
+
+    def __init__(self):
+        self._values: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._values[key] = value
+
+
+class DiskCacheBackend(CacheBackend):
+    """One file per response under <directory>/<key[:2]>/<key>, written atomically"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+
+
+# =============================================================================
+# CACHED CALLS
+# =============================================================================
+
+def llm_cache_key(model: str, instruction: Any, prompt: Any, tool_outputs: Any = None) -> str:
+    return fingerprint(["llm", model, instruction, prompt, tool_outputs], volatile=())
+
+
+class LLMCallCache:
+    """Cache-through wrapper around any async model call
+
+    ``call`` works with any coroutine function that returns a string, so a
+    local stub model can stand in for Gemini in tests and benchmarks.
+    """
+
+    def __init__(self, backend: CacheBackend, wait_timeout: float = 120.0):
+        self.backend = backend
+        self.wait_timeout = wait_timeout
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self._in_flight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Optional[str]:
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def claim(self, key: str) -> Tuple[bool, concurrent.futures.Future]:
+        """Register a call for key; returns (is_owner, shared future)"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return False, future
+            future = self._in_flight[key] = concurrent.futures.Future()
+            self.misses += 1
+            return True, future
+
+    def complete(self, key: str, value: Optional[str]):
+        """Store the owner's response (None on failure) and release waiters"""
+        if value is not None:
+            self.backend.set(key, value)
+        with self._lock:
+            future = self._in_flight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(value)
+
+    async def wait(self, key: str, future: concurrent.futures.Future) -> Optional[str]:
+        """Await another caller's in-flight response; None if it failed or timed out"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)),
+                                          self.wait_timeout)
+        except asyncio.TimeoutError:
+            # The owner never reported back; stop deduplicating onto its call
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            if not future.done():
+                future.set_result(None)
+            return None
+
+    async def call(self, model: str, instruction: Any, prompt: Any, tool_outputs: Any,
+                   invoke: Callable[[], Awaitable[str]]) -> str:
+        key = llm_cache_key(model, instruction, prompt, tool_outputs)
+        cached = self.lookup(key)
+        if cached is not None:
+            return cached
+
+        is_owner, future = self.claim(key)
+        if not is_owner:
+            shared = await self.wait(key, future)
+            if shared is not None:
+                return shared
+            return await invoke()
+
+        value = None
+        try:
+            value = await invoke()
+            return value
+        finally:
+            self.complete(key, value)
+
+
+# =============================================================================
+# ADK INTEGRATION
+# =============================================================================
+
+def _request_key(llm_request) -> str:
+    """Split an ADK LlmRequest into instruction, prompt text and tool outputs"""
+    config = getattr(llm_request, "config", None)
+    instruction = getattr(config, "system_instruction", None)
+    prompt: List[Any] = []
+    tool_outputs: List[Any] = []
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.function_response is not None:
+                # Call ids are random per invocation and would defeat the cache
+                tool_outputs.append(part.function_response.model_dump(
+                    mode="json", exclude_none=True, exclude={"id"}))
+            elif part.function_call is not None:
+                prompt.append([content.role, part.function_call.model_dump(
+                    mode="json", exclude_none=True, exclude={"id"})])
+            elif part.text is not None:
+                prompt.append([content.role, part.text])
+    tools = sorted(getattr(llm_request, "tools_dict", {}) or {})
+    return llm_cache_key(llm_request.model or "", [str(instruction), tools], prompt, tool_outputs)
+
+
+def _llm_response(cached: str):
+    from google.adk.models import LlmResponse
+
+    return LlmResponse.model_validate_json(cached)
+
+
+def adk_model_callbacks(cache: LLMCallCache):
+    """(before_model, after_model, on_model_error) callbacks that route LlmAgent calls through cache
+
+    The owner of an in-flight call is released by after_model, or by
+    on_model_error if the model raises instead of returning a response. Older
+    ADK versions without on_model_error are covered by the next call from the
+    same invocation and agent, which releases any call it left pending.
+    """
+    pending: Dict[Tuple[str, str], str] = {}
+    lock = threading.Lock()
+
+    def release(callback_context) -> Optional[str]:
+        with lock:
+            return pending.pop((callback_context.invocation_id, callback_context.agent_name), None)
+
+    async def before_model_callback(callback_context, llm_request):
+        stale = release(callback_context)
+        if stale is not None:
+            cache.complete(stale, None)
+        key = _request_key(llm_request)
+        cached = cache.lookup(key)
+        if cached is None:
+            is_owner, future = cache.claim(key)
+            if is_owner:
+                with lock:
+                    pending[(callback_context.invocation_id, callback_context.agent_name)] = key
+                return None
+            cached = await cache.wait(key, future)
+            if cached is None:
+                return None
+        return _llm_response(cached)
+
+    def after_model_callback(callback_context, llm_response):
+        if getattr(llm_response, "partial", False):
+            return None
+        key = release(callback_context)
+        if key is not None:
+            failed = getattr(llm_response, "error_code", None) is not None
+            cache.complete(key, None if failed else llm_response.model_dump_json(exclude_none=True))
+        return None
+
+    def on_model_error_callback(callback_context, llm_request, error):
+        # Waiters fall back to their own call instead of blocking for wait_timeout
+        key = release(callback_context)
+        if key is not None:
+            cache.complete(key, None)
+        return None
+
+    return before_model_callback, after_model_callback, on_model_error_callback
+
+
+_default_cache: Optional[LLMCallCache] = None
+
+
+def get_llm_cache() -> LLMCallCache:
+    """Process-wide disk cache under ADK_LLM_CACHE_DIR (default .adk_llm_cache)"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCallCache(
+            DiskCacheBackend(os.environ.get("ADK_LLM_CACHE_DIR", ".adk_llm_cache")))
+    return _default_cache
@@ -0,0 +1,187 @@
+# order_segments.py - Memory-mapped on-disk segment format for order history
+#
+# Layout of a store directory:
+#   index.bin        fixed-width records: (day, seq, min_ts, max_ts, rows) per segment
+#   categories.bin   category names, one 32-byte NUL-padded slot per code
+#   aggregates.bin   per-(day, category) rolling aggregates of all flushed orders
+#   seg-<day>-<seq>/ one immutable segment: header.bin plus one <column>.col file
+#                    of fixed-width little-endian values per column
+#
+# Queries read index.bin, prune segments by their min/max timestamp and
+# np.memmap only the columns they touch. Nothing is parsed from CSV or JSON.
+
+import os
+import struct
+from typing import Dict, List
+
+import numpy as np
+
+from rolling_aggregates import AGGREGATE_RECORD
+
+INDEX_FILE = "index.bin"
+CATEGORIES_FILE = "categories.bin"
+AGGREGATES_FILE = "aggregates.bin"
+SEGMENT_HEADER_FILE = "header.bin"
+
+INDEX_HEADER = struct.Struct("<4sHHI")          # magic, version, reserved, record count
+INDEX_RECORD = struct.Struct("<iIqqQ")          # day, seq, min_ts, max_ts, rows
+SEGMENT_HEADER = struct.Struct("<4sHHiIqqQ")    # magic, version, columns, day, seq, min_ts, max_ts, rows
+COLUMN_DESCRIPTOR = struct.Struct("<16s4s")     # column name, dtype string (e.g. "<i8")
+CATEGORY_SLOT = 32
+
+INDEX_MAGIC = b"OIDX"
+SEGMENT_MAGIC = b"OSEG"
+FORMAT_VERSION = 1
+
+
+def segment_dirname(day: int, seq: int) -> str:
+    return f"seg-{day}-{seq:06d}"
+
+
+def _write_atomic(path: str, payload: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# SEGMENTS
+# =============================================================================
+
+class MappedSegment:
+    """Immutable on-disk segment whose columns are memory-mapped on first use"""
+
+    __slots__ = ("directory", "day", "seq", "min_ts", "max_ts", "size", "_dtypes", "_mapped")
+
+    def __init__(self, directory: str, day: int, seq: int, min_ts: int, max_ts: int, size: int):
+        self.directory = directory
+        self.day = day
+        self.seq = seq
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+        self.size = size
+        self._dtypes = None
+        self._mapped: Dict[str, np.ndarray] = {}
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, segment_dirname(self.day, self.seq))
+
+    def _column_dtypes(self) -> Dict[str, np.dtype]:
+        if self._dtypes is None:
+            with open(os.path.join(self.path, SEGMENT_HEADER_FILE), "rb") as f:
+                header = f.read()
+            magic, version, n_columns, *_ = SEGMENT_HEADER.unpack_from(header)
+            if magic != SEGMENT_MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported segment header in {self.path}")
+            dtypes = {}
+            for i in range(n_columns):
+                name, dtype = COLUMN_DESCRIPTOR.unpack_from(
+                    header, SEGMENT_HEADER.size + i * COLUMN_DESCRIPTOR.size)
+                dtypes[name.rstrip(b"\0").decode()] = np.dtype(dtype.rstrip(b"\0").decode())
+            self._dtypes = dtypes
+        return self._dtypes
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of a single column"""
+        mapped = self._mapped.get(name)
+        if mapped is None:
+            dtype = self._column_dtypes()[name]
+            mapped = np.memmap(os.path.join(self.path, f"{name}.col"), dtype=dtype,
+                               mode="r", shape=(self.size,))
+            self._mapped[name] = mapped
+        return mapped
+
+    def overlaps(self, start_ts: int, end_ts: int) -> bool:
+        """True if any order in the segment may fall in [start_ts, end_ts)"""
+        return self.max_ts >= start_ts and self.min_ts < end_ts
+
+
+def write_segment(directory: str, day: int, seq: int,
+                  columns: Dict[str, np.ndarray]) -> MappedSegment:
+    """Persist equally sized columns as a new immutable segment"""
+    timestamps = columns["timestamp"]
+    rows = len(timestamps)
+    min_ts, max_ts = (int(timestamps.min()), int(timestamps.max())) if rows else (0, 0)
+
+    path = os.path.join(directory, segment_dirname(day, seq))
+    os.makedirs(path, exist_ok=True)
+
+    header = [SEGMENT_HEADER.pack(SEGMENT_MAGIC, FORMAT_VERSION, len(columns), day, seq,
+                                  min_ts, max_ts, rows)]
+    for name, values in columns.items():
+        dtype = values.dtype.newbyteorder("<")
+        np.ascontiguousarray(values, dtype=dtype).tofile(os.path.join(path, f"{name}.col"))
+        header.append(COLUMN_DESCRIPTOR.pack(name.encode(), dtype.str.encode()))
+    # The header is written last so a segment is only readable once complete
+    _write_atomic(os.path.join(path, SEGMENT_HEADER_FILE), b"".join(header))
+
+    return MappedSegment(directory, day, seq, min_ts, max_ts, rows)
+
+
+# =============================================================================
+# INDEX AND CATEGORY DICTIONARY
+# =============================================================================
+
+def read_index(directory: str) -> List[MappedSegment]:
+    """Load the segment index of a store directory (empty if none yet)"""
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        payload = f.read()
+    magic, version, _, count = INDEX_HEADER.unpack_from(payload)
+    if magic != INDEX_MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported order index in {directory}")
+    return [MappedSegment(directory, *record)
+            for record in INDEX_RECORD.iter_unpack(
+                payload[INDEX_HEADER.size:INDEX_HEADER.size + count * INDEX_RECORD.size])]
+
+
+def write_index(directory: str, segments: List[MappedSegment]):
+    """Atomically replace the segment index"""
+    records = [INDEX_RECORD.pack(seg.day, seg.seq, seg.min_ts, seg.max_ts, seg.size)
+               for seg in sorted(segments, key=lambda seg: (seg.day, seg.seq))]
+    _write_atomic(os.path.join(directory, INDEX_FILE),
+                  INDEX_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION, 0, len(records)) + b"".join(records))
+
+
+def read_categories(directory: str) -> List[str]:
+    path = os.path.join(directory, CATEGORIES_FILE)
+    if not os.path.exists(path):
+        return []
+    slots = np.fromfile(path, dtype=f"S{CATEGORY_SLOT}")
+    return [slot.decode() for slot in slots]
+
+
+def write_categories(directory: str, categories: List[str]):
+    encoded = [name.encode() for name in categories]
+    if any(len(name) > CATEGORY_SLOT for name in encoded):
+        raise ValueError(f"Category names are limited to {CATEGORY_SLOT} bytes")
+    _write_atomic(os.path.join(directory, CATEGORIES_FILE),
+                  np.array(encoded, dtype=f"S{CATEGORY_SLOT}").tobytes())
+
+
+def read_aggregates(directory: str):
+    """Load persisted aggregate records, or None if the store predates them"""
+    path = os.path.join(directory, AGGREGATES_FILE)
+    if not os.path.exists(path):
+        return None
+    return np.fromfile(path, dtype=AGGREGATE_RECORD)
+
+
+def write_aggregates(directory: str, records: np.ndarray):
+    _write_atomic(os.path.join(directory, AGGREGATES_FILE),
+                  np.ascontiguousarray(records, dtype=AGGREGATE_RECORD).tobytes())
+
+
+def group_by_day(segments: List[MappedSegment]) -> Dict[int, List[MappedSegment]]:
+    grouped: Dict[int, List[MappedSegment]] = {}
+    for seg in sorted(segments, key=lambda seg: (seg.day, seg.seq)):
+        grouped.setdefault(seg.day, []).append(seg)
+    return grouped
+
+
+def next_seq(segments: List[MappedSegment]) -> int:
+    return max((seg.seq for seg in segments), default=-1) + 1
@@ -0,0 +1,459 @@
+# order_store.py - Columnar order-event store for the ADK analytics tools
+# Append-only order events held in NumPy column buffers, partitioned by UTC day.
+# Flushed days become memory-mapped segments on disk (see order_segments.py).
+
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import order_segments
+from order_segments import MappedSegment
+from rolling_aggregates import RollingAggregates, window_totals, SUM, COUNT
+
+SECONDS_PER_DAY = 86400
+
+# Column layout shared by every partition: (name, dtype)
+ORDER_COLUMNS: Tuple[Tuple[str, Any], ...] = (
+    ("timestamp", np.int64),     # epoch seconds, UTC
+    ("order_id", np.int64),
+    ("customer_id", np.int64),
+    ("category", np.int16),      # code into OrderEventStore.categories
+    ("amount", np.float64),
+)
+
+DEMO_CATEGORIES = ["Electronics", "Clothing", "Books", "Home"]
+
+# Bucket widths for downsampled series; weeks start on Monday
+GRANULARITY_SECONDS = {"hour": 3600, "day": SECONDS_PER_DAY, "week": 7 * SECONDS_PER_DAY}
+_BUCKET_OFFSET = {"hour": 0, "day": 0, "week": 3 * SECONDS_PER_DAY}  # 1970-01-01 was a Thursday
+
+
+def day_of(timestamp: float) -> int:
+    """Return the UTC day number (days since epoch) for a timestamp"""
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def bucket_start(timestamp: int, granularity: str) -> int:
+    """Start of the hour/day/week bucket containing timestamp"""
+    width, offset = GRANULARITY_SECONDS[granularity], _BUCKET_OFFSET[granularity]
+    return (int(timestamp) + offset) // width * width - offset
+
+
+def current_day() -> int:
+    """Return today's UTC day number"""
+    return day_of(time.time())
+
+
+# =============================================================================
+# DAY PARTITIONS
+# =============================================================================
+
+class DayPartition:
+    """Growable column buffers holding one UTC day of order events"""
+
+    __slots__ = ("day", "size", "_buffers")
+
+    def __init__(self, day: int, capacity: int = 256):
+        self.day = day
+        self.size = 0
+        self._buffers = {name: np.empty(capacity, dtype=dtype) for name, dtype in ORDER_COLUMNS}
+
+    def _reserve(self, extra: int):
+        capacity = len(self._buffers["timestamp"])
+        needed = self.size + extra
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, buffer in self._buffers.items():
+            grown = np.empty(capacity, dtype=buffer.dtype)
+            grown[:self.size] = buffer[:self.size]
+            self._buffers[name] = grown
+
+    def append(self, columns: Dict[str, np.ndarray]):
+        """Append equally sized column arrays to the end of the partition"""
+        rows = len(columns["timestamp"])
+        self._reserve(rows)
+        for name, _ in ORDER_COLUMNS:
+            self._buffers[name][self.size:self.size + rows] = columns[name]
+        self.size += rows
+
+    def append_row(self, row: Tuple):
+        """Append a single event given in ORDER_COLUMNS order"""
+        self._reserve(1)
+        for (name, _), value in zip(ORDER_COLUMNS, row):
+            self._buffers[name][self.size] = value
+        self.size += 1
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of a single column"""
+        view = self._buffers[name][:self.size]
+        view.flags.writeable = False
+        return view
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        return {name: self.column(name) for name, _ in ORDER_COLUMNS}
+
+
+# =============================================================================
+# ORDER EVENT STORE
+# =============================================================================
+
+class OrderEventStore:
+    """Append-only columnar store of order events, partitioned by day
+
+    With a ``data_dir`` the store opens the persisted segment index on start-up
+    and ``flush()`` turns in-memory day partitions into memory-mapped segments.
+    ``aggregates`` is kept current on every append, so window summaries never
+    rescan orders.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None):
+        self.data_dir = data_dir
+        self.categories: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._partitions: Dict[int, DayPartition] = {}
+        self._segments: Dict[int, List[MappedSegment]] = {}
+        self.aggregates = RollingAggregates()
+        self.version = 0
+        # Set by seed_demo_orders(); results from such a store describe made-up orders
+        self.synthetic = False
+
+        if data_dir and os.path.isdir(data_dir):
+            for name in order_segments.read_categories(data_dir):
+                self.category_code(name)
+            self._segments = order_segments.group_by_day(order_segments.read_index(data_dir))
+            records = order_segments.read_aggregates(data_dir)
+            if records is not None:
+                self.aggregates = RollingAggregates.from_records(records, len(self.categories))
+            elif self._segments:
+                self._rebuild_aggregates()
+
+    def _rebuild_aggregates(self):
+        # One-off scan for stores written before aggregates.bin existed
+        self.aggregates = RollingAggregates(len(self.categories))
+        for day, segments in self._segments.items():
+            for seg in segments:
+                self.aggregates.update_batch(day, seg.column("category"), seg.column("amount"))
+        order_segments.write_aggregates(self.data_dir, self.aggregates.to_records())
+
+    def __len__(self) -> int:
+        return (sum(partition.size for partition in self._partitions.values())
+                + sum(seg.size for segs in self._segments.values() for seg in segs))
+
+    def category_code(self, name: str) -> int:
+        """Return the integer code for a category, registering it if new"""
+        code = self._category_codes.get(name)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(name)
+            self._category_codes[name] = code
+        return code
+
+    def _encode_categories(self, categories) -> np.ndarray:
+        categories = np.asarray(categories)
+        if categories.dtype.kind in "iu":
+            if len(categories) and (categories.min() < 0 or categories.max() >= len(self.categories)):
+                raise ValueError("Category codes must be registered with category_code() first")
+            return categories.astype(np.int16, copy=False)
+        names, inverse = np.unique(categories, return_inverse=True)
+        codes = np.array([self.category_code(str(name)) for name in names], dtype=np.int16)
+        return codes[inverse]
+
+    def append(self, timestamp: float, order_id: int, customer_id: int,
+               category: str, amount: float):
+        """Append a single order event in O(1)"""
+        day = day_of(timestamp)
+        code = self.category_code(category)
+        self._partition(day).append_row((timestamp, order_id, customer_id, code, amount))
+        self.aggregates.update(day, code, amount)
+        self.version += 1
+
+    def append_batch(self, timestamps: Sequence, order_ids: Sequence, customer_ids: Sequence,
+                     categories: Sequence, amounts: Sequence) -> int:
+        """Append a batch of order events; categories may be names or codes"""
+        columns = {
+            "timestamp": np.asarray(timestamps, dtype=np.int64),
+            "order_id": np.asarray(order_ids, dtype=np.int64),
+            "customer_id": np.asarray(customer_ids, dtype=np.int64),
+            "category": self._encode_categories(categories),
+            "amount": np.asarray(amounts, dtype=np.float64),
+        }
+        rows = len(columns["timestamp"])
+        if any(len(column) != rows for column in columns.values()):
+            raise ValueError("All order columns must have the same length")
+        if rows == 0:
+            return 0
+
+        days = columns["timestamp"] // SECONDS_PER_DAY
+        if days[0] == days[-1] and (days == days[0]).all():
+            self._append_day(int(days[0]), columns)
+        else:
+            order = np.argsort(days, kind="stable")
+            days = days[order]
+            bounds = np.flatnonzero(np.diff(days)) + 1
+            for start, stop in zip(np.r_[0, bounds], np.r_[bounds, rows]):
+                rows_slice = order[start:stop]
+                self._append_day(int(days[start]),
+                                 {name: column[rows_slice] for name, column in columns.items()})
+
+        self.version += 1
+        return rows
+
+    def _append_day(self, day: int, columns: Dict[str, np.ndarray]):
+        self._partition(day).append(columns)
+        self.aggregates.update_batch(day, columns["category"], columns["amount"])
+
+    def _partition(self, day: int) -> DayPartition:
+        partition = self._partitions.get(day)
+        if partition is None:
+            partition = self._partitions[day] = DayPartition(day)
+        return partition
+
+    def days(self) -> List[int]:
+        """Sorted list of days that hold at least one order"""
+        return sorted(set(self._partitions) | set(self._segments))
+
+    def partitions(self, start_day: int, end_day: int) -> List[Union[MappedSegment, DayPartition]]:
+        """Segments and in-memory partitions within [start_day, end_day], in day order"""
+        start_ts, end_ts = start_day * SECONDS_PER_DAY, (end_day + 1) * SECONDS_PER_DAY
+        parts: List[Union[MappedSegment, DayPartition]] = []
+        for day in self.days():
+            if not start_day <= day <= end_day:
+                continue
+            parts.extend(seg for seg in self._segments.get(day, ()) if seg.overlaps(start_ts, end_ts))
+            if day in self._partitions:
+                parts.append(self._partitions[day])
+        return parts
+
+    def day_size(self, day: int) -> int:
+        """Orders stored for one day, across segments and the in-memory partition"""
+        partition = self._partitions.get(day)
+        return sum(seg.size for seg in self._segments.get(day, ())) + (partition.size if partition else 0)
+
+    def read_day(self, day: int, start: int = 0, stop: Optional[int] = None,
+                 columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Rows [start, stop) of one day in append order
+
+        A row keeps its position when flush() moves it into a segment, so
+        offsets into a day make a stable checkpoint for delta reads.
+        """
+        names = list(columns) if columns else [name for name, _ in ORDER_COLUMNS]
+        parts: List[Union[MappedSegment, DayPartition]] = list(self._segments.get(day, ()))
+        if day in self._partitions:
+            parts.append(self._partitions[day])
+        stop = self.day_size(day) if stop is None else stop
+        pieces: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        offset = 0
+        for part in parts:
+            lo, hi = max(start - offset, 0), min(stop - offset, part.size)
+            if lo < hi:
+                for name in names:
+                    pieces[name].append(part.column(name)[lo:hi])
+            offset += part.size
+        dtypes = dict(ORDER_COLUMNS)
+        return {name: np.concatenate(pieces[name]) if pieces[name] else np.empty(0, dtype=dtypes[name])
+                for name in names}
+
+    def flush(self) -> int:
+        """Persist in-memory partitions as new segments; returns rows written"""
+        if not self.data_dir:
+            raise ValueError("flush() requires an OrderEventStore created with data_dir")
+        if not self._partitions:
+            return 0
+        os.makedirs(self.data_dir, exist_ok=True)
+        order_segments.write_categories(self.data_dir, self.categories)
+
+        written = 0
+        for day, partition in sorted(self._partitions.items()):
+            existing = self._segments.setdefault(day, [])
+            segment = order_segments.write_segment(
+                self.data_dir, day, order_segments.next_seq(existing), partition.columns())
+            existing.append(segment)
+            written += segment.size
+
+        order_segments.write_index(
+            self.data_dir, [seg for segs in self._segments.values() for seg in segs])
+        order_segments.write_aggregates(self.data_dir, self.aggregates.to_records())
+        self._partitions = {}
+        return written
+
+    def scan(self, start_day: int, end_day: int,
+             columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Concatenate the requested columns for all orders in [start_day, end_day]"""
+        names = list(columns) if columns else [name for name, _ in ORDER_COLUMNS]
+        parts = self.partitions(start_day, end_day)
+        dtypes = dict(ORDER_COLUMNS)
+        return {
+            name: (np.concatenate([part.column(name) for part in parts])
+                   if parts else np.empty(0, dtype=dtypes[name]))
+            for name in names
+        }
+
+    def customer_activity(self, start_day: int, end_day: int) -> Dict[str, np.ndarray]:
+        """Per-customer spend, order count and last order time over [start_day, end_day]"""
+        orders = self.scan(start_day, end_day, ("customer_id", "amount", "timestamp"))
+        customer_ids, inverse = np.unique(orders["customer_id"], return_inverse=True)
+        last_order = np.full(len(customer_ids), np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(last_order, inverse, orders["timestamp"])
+        return {
+            "customer_id": customer_ids,
+            "spend": np.bincount(inverse, weights=orders["amount"], minlength=len(customer_ids)),
+            "frequency": np.bincount(inverse, minlength=len(customer_ids)),
+            "last_order": last_order,
+        }
+
+    def sales_summary(self, start_day: int, end_day: int) -> Dict[str, Any]:
+        """Revenue summary over [start_day, end_day] from the rolling aggregates"""
+        daily, by_category = window_totals(self.aggregates.window(start_day, end_day))
+        category_sales = by_category[:len(self.categories), SUM]
+        ranked = np.argsort(-category_sales, kind="stable")
+        return {
+            "total_sales": float(daily[:, SUM].sum()),
+            "transactions": int(daily[:, COUNT].sum()),
+            "daily_sales": daily[:, SUM],
+            "daily_orders": daily[:, COUNT].astype(np.int64),
+            "category_sales": {self.categories[i]: float(category_sales[i]) for i in ranked},
+            "top_categories": [self.categories[i] for i in ranked if category_sales[i] > 0],
+        }
+
+    def sales_series(self, start: int, end: int, granularity: str = "day") -> Dict[str, np.ndarray]:
+        """Sales and order counts per bucket over [start, end), both bucket-aligned
+
+        Day and week buckets are summed from the rolling aggregates; hour
+        buckets scan only the day partitions that overlap the range.
+        """
+        width = GRANULARITY_SECONDS[granularity]
+        if bucket_start(start, granularity) != start or bucket_start(end, granularity) != end:
+            raise ValueError(f"Range must be aligned to {granularity} buckets")
+        buckets = max((end - start) // width, 0)
+        if buckets == 0:
+            sales, orders = np.zeros(0), np.zeros(0, dtype=np.int64)
+        elif granularity == "hour":
+            rows = self.scan(day_of(start), day_of(end - 1), ("timestamp", "amount"))
+            in_range = (rows["timestamp"] >= start) & (rows["timestamp"] < end)
+            index = (rows["timestamp"][in_range] - start) // width
+            sales = np.bincount(index, weights=rows["amount"][in_range], minlength=buckets)
+            orders = np.bincount(index, minlength=buckets)
+        else:
+            daily, _ = window_totals(self.aggregates.window(day_of(start), day_of(end - 1)))
+            per_bucket = width // SECONDS_PER_DAY
+            sales = daily[:, SUM].reshape(buckets, per_bucket).sum(axis=1)
+            orders = daily[:, COUNT].reshape(buckets, per_bucket).sum(axis=1).astype(np.int64)
+        return {
+            "bucket_start": start + np.arange(buckets, dtype=np.int64) * width,
+            "sales": np.round(sales, 2),
+            "orders": orders.astype(np.int64),
+        }
+
+
+# =============================================================================
+# DEFAULT STORE
+# =============================================================================
+
+DEFAULT_TENANT = "default"
+
+# Set to 1 to fill empty in-memory stores with synthetic demo history
+DEMO_DATA_ENV = "ADK_DEMO_DATA"
+
+_stores: Dict[str, OrderEventStore] = {}
+_stores_lock = threading.Lock()
+_demo_data: Optional[bool] = None
+
+
+def demo_data_enabled() -> bool:
+    if _demo_data is not None:
+        return _demo_data
+    return os.environ.get(DEMO_DATA_ENV, "").lower() in ("1", "true", "yes")
+
+
+def set_demo_data(enabled: Optional[bool]):
+    """Turn demo seeding on or off for this process; None defers to ADK_DEMO_DATA"""
+    global _demo_data
+    _demo_data = enabled
+
+
+def seed_demo_orders(store: OrderEventStore, days: int = 90, orders_per_day: int = 40,
+                     customers: int = 600, end_day: Optional[int] = None,
+                     seed: Optional[int] = None) -> int:
+    """Fill a store with synthetic order history for demos (see synthetic_data.py)
+
+    Orders are generated up to the current time; the rest of today stays empty.
+    """
+    from synthetic_data import SyntheticOrderGenerator
+
+    generator = SyntheticOrderGenerator(seed, orders_per_day=orders_per_day, customers=customers)
+    end_day = current_day() if end_day is None else end_day
+    columns = generator.generate(end_day - days + 1, end_day)
+    happened = columns["timestamp"] <= int(time.time())
+    store.synthetic = True
+    codes = np.array([store.category_code(name) for name in generator.categories], dtype=np.int16)
+    return store.append_batch(columns["timestamp"][happened], columns["order_id"][happened],
+                              columns["customer_id"][happened], codes[columns["category"][happened]],
+                              columns["amount"][happened])
+
+
+def tenant_data_dir(tenant_id: str) -> Optional[str]:
+    """Directory holding a tenant's segments under ADK_ORDER_STORE_DIR, if set"""
+    data_dir = os.environ.get("ADK_ORDER_STORE_DIR")
+    if not data_dir or tenant_id == DEFAULT_TENANT:
+        return data_dir
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+", tenant_id) or tenant_id.strip(".") == "":
+        raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+    return os.path.join(data_dir, "tenants", tenant_id)
+
+
+def get_order_store(tenant_id: str = DEFAULT_TENANT) -> OrderEventStore:
+    """Return a tenant's process-wide order store
+
+    Set ADK_ORDER_STORE_DIR to keep order history on disk between runs. Stores
+    start empty; with demo data enabled (ADK_DEMO_DATA=1 or set_demo_data(True))
+    an empty in-memory store is filled with synthetic history. Stores on disk are
+    never seeded, so synthetic orders can never be flushed as real ones; use
+    synthetic_data.py to write a demo directory instead.
+    """
+    store = _stores.get(tenant_id)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(tenant_id)
+            if store is None:
+                data_dir = tenant_data_dir(tenant_id)
+                store = OrderEventStore(data_dir)
+                if len(store) == 0 and data_dir is None and demo_data_enabled():
+                    seed_demo_orders(store)
+                _stores[tenant_id] = store
+    return store
+
+
+def find_order_store(tenant_id: str = DEFAULT_TENANT) -> Optional[OrderEventStore]:
+    """A tenant's store if it is loaded, is the default tenant or exists on disk; never creates one
+
+    For request handlers, where the tenant id comes from the client: an unknown
+    id returns None instead of leaving a new store behind.
+    """
+    store = _stores.get(tenant_id)
+    if store is not None or tenant_id == DEFAULT_TENANT:
+        return store or get_order_store(tenant_id)
+    try:
+        data_dir = tenant_data_dir(tenant_id)
+    except ValueError:
+        return None
+    if data_dir is None or not os.path.isdir(data_dir):
+        return None
+    return get_order_store(tenant_id)
+
+
+def reset_order_stores():
+    """Forget every loaded store so the next access re-reads it from disk"""
+    with _stores_lock:
+        _stores.clear()
+
+
+def set_order_store(store: OrderEventStore, tenant_id: str = DEFAULT_TENANT):
+    """Replace a tenant's order store (e.g. with real order history)"""
+    with _stores_lock:
+        _stores[tenant_id] = store
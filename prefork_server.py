@@ -0,0 +1,171 @@
+# prefork_server.py - Pre-fork process supervisor for multi-core serving
+# The parent loads shared read-only data once, then forks N workers that each
+# bind their own SO_REUSEPORT socket so the kernel spreads connections across
+# them. SIGHUP reloads gracefully: a fresh generation is forked from freshly
+# loaded data before the old workers are told to drain and exit.
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+
+# A worker that dies this soon after starting is treated as a startup failure
+# (e.g. port unavailable) rather than respawned in a tight loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+def reuseport_socket(host: str, port: int, backlog: int = 1024) -> socket.socket:
+    """Listening TCP socket that other processes can bind to the same port"""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+    # An explicit IPPROTO_TCP lets asyncio enable TCP_NODELAY on accepted sockets
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+class PreforkServer:
+    """Supervises `processes` workers running ``serve(sock)`` on a shared port
+
+    ``preload`` runs in the parent before every generation is forked; whatever
+    it loads is inherited copy-on-write by the workers. ``tick`` runs in the
+    parent on every supervision pass (a few times a second). ``serve`` must
+    return once the worker receives SIGTERM and has drained its connections.
+    """
+
+    def __init__(self, serve: Callable[[socket.socket], None], port: int = 8080,
+                 processes: Optional[int] = None, host: str = "",
+                 preload: Optional[Callable[[], None]] = None,
+                 tick: Optional[Callable[[], None]] = None, drain_timeout: float = 10.0):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Pre-fork mode needs os.fork (POSIX only)")
+        self.serve = serve
+        self.port = port
+        self.host = host
+        self.processes = processes or os.cpu_count() or 1
+        self.preload = preload
+        self.tick = tick
+        self.drain_timeout = drain_timeout
+        self.generation = 0
+        self._workers: Dict[int, tuple] = {}  # pid -> (generation, started_at)
+        self._reload = False
+        self._stop = False
+
+    # =========================================================================
+    # WORKERS
+    # =========================================================================
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            self._workers[pid] = (self.generation, time.monotonic())
+            return pid
+
+        # Child: drop the parent's handlers and serve until told to drain
+        code = 0
+        try:
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self.serve(reuseport_socket(self.host, self.port))
+        except KeyboardInterrupt:
+            pass
+        except BaseException as e:
+            print(f"❌ Worker {os.getpid()} failed: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _start_generation(self):
+        gc.unfreeze()
+        if self.preload:
+            self.preload()
+        # Keep the GC from touching inherited objects, which would copy their pages
+        gc.collect()
+        gc.freeze()
+        self.generation += 1
+        for _ in range(self.processes):
+            self._spawn()
+        print(f"👷 Generation {self.generation}: {self.processes} workers on port {self.port}")
+
+    def _signal_workers(self, sig: int, generation: Optional[int] = None):
+        for pid, (worker_generation, _) in list(self._workers.items()):
+            if generation is None or worker_generation == generation:
+                try:
+                    os.kill(pid, sig)
+                except ProcessLookupError:
+                    pass
+
+    def _reap(self) -> bool:
+        """Collect exited workers and respawn current ones; False on startup failure"""
+        while self._workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._workers.clear()
+                break
+            if pid == 0:
+                break
+            generation, started_at = self._workers.pop(pid, (None, 0.0))
+            if generation != self.generation or self._stop:
+                continue  # Retired by a reload or shutdown
+            if time.monotonic() - started_at < MIN_WORKER_LIFETIME:
+                return False
+            print(f"⚠️ Worker {pid} exited (status {status}), respawning")
+            self._spawn()
+        return True
+
+    # =========================================================================
+    # SUPERVISION
+    # =========================================================================
+
+    def _on_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._reload = True
+        else:
+            self._stop = True
+
+    def run(self):
+        """Fork the first generation and supervise until SIGINT/SIGTERM"""
+        for sig in (signal.SIGHUP, signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, self._on_signal)
+        self._start_generation()
+
+        while not self._stop:
+            if self._reload:
+                self._reload = False
+                retiring = self.generation
+                self._start_generation()
+                self._signal_workers(signal.SIGTERM, retiring)
+                print(f"🔄 Reloaded: generation {retiring} draining")
+            if not self._reap():
+                print("❌ Workers exited during startup; stopping")
+                self._stop = True
+                break
+            if self.tick:
+                self.tick()
+            time.sleep(0.2)
+
+        self.stop()
+
+    def stop(self):
+        """Ask every worker to drain, then kill any that outlive the drain timeout"""
+        self._stop = True
+        self._signal_workers(signal.SIGTERM)
+        deadline = time.monotonic() + self.drain_timeout + 1.0
+        while self._workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        self._signal_workers(signal.SIGKILL)
+        for pid in list(self._workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self._workers.clear()
@@ -0,0 +1,187 @@
+# pricing_simulator.py - Price elasticity estimates and revenue what-if grids
+# Per-category elasticities come from a log-log fit of daily order volume on
+# average order value, shrunk toward a prior when the history is noisy. Every
+# (category, segment, adjustment) cell is then projected in one NumPy pass.
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from rolling_aggregates import SUM, COUNT
+
+# Typical retail own-price elasticity and how far we let the data move it
+PRIOR_ELASTICITY = -1.2
+PRIOR_SD = 0.5
+ELASTICITY_BOUNDS = (-4.0, -0.2)
+
+# Candidate price changes: -20% .. +20% in 1% steps
+DEFAULT_ADJUSTMENTS = np.round(np.arange(-20, 21) / 100, 2)
+
+# Segment sensitivity is scaled by relative order value, within these limits
+SENSITIVITY_BOUNDS = (0.5, 2.0)
+
+# A +10% price rise lifts the affected segment's churn rate by 20% of itself
+CHURN_PRICE_SENSITIVITY = 2.0
+
+
+def estimate_elasticities(sales: np.ndarray, orders: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(elasticity, standard error) per column of (days, categories) sales/orders
+
+    Fits log(orders) = a + e * log(sales / orders) per category with days that
+    have no orders masked out, then combines the fit with the prior by
+    precision weighting. Categories with too little data return the prior.
+    """
+    observed, price, volume = daily_log_points(sales, orders)
+    weight = observed.astype(np.float64)
+
+    n = weight.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_price = (weight * price).sum(axis=0) / n
+        mean_volume = (weight * volume).sum(axis=0) / n
+        dp = np.where(observed, price - mean_price, 0.0)
+        dv = np.where(observed, volume - mean_volume, 0.0)
+        sxx = (dp * dp).sum(axis=0)
+        slope = (dp * dv).sum(axis=0) / sxx
+        residual = ((dv - slope * dp) ** 2).sum(axis=0) / (n - 2)
+    return posterior_elasticity(n, sxx, slope, residual)
+
+
+def daily_log_points(sales: np.ndarray, orders: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(observed, log price, log volume) per cell of (days, categories) sales/orders"""
+    observed = orders > 0
+    safe_orders = np.where(observed, orders, 1.0)
+    return observed, np.log(np.where(observed, sales / safe_orders, 1.0)), np.log(safe_orders)
+
+
+def elasticities_from_moments(moments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """estimate_elasticities() from running sums instead of the daily history
+
+    `moments` is (6, categories): n, sum p, sum v, sum p*p, sum p*v, sum v*v of
+    the observed (log price, log volume) points, so days can be added and
+    removed from a window in O(categories).
+    """
+    n, sp, sv, spp, spv, svv = moments
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sxx = spp - sp * sp / n
+        sxy = spv - sp * sv / n
+        syy = svv - sv * sv / n
+        slope = sxy / sxx
+        residual = np.maximum(syy - slope * sxy, 0.0) / (n - 2)
+    return posterior_elasticity(n, sxx, slope, residual)
+
+
+def posterior_elasticity(n: np.ndarray, sxx: np.ndarray, slope: np.ndarray,
+                         residual: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Precision-weighted blend of fitted slopes with the prior; (elasticity, standard error)"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = residual / sxx
+    usable = (n > 2) & (sxx > 0) & np.isfinite(variance) & (variance > 0)
+    precision = np.where(usable, 1.0 / np.where(usable, variance, 1.0), 0.0)
+    prior_precision = 1.0 / PRIOR_SD ** 2
+    posterior = ((precision * np.where(usable, slope, 0.0) + prior_precision * PRIOR_ELASTICITY)
+                 / (precision + prior_precision))
+    return np.clip(posterior, *ELASTICITY_BOUNDS), np.sqrt(1.0 / (precision + prior_precision))
+
+
+def segment_sensitivity(segments: Dict[str, Dict[str, Any]]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """(names, revenue shares, elasticity multipliers) for customer segments
+
+    Segments with a lower average order value than the customer base are
+    treated as more price sensitive, and higher-value segments as less.
+    """
+    names = [name for name, seg in segments.items() if seg.get("count", 0) > 0]
+    if not names:
+        return ["all"], np.ones(1), np.ones(1)
+    revenue = np.array([float(segments[name].get("revenue", 0.0)) for name in names])
+    avg_value = np.array([float(segments[name].get("avg_value", 0.0)) for name in names])
+    counts = np.array([float(segments[name]["count"]) for name in names])
+    shares = revenue / revenue.sum() if revenue.sum() > 0 else counts / counts.sum()
+    overall = np.average(avg_value, weights=counts) if avg_value.any() else 1.0
+    scale = np.clip(overall / np.where(avg_value > 0, avg_value, overall), *SENSITIVITY_BOUNDS)
+    return names, shares, scale
+
+
+def revenue_multiplier(adjustments: np.ndarray, elasticity: np.ndarray, churn_rate) -> np.ndarray:
+    """Revenue after a price change as a multiple of today's, broadcast over the inputs
+
+    Demand is taken as linear around today's price with slope set by the
+    point elasticity e: a price change of a scales volume by (1 + e * a).
+    Price rises also lose churn_rate * CHURN_PRICE_SENSITIVITY * a of the
+    segment's customers. The ranking and the Monte Carlo engine both use this.
+    """
+    volume = np.maximum(1.0 + elasticity * adjustments, 0.0)
+    retained = 1.0 - churn_rate * CHURN_PRICE_SENSITIVITY * np.maximum(adjustments, 0.0)
+    return (1.0 + adjustments) * volume * retained
+
+
+def project_revenue(base_revenue: np.ndarray, elasticity: np.ndarray,
+                    adjustments: np.ndarray, churn_rate: float = 0.0) -> np.ndarray:
+    """Revenue change for every cell under every price adjustment
+
+    See revenue_multiplier(); without churn, revenue peaks at a = -(1 + e) / (2e).
+    The result has shape base_revenue.shape + (len(adjustments),).
+    """
+    return base_revenue[..., None] * (revenue_multiplier(adjustments, elasticity[..., None], churn_rate) - 1.0)
+
+
+def top_actions(delta: np.ndarray, adjustments: np.ndarray, k: int) -> List[Tuple[int, int, int, float]]:
+    """Best adjustment per (item, segment), then the k largest gains overall"""
+    best = delta.argmax(axis=-1)
+    gain = np.take_along_axis(delta, best[..., None], axis=-1)[..., 0]
+    # A zero adjustment is "do nothing", and a loss is no recommendation; leave those cells out
+    gain = np.where((adjustments[best] != 0) & (gain > 0), gain, -np.inf)
+    flat = gain.ravel()
+    k = min(k, int(np.isfinite(flat).sum()))
+    if k == 0:
+        return []
+    picked = np.argpartition(-flat, k - 1)[:k]
+    picked = picked[np.argsort(-flat[picked], kind="stable")]
+    items, segs = np.unravel_index(picked, gain.shape)
+    return [(int(i), int(s), int(best[i, s]), float(flat[p])) for i, s, p in zip(items, segs, picked)]
+
+
+def simulate_pricing(window: np.ndarray, categories: Sequence[str],
+                     segments: Dict[str, Dict[str, Any]],
+                     adjustments: np.ndarray = DEFAULT_ADJUSTMENTS, top_k: int = 5,
+                     churn_rate: float = 0.0) -> Dict[str, Any]:
+    """Rank price changes by projected revenue from a (days, categories, fields) aggregate window
+
+    `churn_rate` is the share of customers at risk; price rises lose part of it.
+    """
+    window = window[:, :len(categories)]
+    sales, orders = window[:, :, SUM], window[:, :, COUNT]
+    elasticity, std_error = estimate_elasticities(sales, orders)
+    return rank_price_changes(sales.sum(axis=0), elasticity, std_error, categories, segments,
+                              adjustments, top_k, churn_rate)
+
+
+def rank_price_changes(category_revenue: np.ndarray, elasticity: np.ndarray, std_error: np.ndarray,
+                       categories: Sequence[str], segments: Dict[str, Dict[str, Any]],
+                       adjustments: np.ndarray = DEFAULT_ADJUSTMENTS, top_k: int = 5,
+                       churn_rate: float = 0.0) -> Dict[str, Any]:
+    """simulate_pricing() given per-category revenue and elasticity estimates"""
+    segment_names, shares, scale = segment_sensitivity(segments)
+
+    base = category_revenue[:, None] * shares[None, :]
+    cell_elasticity = np.clip(elasticity[:, None] * scale[None, :], *ELASTICITY_BOUNDS)
+    delta = project_revenue(base, cell_elasticity, adjustments, churn_rate)
+
+    actions = []
+    for item, seg, adj, gain in top_actions(delta, adjustments, top_k):
+        actions.append({
+            "category": categories[item],
+            "segment": segment_names[seg],
+            "adjustment": float(adjustments[adj]),
+            "elasticity": round(float(cell_elasticity[item, seg]), 3),
+            "elasticity_sd": round(float(std_error[item] * scale[seg]), 3),
+            "base_revenue": round(float(base[item, seg]), 2),
+            "revenue_delta": round(gain, 2),
+        })
+    return {
+        "actions": actions,
+        "elasticities": {name: round(float(e), 3) for name, e in zip(categories, elasticity)},
+        "elasticity_std_error": {name: round(float(se), 3) for name, se in zip(categories, std_error)},
+        "base_revenue": round(float(category_revenue.sum()), 2),
+        "category_revenue": category_revenue,
+        "combinations_evaluated": int(delta.size),
+    }
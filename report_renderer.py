@@ -0,0 +1,465 @@
+# report_renderer.py - Precompiled, streaming HTML renderer for the demo dashboard
+# The report template is compiled once, on first use, into a Python generator
+# with HTML escaping built in, and rendered as ~64KB chunks that can go straight
+# to a file or socket. Batch mode renders many tenants' reports in parallel.
+#
+#   python report_renderer.py --tenants 200 --out reports/ --processes 8
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import time
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from html import escape
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+_TAG = re.compile(r"\{\{\s*(.+?)\s*\}\}|\{%\s*(.+?)\s*%\}", re.S)
+_FOR = re.compile(r"for\s+(\w+(?:\s*,\s*\w+)*)\s+in\s+([\w.]+)$")
+
+
+class TemplateError(ValueError):
+    """Malformed template source"""
+
+
+# =============================================================================
+# TEMPLATE COMPILER
+# =============================================================================
+
+def _lookup(path: str, bound: Set[str]) -> str:
+    """Python expression for a dotted path of mapping keys / list indexes"""
+    first, *rest = path.split(".")
+    expression = f"v_{first}" if first in bound else f"scope[{first!r}]"
+    for part in rest:
+        expression += f"[{int(part)}]" if part.isdigit() else f"[{part!r}]"
+    return expression
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("_", " ").title()
+
+
+# {{ path|name }} filters, applied before escaping
+FILTERS = {"label": "_label", "len": "len"}
+
+
+def _field(expression: str, bound: Set[str]) -> str:
+    """{{ path[:format_spec][|filter...] }} as Python source; |raw skips escaping"""
+    path, *filters = [part.strip() for part in expression.split("|")]
+    path, _, spec = path.partition(":")
+    value = _lookup(path.strip(), bound)
+    for name in filters:
+        if name not in FILTERS and name != "raw":
+            raise TemplateError(f"Unknown template filter: {name!r}")
+        if name in FILTERS:
+            value = f"{FILTERS[name]}({value})"
+    if spec:
+        value = f"format({value}, {spec!r})"
+    return f"str({value})" if "raw" in filters else f"escape(str({value}))"
+
+
+def _compile(source: str) -> Tuple[str, Callable[[Dict[str, Any]], Iterator[str]]]:
+    """Translate a template into a generator function yielding one string per block"""
+    lines = ["def render(scope):"]
+    parts: List[str] = []
+    bound: List[Set[str]] = [set()]
+
+    def flush():
+        if parts:
+            lines.append(f"{'    ' * len(bound)}yield ''.join(({', '.join(parts)},))")
+            parts.clear()
+
+    position = 0
+    for match in _TAG.finditer(source):
+        if match.start() > position:
+            parts.append(repr(source[position:match.start()]))
+        position = match.end()
+        field, statement = match.groups()
+        if field is not None:
+            parts.append(_field(field, bound[-1]))
+            continue
+        flush()
+        if statement == "endfor":
+            if len(bound) == 1:
+                raise TemplateError("{% endfor %} without a matching {% for %}")
+            bound.pop()
+            continue
+        loop = _FOR.match(statement)
+        if loop is None:
+            raise TemplateError(f"Unsupported template statement: {statement!r}")
+        names = [name.strip() for name in loop.group(1).split(",")]
+        targets = ", ".join(f"v_{name}" for name in names)
+        lines.append(f"{'    ' * len(bound)}for {targets} in {_lookup(loop.group(2), bound[-1])}:")
+        bound.append(bound[-1] | set(names))
+    if len(bound) > 1:
+        raise TemplateError("Unclosed {% for %} block")
+    if position < len(source):
+        parts.append(repr(source[position:]))
+    flush()
+    lines.append("    return")
+
+    code = "\n".join(lines)
+    namespace = {"escape": escape, "_label": _label}
+    exec(compile(code, "<template>", "exec"), namespace)
+    return code, namespace["render"]
+
+
+class Template:
+    """A template compiled once and rendered many times
+
+    Supports ``{{ path }}`` (HTML-escaped), ``{{ path:format_spec }}``,
+    ``{{ path|label }}``, ``{{ path|len }}``, ``{{ path|raw }}`` and
+    ``{% for a[, b] in path %}...{% endfor %}``, where a path is dotted mapping
+    keys or list indexes. The source is compiled to a
+    Python generator function, kept in ``code`` for debugging.
+    """
+
+    def __init__(self, source: str):
+        self.code, self._render = _compile(source)
+
+    def generate(self, context: Dict[str, Any], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+        """Rendered output in chunks of roughly chunk_size characters"""
+        buffer: List[str] = []
+        size = 0
+        for piece in self._render(context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= chunk_size:
+                yield "".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield "".join(buffer)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        return "".join(self._render(context))
+
+
+# =============================================================================
+# DEMO REPORT
+# =============================================================================
+
+REPORT_SOURCE = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>ADK Multi-Agent E-commerce Analytics</title>
+    <style>
+        body {
+            font-family: 'Google Sans', Arial, sans-serif;
+            margin: 0; padding: 20px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+        }
+        .container {
+            max-width: 1400px; margin: 0 auto;
+            background: rgba(255,255,255,0.95);
+            padding: 30px; border-radius: 15px;
+            box-shadow: 0 20px 40px rgba(0,0,0,0.1);
+        }
+        .header {
+            text-align: center; margin-bottom: 40px;
+            background: linear-gradient(45deg, #1a73e8, #34a853);
+            -webkit-background-clip: text; -webkit-text-fill-color: transparent;
+        }
+        .adk-badge {
+            display: inline-block; background: #1a73e8; color: white;
+            padding: 8px 16px; border-radius: 20px; font-size: 14px;
+            margin: 10px 5px; font-weight: 500;
+        }
+        .agent-grid {
+            display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 20px; margin: 30px 0;
+        }
+        .agent-card {
+            background: linear-gradient(135deg, #667eea, #764ba2);
+            color: white; padding: 25px; border-radius: 12px;
+            box-shadow: 0 8px 25px rgba(0,0,0,0.15);
+        }
+        .metric-box {
+            background: #f8f9fa; padding: 20px; margin: 15px 0;
+            border-radius: 10px; border-left: 5px solid #34a853;
+        }
+        .recommendation-item {
+            background: #fff3cd; padding: 15px; margin: 10px 0;
+            border-radius: 8px; border-left: 4px solid #ffc107;
+        }
+        .insight-tag {
+            display: inline-block; background: #e8f0fe; color: #1a73e8;
+            padding: 6px 12px; margin: 4px; border-radius: 15px;
+            font-size: 13px; font-weight: 500;
+        }
+        .performance-grid {
+            display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
+            gap: 15px; margin: 20px 0;
+        }
+        .performance-card {
+            text-align: center; background: #34a853; color: white;
+            padding: 20px; border-radius: 10px;
+        }
+        .workflow-status {
+            background: #e8f5e8; padding: 20px; border-radius: 10px;
+            border-left: 5px solid #34a853; margin: 20px 0;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🤖 ADK Multi-Agent E-commerce Analytics</h1>
+            <p>Real-time business intelligence through Google Agent Development Kit</p>
+            <div>
+                <span class="adk-badge">ADK v{{ meta.adk_version }}</span>
+                <span class="adk-badge">Model: {{ meta.model_used }}</span>
+                <span class="adk-badge">Agents: {{ meta.agents_orchestrated|len }}</span>
+                <span class="adk-badge">Runtime: {{ meta.execution_time_seconds:.1f }}s</span>
+            </div>
+        </div>
+
+        <div class="workflow-status">
+            <h3>🔄 ADK Workflow Status: COMPLETED</h3>
+            <p><strong>Workflow ID:</strong> {{ meta.workflow_id }}</p>
+            <p><strong>Agents Orchestrated:</strong> {{ agents }}</p>
+            <p><strong>Execution Time:</strong> {{ meta.execution_time_seconds:.2f }} seconds</p>
+        </div>
+
+        <div class="agent-grid">
+            <div class="agent-card">
+                <h3>📊 Data Collection Agent</h3>
+                <p><strong>Revenue Analyzed:</strong> ${{ sales.total_sales:, }}</p>
+                <p><strong>Transactions:</strong> {{ sales.transactions:, }}</p>
+                <p><strong>Average Order:</strong> ${{ sales.avg_order_value }}</p>
+                <p><strong>Categories:</strong> {{ sales.top_categories|len }}</p>
+            </div>
+
+            <div class="agent-card">
+                <h3>👥 Customer Behavior Agent</h3>
+                <p><strong>Segments Identified:</strong> {{ customers.segments|len }}</p>
+                <p><strong>Premium Customers:</strong> {{ premium_customers }}</p>
+                <p><strong>Retention Rate:</strong> {{ customers.overall_retention }}%</p>
+                <p><strong>Churn Risk:</strong> {{ customers.churn_risk_percentage }}%</p>
+            </div>
+
+            <div class="agent-card">
+                <h3>💰 Pricing Strategy Agent</h3>
+                <p><strong>Recommendations:</strong> {{ pricing.recommendations|len }}</p>
+                <p><strong>Revenue Impact:</strong> {{ pricing.total_expected_revenue_impact }}</p>
+                <p><strong>Risk Level:</strong> {{ pricing.risk_assessment }}</p>
+                <p><strong>Priority:</strong> {{ pricing.implementation_priority }}</p>
+            </div>
+
+            <div class="agent-card">
+                <h3>🧠 Business Intelligence Agent</h3>
+                <p><strong>Key Opportunities:</strong> {{ insights.key_opportunities|len }}</p>
+                <p><strong>Action Items:</strong> {{ insights.recommended_actions|len }}</p>
+                <p><strong>Metrics Improved:</strong> {{ insights.business_metrics|len }}</p>
+                <p><strong>Strategy Focus:</strong> Revenue Optimization</p>
+            </div>
+        </div>
+
+        <div class="metric-box">
+            <h3>📈 Business Performance Metrics</h3>
+            <div class="performance-grid">
+{% for metric, value in metric_cards %}
+                <div class="performance-card">
+                    <h4>{{ value }}</h4>
+                    <p>{{ metric|label }}</p>
+                </div>
+{% endfor %}
+            </div>
+        </div>
+
+        <div class="metric-box">
+            <h3>💡 AI-Generated Recommendations</h3>
+{% for rec in pricing.recommendations %}
+            <div class="recommendation-item">
+                <strong>{{ rec.action|label }}</strong> - {{ rec.category }}: {{ rec.adjustment }}<br>
+                <em>Reason: {{ rec.reason }}</em><br>
+                <strong>Expected Impact: {{ rec.expected_impact }}</strong>
+            </div>
+{% endfor %}
+        </div>
+
+        <div class="metric-box">
+            <h3>🎯 Strategic Business Insights</h3>
+            <div>
+{% for insight in insights.key_opportunities %}<span class="insight-tag">{{ insight }}</span>{% endfor %}
+            </div>
+            <h4>Recommended Actions:</h4>
+            <ul>
+{% for action in insights.recommended_actions %}<li>{{ action }}</li>{% endfor %}
+            </ul>
+        </div>
+
+        <div style="text-align: center; margin-top: 40px; padding: 20px; background: #f8f9fa; border-radius: 10px;">
+            <h3>🏆 ADK Multi-Agent System Performance</h3>
+            <p><strong>Total Revenue Analyzed:</strong> ${{ performance.total_revenue_analyzed:, }}</p>
+            <p><strong>Customers Segmented:</strong> {{ performance.customers_segmented:, }}</p>
+            <p><strong>Pricing Strategies:</strong> {{ performance.pricing_recommendations }}</p>
+            <p><strong>Business Opportunities:</strong> {{ performance.business_opportunities }}</p>
+            <br>
+            <p style="color: #666; font-size: 14px;">
+                Built with Google Cloud Agent Development Kit (ADK) |
+                Multi-Agent Orchestration | Real-time Analytics
+            </p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def report_template() -> Template:
+    """The dashboard template, compiled on first use so imports stay cheap"""
+    return Template(REPORT_SOURCE)
+
+
+def _metric_value(value: Any) -> Any:
+    # Monte Carlo intervals are shown as their 90% range
+    if isinstance(value, Mapping) and "p5" in value and "p95" in value:
+        return f"{value['p5']:+.1%} to {value['p95']:+.1%}"
+    return value
+
+
+def report_context(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Template variables for one workflow result"""
+    meta = results["workflow_metadata"]
+    customers = results["customer_intelligence"]
+    return {
+        "meta": meta,
+        "agents": ", ".join(meta["agents_orchestrated"]),
+        "sales": results["sales_analysis"],
+        "customers": customers,
+        "premium_customers": customers["segments"].get("premium", {}).get("count", 0),
+        "pricing": results["pricing_strategy"],
+        "insights": results["business_insights"],
+        "metric_cards": [(metric, _metric_value(value))
+                         for metric, value in results["business_insights"]["business_metrics"].items()],
+        "performance": results["performance_metrics"],
+    }
+
+
+def render_report_chunks(results: Dict[str, Any], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """The demo dashboard for one workflow result, as a generator of HTML chunks"""
+    return report_template().generate(report_context(results), chunk_size)
+
+
+def render_report(results: Dict[str, Any]) -> str:
+    return report_template().render(report_context(results))
+
+
+def write_report(results: Dict[str, Any], target: Union[str, Any]) -> int:
+    """Stream the dashboard to a path or binary writer (file, socket.makefile("wb"))
+
+    Files are written via a temporary name and renamed, so readers never see a
+    partial report. Returns bytes written.
+    """
+    if not isinstance(target, str):
+        written = 0
+        for chunk in render_report_chunks(results):
+            data = chunk.encode("utf-8")
+            target.write(data)
+            written += len(data)
+        return written
+    tmp = f"{target}.tmp"
+    with open(tmp, "wb") as f:
+        written = write_report(results, f)
+    os.replace(tmp, target)
+    return written
+
+
+# =============================================================================
+# BATCH RENDERING
+# =============================================================================
+
+def report_path(out_dir: str, tenant_id: str) -> str:
+    """adk_ecommerce_demo_<tenant>_<hash>.html under out_dir, with a filesystem-safe name
+
+    The short hash of the raw tenant id keeps tenants that sanitise to the same
+    name ("a/b" and "a_b") from overwriting each other's report.
+    """
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", tenant_id).strip(".") or "tenant"
+    digest = hashlib.sha1(tenant_id.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(out_dir, f"adk_ecommerce_demo_{safe}_{digest}.html")
+
+
+def _render_to_file(results: Dict[str, Any], path: str) -> Tuple[str, int]:
+    return path, write_report(results, path)
+
+
+def render_batch(reports: Iterable[Tuple[str, Dict[str, Any]]], out_dir: str,
+                 processes: Optional[int] = None, executor: Optional[Executor] = None) -> Dict[str, str]:
+    """Render (tenant_id, results) pairs in parallel; returns tenant -> file path
+
+    Pass ``executor`` to reuse a process pool; otherwise one is created with
+    ``processes`` workers (one per core by default).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    pool = executor or ProcessPoolExecutor(max_workers=processes)
+    try:
+        futures = {tenant_id: pool.submit(_render_to_file, results, report_path(out_dir, tenant_id))
+                   for tenant_id, results in reports}
+        return {tenant_id: future.result()[0] for tenant_id, future in futures.items()}
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+
+async def render_tenant_reports(orchestrator, tenants: Iterable[str], out_dir: str,
+                                max_concurrency: int = 8, processes: Optional[int] = None) -> Dict[str, str]:
+    """Run the workflow for each tenant and render its report as soon as it finishes
+
+    Failed tenants are reported and skipped. Returns tenant -> file path.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = []
+        async for tenant_id, results in orchestrator.execute_batch(tenants, max_concurrency):
+            if results.get("status") == "error":
+                print(f"⚠️  {tenant_id}: {results['error']}")
+                continue
+            pending.append((tenant_id, loop.run_in_executor(
+                pool, _render_to_file, results, report_path(out_dir, tenant_id))))
+        return {tenant_id: (await future)[0] for tenant_id, future in pending}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Render demo reports for many tenants")
+    parser.add_argument("--tenants", default="8",
+                        help="Number of demo tenants, or a comma-separated list of tenant ids")
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workflows in flight")
+    parser.add_argument("--processes", type=int, default=None, help="Rendering processes")
+    return parser.parse_args()
+
+
+async def main():
+    from adk_hackathon_full_file import EcommerceAnalyticsOrchestrator
+    from order_store import set_demo_data
+
+    args = parse_args()
+    if args.tenants.isdigit():
+        # Numbered demo tenants get synthetic history; named tenants use their real orders
+        set_demo_data(True)
+        tenants = [f"tenant-{i:04d}" for i in range(int(args.tenants))]
+    else:
+        tenants = [tenant.strip() for tenant in args.tenants.split(",")]
+    orchestrator = EcommerceAnalyticsOrchestrator()
+    started = time.perf_counter()
+    try:
+        paths = await render_tenant_reports(orchestrator, tenants, args.out, args.concurrency, args.processes)
+    finally:
+        orchestrator.close()
+    print(f"📄 Rendered {len(paths)} reports to {args.out}/ in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,272 @@
+# response_formats.py - Content negotiation and encoders for API payloads
+# Formats: pretty JSON (default), compact JSON, MessagePack and Arrow IPC.
+# MessagePack uses the msgpack package when installed and a built-in encoder
+# otherwise; Arrow needs pyarrow and is only offered when it is importable.
+
+import importlib.util
+import json
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from result_models import RecommendationTable, ResultModel, to_plain
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "compact": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Accept media type -> format
+MEDIA_TYPES = {
+    "*/*": "json",
+    "application/*": "json",
+    "application/json": "json",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (ResultModel, RecommendationTable)):
+        return to_plain(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, indent=2, default=_json_default).encode()
+
+
+def encode_compact_json(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=_json_default).encode()
+
+
+# =============================================================================
+# MESSAGEPACK
+# =============================================================================
+
+# Numeric arrays are packed in one shot as fixed-width float64 / int64 items
+_PACKED_F8 = np.dtype([("tag", "u1"), ("value", ">f8")])
+_PACKED_I8 = np.dtype([("tag", "u1"), ("value", ">i8")])
+
+
+def _pack_header(out: bytearray, size: int, fix: Optional[int], fix_max: int,
+                 codes: Tuple[Optional[int], int, int]):
+    """Length prefix: fixed form up to fix_max, then 8/16/32-bit sizes"""
+    if fix is not None and size <= fix_max:
+        out.append(fix | size)
+    elif codes[0] is not None and size < 1 << 8:
+        out += struct.pack(">BB", codes[0], size)
+    elif size < 1 << 16:
+        out += struct.pack(">BH", codes[1], size)
+    else:
+        out += struct.pack(">BI", codes[2], size)
+
+
+def _pack_array(out: bytearray, array: np.ndarray):
+    _pack_header(out, len(array), 0x90, 15, (None, 0xDC, 0xDD))
+    kind = array.dtype.kind
+    if kind == "f":
+        packed = np.empty(len(array), dtype=_PACKED_F8)
+        packed["tag"] = 0xCB
+    elif kind == "i" or (kind == "u" and array.dtype.itemsize < 8):
+        packed = np.empty(len(array), dtype=_PACKED_I8)
+        packed["tag"] = 0xD3
+    else:
+        for item in array.tolist():
+            _pack(out, item)
+        return
+    packed["value"] = array
+    out += packed.tobytes()
+
+
+def _pack(out: bytearray, value: Any):
+    if value is None:
+        out.append(0xC0)
+    elif value is True or value is False:
+        out.append(0xC3 if value else 0xC2)
+    elif isinstance(value, (int, np.integer)):
+        value = int(value)
+        if 0 <= value < 0x80:
+            out.append(value)
+        elif -32 <= value < 0:
+            out.append(value & 0xFF)
+        elif value >= 0:
+            if value < 1 << 8:
+                out += struct.pack(">BB", 0xCC, value)
+            elif value < 1 << 16:
+                out += struct.pack(">BH", 0xCD, value)
+            elif value < 1 << 32:
+                out += struct.pack(">BI", 0xCE, value)
+            else:
+                out += struct.pack(">BQ", 0xCF, value)
+        elif value >= -(1 << 7):
+            out += struct.pack(">Bb", 0xD0, value)
+        elif value >= -(1 << 15):
+            out += struct.pack(">Bh", 0xD1, value)
+        elif value >= -(1 << 31):
+            out += struct.pack(">Bi", 0xD2, value)
+        else:
+            out += struct.pack(">Bq", 0xD3, value)
+    elif isinstance(value, (float, np.floating)):
+        out += struct.pack(">Bd", 0xCB, float(value))
+    elif isinstance(value, str):
+        data = value.encode()
+        _pack_header(out, len(data), 0xA0, 31, (0xD9, 0xDA, 0xDB))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        _pack_header(out, len(value), None, 0, (0xC4, 0xC5, 0xC6))
+        out += value
+    elif isinstance(value, dict):
+        _pack_header(out, len(value), 0x80, 15, (None, 0xDE, 0xDF))
+        for key, item in value.items():
+            _pack(out, key)
+            _pack(out, item)
+    elif isinstance(value, np.ndarray) and value.ndim == 1:
+        _pack_array(out, value)
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        items = value.tolist() if isinstance(value, np.ndarray) else value
+        _pack_header(out, len(items), 0x90, 15, (None, 0xDC, 0xDD))
+        for item in items:
+            _pack(out, item)
+    elif isinstance(value, (ResultModel, RecommendationTable)):
+        _pack(out, to_plain(value))
+    else:
+        _pack(out, str(value))
+
+
+def pack_msgpack(payload: Any) -> bytes:
+    """MessagePack-encode JSON-like data (plus numpy arrays) without the msgpack package"""
+    out = bytearray()
+    _pack(out, payload)
+    return bytes(out)
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    if _has_module("msgpack"):
+        import msgpack
+        return msgpack.packb(payload, default=_json_default)
+    return pack_msgpack(payload)
+
+
+# =============================================================================
+# ARROW IPC
+# =============================================================================
+
+def _is_column(value: Any) -> bool:
+    if isinstance(value, np.ndarray):
+        return value.ndim == 1
+    # Homogeneous lists of scalars only; Arrow columns have a single type
+    return (isinstance(value, list) and len(value) > 0
+            and isinstance(value[0], (int, float, str))
+            and all(type(item) is type(value[0]) for item in value))
+
+
+def _split_columns(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Pull the longest 1-D arrays out as columns (dotted names); return (columns, rest)"""
+    found: Dict[str, Any] = {}
+
+    def walk(node: Dict[str, Any], prefix: str):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(value, f"{prefix}{key}.")
+            elif _is_column(value):
+                found[f"{prefix}{key}"] = value
+
+    walk(payload, "")
+    length = max((len(value) for value in found.values()), default=0)
+    columns = {name: value for name, value in found.items() if len(value) == length}
+
+    def strip(node: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+        return {key: strip(value, f"{prefix}{key}.") if isinstance(value, dict) else value
+                for key, value in node.items() if f"{prefix}{key}" not in columns}
+
+    return columns, strip(payload, "")
+
+
+def encode_arrow(payload: Any) -> bytes:
+    """Arrow IPC stream: the longest array fields as columns, everything else as
+    compact JSON in the schema metadata under b"payload"
+
+    Read back with ``pyarrow.ipc.open_stream(body).read_pandas()``.
+    """
+    import pyarrow as pa
+
+    if isinstance(payload, ResultModel):
+        payload = payload.to_dict()
+    if not isinstance(payload, dict):
+        payload = {"value": payload}
+    columns, rest = _split_columns(payload)
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    table = table.replace_schema_metadata({b"payload": encode_compact_json(rest)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# =============================================================================
+# NEGOTIATION
+# =============================================================================
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "json": encode_json,
+    "compact": encode_compact_json,
+    "msgpack": encode_msgpack,
+    "arrow": encode_arrow,
+}
+
+_module_available: Dict[str, bool] = {}
+
+
+def _has_module(name: str) -> bool:
+    if name not in _module_available:
+        _module_available[name] = importlib.util.find_spec(name) is not None
+    return _module_available[name]
+
+
+def available_formats() -> List[str]:
+    return [name for name in ENCODERS if name != "arrow" or _has_module("pyarrow")]
+
+
+def negotiate(requested: Optional[str], accept: str = "") -> Optional[str]:
+    """Pick a format from ?format= or the Accept header; None means 406
+
+    Without ?format=, a missing Accept header gets JSON. An Accept header that
+    names only unsupported types (e.g. a browser-style ``text/html`` with no
+    ``*/*``) gets None, which the API answers with 406 and the list of formats.
+    """
+    formats = available_formats()
+    if requested:
+        return requested if requested in formats else None
+    if not accept:
+        return "json"
+    ranked = []
+    for position, entry in enumerate(accept.split(",")):
+        media, _, params = entry.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, position, media.strip().lower()))
+    for _, _, media in sorted(ranked):
+        if MEDIA_TYPES.get(media) in formats:
+            return MEDIA_TYPES[media]
+    return None
+
+
+def encode_payload(payload: Any, fmt: str = "json") -> bytes:
+    return ENCODERS[fmt](payload)
@@ -0,0 +1,182 @@
+# response_snapshot.py - Precomputed API responses with ETag / conditional GET
+# Endpoint payloads are built on a schedule and kept as ready-to-send bytes in
+# every response format (plain and gzipped), so serving a poll is a dictionary
+# lookup plus a write.
+# In pre-fork mode the parent publishes snapshots to a file the workers reload.
+
+import gzip
+import hashlib
+import os
+import pickle
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from response_formats import CONTENT_TYPES, encode_payload
+
+Builder = Callable[[str], Tuple[int, Any]]
+
+
+class EncodedResponse:
+    """One endpoint's serialized body, its gzipped copy and a content ETag"""
+
+    __slots__ = ("status", "body", "gzip_body", "etag", "content_type", "generated_at")
+
+    def __init__(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.status = status
+        self.body = body
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0)
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.content_type = content_type
+        self.generated_at = time.time()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison; the gzip variant's tag carries a -gz suffix
+    opaque = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') in (opaque, opaque + "-gz"):
+            return True
+    return False
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    for coding in accept_encoding.lower().split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() in ("gzip", "*"):
+            _, _, quality = params.partition("q=")
+            try:
+                return float(quality or 1) > 0
+            except ValueError:
+                return True
+    return False
+
+
+def conditional_response(entry: EncodedResponse, if_none_match: str = "",
+                         accept_encoding: str = "") -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """(status, headers, body) for a snapshot entry: 304, gzipped or identity"""
+    use_gzip = _accepts_gzip(accept_encoding)
+    etag = entry.etag[:-1] + '-gz"' if use_gzip else entry.etag
+    headers = [
+        ("ETag", etag),
+        ("Cache-Control", "no-cache"),
+        ("Vary", "Accept, Accept-Encoding"),
+        ("Last-Modified", time.strftime("%a, %d %b %Y %H:%M:%S GMT",
+                                        time.gmtime(entry.generated_at))),
+    ]
+    if _etag_matches(if_none_match, entry.etag):
+        return 304, headers, b""
+    headers.append(("Content-Type", entry.content_type))
+    if use_gzip:
+        headers.append(("Content-Encoding", "gzip"))
+        return entry.status, headers, entry.gzip_body
+    return entry.status, headers, entry.body
+
+
+class ResponseSnapshot:
+    """Latest responses for a fixed set of paths, refreshed every `interval` seconds
+
+    ``build`` returns (status, payload) for a path; each payload is encoded
+    once per format in ``formats`` from the same build, so all formats agree.
+    """
+
+    def __init__(self, build: Builder, paths: Iterable[str], interval: float = 5.0,
+                 formats: Iterable[str] = ("json",)):
+        self.build = build
+        self.paths = list(paths)
+        self.formats = list(formats)
+        self.interval = interval
+        self.refreshed_at = 0.0
+        self.refresh_errors = 0
+        self._entries: Dict[Tuple[str, str], EncodedResponse] = {}
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, path: str, fmt: str = "json") -> Optional[EncodedResponse]:
+        return self._entries.get((path, fmt))
+
+    def refresh(self):
+        """Build every path, encode it in every format and swap the whole set in at once"""
+        entries = {}
+        for path in self.paths:
+            status, payload = self.build(path)
+            for fmt in self.formats:
+                entries[(path, fmt)] = EncodedResponse(status, encode_payload(payload, fmt),
+                                                       CONTENT_TYPES[fmt])
+        self._entries = entries
+        self.refreshed_at = time.monotonic()
+
+    def refresh_if_due(self) -> bool:
+        if time.monotonic() - self.refreshed_at < self.interval:
+            return False
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the previous snapshot rather than failing requests
+            self.refresh_errors += 1
+            self.refreshed_at = time.monotonic()
+            print(f"⚠️ Snapshot refresh failed: {e}")
+            return False
+        return True
+
+    def start(self):
+        """Render now, then keep refreshing on a daemon thread"""
+        self.refresh()
+        self._stopped.clear()
+
+        def loop():
+            while not self._stopped.wait(max(0.0, self.refreshed_at + self.interval - time.monotonic())):
+                self.refresh_if_due()
+
+        self._thread = threading.Thread(target=loop, name="snapshot-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def save(self, path: str):
+        """Publish the current entries to `path` atomically"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+class SnapshotFile:
+    """Read side of ResponseSnapshot.save, reloaded whenever the file is replaced"""
+
+    def __init__(self, path: str, check_interval: float = 0.1):
+        self.path = path
+        self.check_interval = check_interval
+        self._entries: Dict[Tuple[str, str], EncodedResponse] = {}
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, fmt: str = "json") -> Optional[EncodedResponse]:
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._reload(now)
+        return self._entries.get((path, fmt))
+
+    def _reload(self, now: float):
+        with self._lock:
+            self._checked_at = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+            if stamp != self._stamp:
+                with open(self.path, "rb") as f:
+                    self._entries = pickle.load(f)
+                self._stamp = stamp
@@ -0,0 +1,581 @@
+# result_models.py - Compact typed results for each workflow stage
+# Stage results are __slots__ objects holding numbers, shared strings and numpy
+# columns; timestamps are epoch floats and the display strings the old nested
+# dicts carried (ISO times, summaries, labels) are derived on access. Every
+# model is a read-only Mapping with the old dict keys, so existing consumers keep
+# working, and to_dict()/to_json() return the plain nested-dict view.
+
+import functools
+import json
+import time
+from collections.abc import ItemsView, KeysView, Mapping, Sequence, ValuesView
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+def to_plain(value: Any) -> Any:
+    """Models, record tables, arrays and tuples -> dicts, lists and Python scalars"""
+    if isinstance(value, ResultModel):
+        return value.to_dict()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, RecommendationTable)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def stored_fields(cls: type) -> Tuple[str, ...]:
+    """Slot names of a model class and its bases: its stored, not derived, state"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return tuple(names)
+
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+class ResultModel:
+    """Read-only mapping over a slotted result; KEYS are the old dict keys, in order
+
+    Each key is read from the attribute of the same name, so a key is either a
+    slot or a property deriving it from slots. Registered as a Mapping rather
+    than subclassing it, so isinstance checks against models stay cheap when
+    hashing and sizing step outputs.
+    """
+
+    __slots__ = ()
+    KEYS: Tuple[str, ...] = ()
+    _KEY_SET: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._KEY_SET = frozenset(cls.KEYS)
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self.KEYS
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._keys()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self._keys() else default
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == to_plain(dict(other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: to_plain(self[key]) for key in self._keys()}
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+Mapping.register(ResultModel)
+
+
+class TimestampedResult(ResultModel):
+    """Stage result stamped with its creation time"""
+
+    __slots__ = ("created",)
+
+    @property
+    def timestamp(self) -> str:
+        return _iso(self.created)
+
+
+# =============================================================================
+# SALES
+# =============================================================================
+
+class SalesAnalysis(TimestampedResult):
+    __slots__ = ("total_sales", "transactions", "top_categories", "daily_sales", "status")
+    KEYS = ("total_sales", "transactions", "avg_order_value", "top_categories", "daily_sales",
+            "timestamp", "status")
+
+    def __init__(self, total_sales: float, transactions: int, top_categories: Sequence[str],
+                 daily_sales: np.ndarray, status: str = "success", created: Optional[float] = None):
+        self.total_sales = total_sales
+        self.transactions = transactions
+        self.top_categories = tuple(top_categories)
+        # Read-only view: cached results are shared between runs and must not be edited
+        self.daily_sales = np.asarray(daily_sales, dtype=np.float64).view()
+        self.daily_sales.flags.writeable = False
+        self.status = status
+        self.created = time.time() if created is None else created
+
+    @property
+    def avg_order_value(self) -> float:
+        return round(self.total_sales / self.transactions, 2) if self.transactions else 0.0
+
+    def __reduce__(self):
+        # Rebuilt through __init__ so daily_sales stays read-only after unpickling
+        return (type(self), (self.total_sales, self.transactions, self.top_categories,
+                             self.daily_sales, self.status, self.created))
+
+
+# =============================================================================
+# CUSTOMER SEGMENTS
+# =============================================================================
+
+# Numeric columns of a SegmentTable, in order
+SEGMENT_COLUMNS = ("count", "avg_value", "retention_rate", "revenue")
+
+
+class Segment(ResultModel):
+    """One row of a SegmentTable"""
+
+    __slots__ = ("table", "index")
+    KEYS = ("count", "avg_value", "characteristics", "retention_rate", "revenue")
+
+    def __init__(self, table: "SegmentTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def count(self) -> int:
+        return int(self.table.data[self.index, 0])
+
+    @property
+    def avg_value(self) -> float:
+        return float(self.table.data[self.index, 1])
+
+    @property
+    def characteristics(self) -> str:
+        return self.table.characteristics[self.index]
+
+    @property
+    def retention_rate(self) -> float:
+        return float(self.table.data[self.index, 2])
+
+    @property
+    def revenue(self) -> float:
+        return float(self.table.data[self.index, 3])
+
+
+class SegmentTable(ResultModel):
+    """Mapping of segment name -> Segment row, stored as one (segments, 4) array"""
+
+    __slots__ = ("names", "data", "characteristics")
+
+    def __init__(self, names: Sequence[str], data: np.ndarray, characteristics: Sequence[str]):
+        self.names = tuple(names)
+        self.data = np.asarray(data, dtype=np.float64).reshape(len(self.names), len(SEGMENT_COLUMNS))
+        self.characteristics = tuple(characteristics)
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self.names
+
+    def __getitem__(self, name: str) -> Segment:
+        try:
+            return Segment(self, self.names.index(name))
+        except ValueError:
+            raise KeyError(name) from None
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[:, SEGMENT_COLUMNS.index(name)]
+
+
+class CustomerIntelligence(TimestampedResult):
+    __slots__ = ("segments", "churn_risk_percentage", "overall_retention", "revenue_base",
+                 "centroids", "inertia")
+    KEYS = ("segments", "churn_risk_percentage", "overall_retention", "insights", "timestamp")
+    CLUSTER_KEYS = KEYS + ("centroids", "inertia")
+
+    def __init__(self, segments: SegmentTable, churn_risk_percentage: float, overall_retention: float,
+                 revenue_base: float, centroids: Optional[List[Dict[str, Any]]] = None,
+                 inertia: Optional[float] = None, created: Optional[float] = None):
+        self.segments = segments
+        self.churn_risk_percentage = churn_risk_percentage
+        self.overall_retention = overall_retention
+        self.revenue_base = revenue_base
+        self.centroids = centroids
+        self.inertia = inertia
+        self.created = time.time() if created is None else created
+
+    def _keys(self) -> Tuple[str, ...]:
+        return self.KEYS if self.centroids is None else self.CLUSTER_KEYS
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._keys():
+            return getattr(self, key)
+        raise KeyError(key)
+
+    @property
+    def insights(self) -> List[str]:
+        segments = self.segments
+        revenue = segments.column("revenue")
+        per_customer = revenue / np.maximum(segments.column("count"), 1)
+        # Stable descending rank, so ties keep segment order
+        ranked = np.argsort(-per_customer, kind="stable")
+        top, bottom = segments.names[ranked[0]], segments.names[ranked[-1]]
+        return [
+            f"{top.title()} customers drive {100 * segments[top].revenue / self.revenue_base:.0f}% of revenue",
+            f"{bottom.title()} segment averages ${segments[bottom].avg_value:,} per order, showing high price sensitivity",
+            f"{len(segments)} segments cover {int(segments.column('count').sum()):,} active customers"
+        ]
+
+
+# =============================================================================
+# PRICING
+# =============================================================================
+
+class ImpactInterval(ResultModel):
+    """Monte Carlo revenue impact distribution (fractions of current revenue)"""
+
+    __slots__ = ("p5", "p50", "p95", "mean", "probability_positive", "trials", "seed")
+    KEYS = __slots__
+
+    def __init__(self, p5: float, p50: float, p95: float, mean: float, probability_positive: float,
+                 trials: int, seed: Optional[int] = None):
+        self.p5 = p5
+        self.p50 = p50
+        self.p95 = p95
+        self.mean = mean
+        self.probability_positive = probability_positive
+        self.trials = trials
+        self.seed = seed
+
+
+class Recommendation(ResultModel):
+    """One row of a RecommendationTable"""
+
+    __slots__ = ("table", "index")
+    KEYS = ("action", "category", "segment", "adjustment", "reason", "expected_impact", "revenue_delta")
+
+    def __init__(self, table: "RecommendationTable", index: int):
+        self.table = table
+        self.index = index
+
+    @property
+    def action(self) -> str:
+        return "increase_price" if self.table.data[self.index, 0] > 0 else "decrease_price"
+
+    @property
+    def category(self) -> str:
+        return self.table.category[self.index]
+
+    @property
+    def segment(self) -> str:
+        return self.table.segment[self.index]
+
+    @property
+    def adjustment(self) -> str:
+        return f"{self.table.data[self.index, 0]:+.0%}"
+
+    @property
+    def reason(self) -> str:
+        elasticity = self.table.data[self.index, 1]
+        demand = "inelastic" if elasticity > -1 else "elastic"
+        return f"{self.segment.title()} demand is {demand} (elasticity {elasticity:.2f})"
+
+    @property
+    def expected_impact(self) -> str:
+        return f"+${self.revenue_delta:,.0f} revenue"
+
+    @property
+    def revenue_delta(self) -> float:
+        return float(self.table.data[self.index, 2])
+
+
+# Numeric columns of a RecommendationTable, in order
+RECOMMENDATION_COLUMNS = ("adjustment", "elasticity", "revenue_delta")
+
+
+class RecommendationTable:
+    """Ranked pricing actions as columns; indexing yields Recommendation rows (a registered Sequence)"""
+
+    __slots__ = ("category", "segment", "data")
+
+    def __init__(self, category: Sequence[str], segment: Sequence[str], data: np.ndarray):
+        self.category = tuple(category)
+        self.segment = tuple(segment)
+        self.data = np.asarray(data, dtype=np.float64).reshape(len(self.category),
+                                                                   len(RECOMMENDATION_COLUMNS))
+
+    @classmethod
+    def from_actions(cls, actions: Sequence[Dict[str, Any]]) -> "RecommendationTable":
+        """From pricing_simulator actions (dicts with category, segment, adjustment, ...)"""
+        return cls([action["category"] for action in actions],
+                   [action["segment"] for action in actions],
+                   [[action[column] for column in RECOMMENDATION_COLUMNS] for action in actions])
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[:, RECOMMENDATION_COLUMNS.index(name)]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("recommendation index out of range")
+        return Recommendation(self, index)
+
+    def __len__(self) -> int:
+        return len(self.category)
+
+    def __iter__(self) -> Iterator[Recommendation]:
+        return (Recommendation(self, i) for i in range(len(self)))
+
+    def __repr__(self) -> str:
+        return f"RecommendationTable({to_plain(self)!r})"
+
+
+Sequence.register(RecommendationTable)
+
+
+class PricingStrategy(TimestampedResult):
+    __slots__ = ("recommendations", "revenue_impact_interval", "elasticity_categories",
+                 "elasticity_values", "combinations_evaluated")
+    KEYS = ("recommendations", "total_expected_revenue_impact", "revenue_impact_interval",
+            "implementation_priority", "risk_assessment", "elasticities", "combinations_evaluated",
+            "timestamp")
+
+    def __init__(self, recommendations: RecommendationTable, revenue_impact_interval: ImpactInterval,
+                 elasticities: Dict[str, float], combinations_evaluated: int,
+                 created: Optional[float] = None):
+        self.recommendations = recommendations
+        self.revenue_impact_interval = revenue_impact_interval
+        self.elasticity_categories = tuple(elasticities)
+        self.elasticity_values = np.fromiter(elasticities.values(), dtype=np.float64,
+                                             count=len(elasticities))
+        self.combinations_evaluated = combinations_evaluated
+        self.created = time.time() if created is None else created
+
+    @property
+    def total_expected_revenue_impact(self) -> str:
+        return f"{self.revenue_impact_interval.p50:+.1%}"
+
+    # Priority follows the median outcome, risk the pessimistic tail
+    @property
+    def implementation_priority(self) -> str:
+        p50 = self.revenue_impact_interval.p50
+        return "high" if p50 >= 0.05 else "medium" if p50 >= 0.01 else "low"
+
+    @property
+    def risk_assessment(self) -> str:
+        p5 = self.revenue_impact_interval.p5
+        return "low" if p5 >= 0 else "medium" if p5 >= -0.02 else "high"
+
+    @property
+    def elasticities(self) -> Dict[str, float]:
+        return dict(zip(self.elasticity_categories, self.elasticity_values.tolist()))
+
+
+# =============================================================================
+# BUSINESS INSIGHTS
+# =============================================================================
+
+KEY_OPPORTUNITIES = (
+    "Premium customer segment expansion",
+    "Dynamic pricing implementation",
+    "Cross-category optimization",
+    "Retention strategy enhancement"
+)
+
+RECOMMENDED_ACTIONS = (
+    "Implement tiered pricing strategy",
+    "Launch premium customer loyalty program",
+    "Optimize inventory for high-margin products",
+    "Develop personalized marketing campaigns"
+)
+
+
+class BusinessInsights(TimestampedResult):
+    __slots__ = ("total_sales", "revenue_impact", "interval", "segment_count", "recommendation_count")
+    KEYS = ("executive_summary", "key_opportunities", "recommended_actions", "business_metrics",
+            "timestamp")
+
+    key_opportunities = KEY_OPPORTUNITIES
+    recommended_actions = RECOMMENDED_ACTIONS
+
+    def __init__(self, total_sales: float, revenue_impact: str, interval: Optional[Mapping],
+                 segment_count: int, recommendation_count: int, created: Optional[float] = None):
+        self.total_sales = total_sales
+        self.revenue_impact = revenue_impact
+        self.interval = interval
+        self.segment_count = segment_count
+        self.recommendation_count = recommendation_count
+        self.created = time.time() if created is None else created
+
+    @property
+    def executive_summary(self) -> List[str]:
+        if self.interval:
+            revenue_range = f"{self.interval['p5']:+.1%} to {self.interval['p95']:+.1%}"
+            revenue_impact_line = f"Potential revenue increase: {self.revenue_impact} (90% interval {revenue_range})"
+        else:
+            revenue_impact_line = f"Potential revenue increase: {self.revenue_impact}"
+        return [
+            f"Current monthly revenue: ${self.total_sales:,.2f}",
+            revenue_impact_line,
+            f"Customer segments analyzed: {self.segment_count}",
+            f"Pricing recommendations: {self.recommendation_count}"
+        ]
+
+    @property
+    def business_metrics(self) -> Dict[str, Any]:
+        return {
+            "projected_revenue_increase": self.revenue_impact,
+            "projected_revenue_interval": self.interval,
+            "customer_retention_improvement": "+12%",
+            "inventory_optimization": "+25%",
+            "pricing_efficiency": "+18%"
+        }
+
+
+# =============================================================================
+# WORKFLOW
+# =============================================================================
+
+class TraceSummary(ResultModel):
+    """Spans of one workflow run as columns; see Tracer.summary()"""
+
+    __slots__ = ("trace_id", "duration_ms", "names", "kinds", "parents", "timings",
+                 "attribute_names", "attributes", "errors")
+    KEYS = ("trace_id", "duration_ms", "slowest_step", "spans")
+
+    # Columns of `timings`, in milliseconds
+    TIMING_COLUMNS = ("start_ms", "duration_ms", "queue_wait_ms")
+
+    def __init__(self, trace_id: str, duration_ms: float, names: Sequence[str], kinds: Sequence[str],
+                 parents: Sequence[Optional[str]], timings: np.ndarray, attribute_names: Sequence[str],
+                 attributes: np.ndarray, errors: Sequence[Optional[str]]):
+        self.trace_id = trace_id
+        self.duration_ms = duration_ms
+        self.names = tuple(names)
+        self.kinds = tuple(kinds)
+        self.parents = tuple(parents)
+        self.timings = timings
+        self.attribute_names = tuple(attribute_names)
+        # Object array (spans x attribute_names); MISSING where a span lacks one
+        self.attributes = attributes
+        self.errors = tuple(errors)
+
+    @property
+    def slowest_step(self) -> Optional[str]:
+        steps = [i for i, kind in enumerate(self.kinds) if kind == "step"]
+        if not steps:
+            return None
+        return self.names[max(steps, key=lambda i: self.timings[i, 1])]
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        spans = []
+        for i, name in enumerate(self.names):
+            span = {"name": name, "kind": self.kinds[i], "parent": self.parents[i]}
+            span.update(zip(self.TIMING_COLUMNS, self.timings[i].tolist()))
+            span.update((key, value) for key, value in zip(self.attribute_names, self.attributes[i])
+                        if value is not MISSING)
+            if self.errors[i]:
+                span["error"] = self.errors[i]
+            spans.append(span)
+        return spans
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+# Placeholder in TraceSummary.attributes; pickles back to the same object
+MISSING = _Missing()
+
+
+class WorkflowMetadata(ResultModel):
+    __slots__ = ("workflow_id", "started", "tenant_id", "cached_steps", "execution_time_seconds", "trace",
+                 "agents_orchestrated", "tools_only", "demo_data")
+    KEYS = ("workflow_id", "started", "tenant_id", "cached_steps", "execution_time_seconds", "trace",
+            "agents_orchestrated", "tools_only", "demo_data", "adk_version", "model_used")
+
+    adk_version = "1.4.2"
+    model_used = "gemini-2.0-flash"
+
+    def __init__(self, workflow_id: str, started: float, tenant_id: str, cached_steps: Sequence[str],
+                 execution_time_seconds: float, trace: TraceSummary, agents_orchestrated: Tuple[str, ...],
+                 tools_only: bool, demo_data: bool = False):
+        self.workflow_id = workflow_id
+        # Epoch seconds
+        self.started = started
+        self.tenant_id = tenant_id
+        self.cached_steps = tuple(cached_steps)
+        self.execution_time_seconds = execution_time_seconds
+        self.trace = trace
+        self.agents_orchestrated = agents_orchestrated
+        self.tools_only = tools_only
+        # The tenant's store held synthetic demo history, not real orders
+        self.demo_data = demo_data
+
+
+class WorkflowResult(ResultModel):
+    """Everything one analysis run produced; stage results are shared, not copied"""
+
+    __slots__ = ("workflow_metadata", "sales_analysis", "customer_intelligence", "pricing_strategy",
+                 "business_insights", "extra")
+    KEYS = ("workflow_metadata", "sales_analysis", "customer_intelligence", "pricing_strategy",
+            "business_insights", "additional_analyses", "performance_metrics")
+
+    def __init__(self, workflow_metadata: WorkflowMetadata, sales_analysis: Mapping,
+                 customer_intelligence: Mapping, pricing_strategy: Mapping, business_insights: Mapping,
+                 additional_analyses: Optional[Dict[str, Any]] = None):
+        self.workflow_metadata = workflow_metadata
+        self.sales_analysis = sales_analysis
+        self.customer_intelligence = customer_intelligence
+        self.pricing_strategy = pricing_strategy
+        self.business_insights = business_insights
+        # No empty dict per result when there are no extra steps
+        self.extra = additional_analyses or None
+
+    @property
+    def additional_analyses(self) -> Dict[str, Any]:
+        return self.extra or {}
+
+    @property
+    def performance_metrics(self) -> Dict[str, Any]:
+        return {
+            "total_revenue_analyzed": self.sales_analysis["total_sales"],
+            "customers_segmented": sum(seg["count"] for seg in self.customer_intelligence["segments"].values()),
+            "pricing_recommendations": len(self.pricing_strategy["recommendations"]),
+            "business_opportunities": len(self.business_insights["key_opportunities"])
+        }
@@ -0,0 +1,176 @@
+# revenue_monte_carlo.py - Monte Carlo revenue impact of pricing actions
+# Propagates uncertainty in category demand, price elasticity and churn through
+# a set of recommended price changes and reports percentile revenue impact.
+# Trials are drawn in fixed-size vectorized chunks, each with its own child of
+# one SeedSequence, so results depend only on the seed, never on process count.
+
+import os
+import secrets
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from pricing_simulator import ELASTICITY_BOUNDS, revenue_multiplier
+
+# Period-level demand uncertainty applied on top of the measured daily noise
+DEMAND_SD_FLOOR = 0.05
+
+# Beta concentration for the churn-rate draw (higher = tighter around the estimate)
+CHURN_CONCENTRATION = 40.0
+
+DEFAULT_CHUNK_TRIALS = 65536
+
+# Below this many trials, process start-up costs more than it saves
+PARALLEL_TRIALS = 1_000_000
+
+# Trials used to check each action's own contribution before the reported run,
+# drawn from a separate stream so the screen never reuses the reported samples
+SCREEN_TRIALS = 4096
+SCREEN_STREAM = 1
+
+# Per-action arrays in a model, as built by build_model()
+ACTION_KEYS = ("category", "base", "adjustment", "elasticity", "elasticity_sd")
+
+
+def demand_uncertainty(daily_sales: np.ndarray) -> np.ndarray:
+    """Per-category log-sd of period revenue from a (days, categories) sales history"""
+    return demand_sd(daily_sales.shape[0], daily_sales.mean(axis=0), daily_sales.std(axis=0))
+
+
+def demand_sd(days: int, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+    """demand_uncertainty() from the per-category mean and sd of daily sales over `days` days"""
+    cv = np.divide(std, mean, out=np.zeros_like(mean), where=mean > 0)
+    return np.sqrt(DEMAND_SD_FLOOR ** 2 + cv ** 2 / max(days, 1))
+
+
+def build_model(actions: Sequence[Dict[str, Any]], categories: Sequence[str],
+                category_revenue: np.ndarray, demand_sd: np.ndarray,
+                churn_rate: float) -> Dict[str, np.ndarray]:
+    """Flat arrays describing the actions; picklable for worker processes"""
+    index = {name: i for i, name in enumerate(categories)}
+    churn_rate = float(np.clip(churn_rate, 1e-3, 0.999))
+    return {
+        "category": np.array([index[action["category"]] for action in actions], dtype=np.int64),
+        "base": np.array([action["base_revenue"] for action in actions], dtype=np.float64),
+        "adjustment": np.array([action["adjustment"] for action in actions], dtype=np.float64),
+        "elasticity": np.array([action["elasticity"] for action in actions], dtype=np.float64),
+        "elasticity_sd": np.array([action.get("elasticity_sd", 0.0) for action in actions],
+                                  dtype=np.float64),
+        "category_revenue": np.asarray(category_revenue, dtype=np.float64),
+        "demand_sd": np.asarray(demand_sd, dtype=np.float64),
+        "churn": np.array([churn_rate * CHURN_CONCENTRATION,
+                           (1.0 - churn_rate) * CHURN_CONCENTRATION]),
+    }
+
+
+def subset_model(model: Dict[str, np.ndarray], keep: np.ndarray) -> Dict[str, np.ndarray]:
+    """The model restricted to the actions selected by boolean mask `keep`"""
+    return {key: value[keep] if key in ACTION_KEYS else value for key, value in model.items()}
+
+
+def simulate_batch(model: Dict[str, np.ndarray], rng: np.random.Generator, trials: int) -> np.ndarray:
+    """Fractional revenue impact of all actions together, one value per trial"""
+    delta, total = action_deltas(model, rng, trials)
+    return delta.sum(axis=1) / total
+
+
+def action_deltas(model: Dict[str, np.ndarray], rng: np.random.Generator,
+                  trials: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(revenue change per trial and action, base revenue per trial)"""
+    adjustment = model["adjustment"]
+    elasticity = np.clip(rng.normal(model["elasticity"], model["elasticity_sd"],
+                                    size=(trials, len(adjustment))), *ELASTICITY_BOUNDS)
+    # Mean-one lognormal demand shock per category, shared by its segments
+    sd = model["demand_sd"]
+    shock = np.exp(rng.normal(-0.5 * sd ** 2, sd, size=(trials, len(sd))))
+    churn = rng.beta(model["churn"][0], model["churn"][1], size=trials)
+
+    multiplier = revenue_multiplier(adjustment, elasticity, churn[:, None])
+    delta = model["base"] * shock[:, model["category"]] * (multiplier - 1.0)
+    total = shock @ model["category_revenue"]
+    return delta, np.where(total > 0, total, 1.0)
+
+
+def screen_actions(model: Dict[str, np.ndarray], seed: int, trials: int = SCREEN_TRIALS) -> np.ndarray:
+    """Boolean mask of the actions whose mean simulated contribution is positive"""
+    if len(model["base"]) == 0:
+        return np.zeros(0, dtype=bool)
+    rng = np.random.default_rng(np.random.SeedSequence([seed, SCREEN_STREAM]))
+    delta, total = action_deltas(model, rng, trials)
+    return (delta / total[:, None]).mean(axis=0) > 0
+
+
+def _run_chunks(model: Dict[str, np.ndarray], seeds: List[np.random.SeedSequence],
+                sizes: List[int]) -> np.ndarray:
+    return np.concatenate([simulate_batch(model, np.random.default_rng(seed), size)
+                           for seed, size in zip(seeds, sizes)])
+
+
+def run_monte_carlo(model: Dict[str, np.ndarray], trials: int = 20000, seed: Optional[int] = None,
+                    chunk_trials: int = DEFAULT_CHUNK_TRIALS, processes: Optional[int] = None,
+                    executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """Percentile revenue impact over `trials` draws
+
+    ``processes`` defaults to one per core at PARALLEL_TRIALS trials and above,
+    otherwise 1; pass ``executor`` to reuse an existing process pool. The seed
+    used is reported, so any run can be reproduced exactly.
+    """
+    if seed is None:
+        seed = secrets.randbits(63)
+    if len(model["base"]) == 0:
+        samples = np.zeros(1)
+    else:
+        sequence = np.random.SeedSequence(seed)
+        sizes = [min(chunk_trials, trials - start) for start in range(0, trials, chunk_trials)]
+        seeds = sequence.spawn(len(sizes))
+        if processes is None:
+            processes = (os.cpu_count() or 1) if trials >= PARALLEL_TRIALS else 1
+        workers = min(processes, len(sizes))
+
+        if executor is None and workers <= 1:
+            samples = _run_chunks(model, seeds, sizes)
+        else:
+            # Contiguous runs of chunks per task, concatenated back in order
+            groups = np.array_split(np.arange(len(sizes)), max(workers, 1))
+            pool = executor or ProcessPoolExecutor(max_workers=workers)
+            try:
+                futures = [pool.submit(_run_chunks, model, [seeds[i] for i in group],
+                                       [sizes[i] for i in group]) for group in groups if len(group)]
+                samples = np.concatenate([future.result() for future in futures])
+            finally:
+                if executor is None:
+                    pool.shutdown()
+
+    p5, p50, p95 = np.percentile(samples, [5, 50, 95])
+    return {
+        "p5": round(float(p5), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "mean": round(float(samples.mean()), 4),
+        "probability_positive": round(float((samples > 0).mean()), 4),
+        "trials": int(samples.size) if len(model["base"]) else 0,
+        "seed": seed,
+    }
+
+
+def recommend_actions(actions: Sequence[Dict[str, Any]], categories: Sequence[str],
+                      category_revenue: np.ndarray, demand_sd: np.ndarray, churn_rate: float,
+                      trials: int = 20000, seed: Optional[int] = None,
+                      **options) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """(actions worth taking, their run_monte_carlo() impact) from ranked candidate actions
+
+    Actions whose own mean simulated contribution is not positive are dropped
+    before the interval is computed. If the median impact of the rest is still
+    negative nothing is recommended, and the impact reported is that of no change.
+    """
+    if seed is None:
+        seed = secrets.randbits(63)
+    model = build_model(actions, categories, category_revenue, demand_sd, churn_rate)
+    keep = screen_actions(model, seed)
+    actions = [action for action, kept in zip(actions, keep) if kept]
+    impact = run_monte_carlo(subset_model(model, keep), trials=trials, seed=seed, **options)
+    if impact["p50"] < 0:
+        actions = []
+        impact = run_monte_carlo(subset_model(model, np.zeros_like(keep)), trials=trials, seed=seed)
+    return actions, impact
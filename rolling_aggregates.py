@@ -0,0 +1,113 @@
+# rolling_aggregates.py - Incrementally maintained per-day, per-category sales aggregates
+# Every order event updates its (day, category) cell in O(1), so window queries
+# only touch one small row per day instead of rescanning orders.
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Field order of each aggregate cell
+SUM, COUNT, MIN, MAX, SUM_SQ = range(5)
+AGGREGATE_FIELDS = ("sum", "count", "min", "max", "sum_sq")
+
+# Fixed-width record layout used when aggregates are persisted next to segments
+AGGREGATE_RECORD = np.dtype([
+    ("day", "<i4"), ("category", "<i2"),
+    ("sum", "<f8"), ("count", "<f8"), ("min", "<f8"), ("max", "<f8"), ("sum_sq", "<f8"),
+])
+
+
+def _empty_cells(n_categories: int) -> np.ndarray:
+    cells = np.zeros((n_categories, len(AGGREGATE_FIELDS)), dtype=np.float64)
+    cells[:, MIN] = np.inf
+    cells[:, MAX] = -np.inf
+    return cells
+
+
+class RollingAggregates:
+    """Sum, count, min, max and sum of squares per day and category"""
+
+    def __init__(self, n_categories: int = 8):
+        self._capacity = max(n_categories, 1)
+        self._days: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def _cells(self, day: int, category: int) -> np.ndarray:
+        if category >= self._capacity:
+            self._capacity = max(self._capacity * 2, category + 1)
+            for known_day, cells in self._days.items():
+                grown = _empty_cells(self._capacity)
+                grown[:len(cells)] = cells
+                self._days[known_day] = grown
+        cells = self._days.get(day)
+        if cells is None:
+            cells = self._days[day] = _empty_cells(self._capacity)
+        return cells
+
+    def update(self, day: int, category: int, amount: float):
+        """Fold a single order event into its (day, category) cell"""
+        cell = self._cells(day, category)[category]
+        cell[SUM] += amount
+        cell[COUNT] += 1
+        cell[SUM_SQ] += amount * amount
+        if amount < cell[MIN]:
+            cell[MIN] = amount
+        if amount > cell[MAX]:
+            cell[MAX] = amount
+
+    def update_batch(self, day: int, categories: np.ndarray, amounts: np.ndarray):
+        """Fold a batch of order events that all fall on the same day"""
+        if len(amounts) == 0:
+            return
+        cells = self._cells(day, int(categories.max()))
+        n = self._capacity
+        cells[:, SUM] += np.bincount(categories, weights=amounts, minlength=n)
+        cells[:, COUNT] += np.bincount(categories, minlength=n)
+        cells[:, SUM_SQ] += np.bincount(categories, weights=amounts * amounts, minlength=n)
+        np.minimum.at(cells[:, MIN], categories, amounts)
+        np.maximum.at(cells[:, MAX], categories, amounts)
+
+    def window(self, start_day: int, end_day: int) -> np.ndarray:
+        """Aggregate cells for [start_day, end_day] as (days, categories, fields)"""
+        n_days = max(end_day - start_day + 1, 0)
+        result = np.empty((n_days, self._capacity, len(AGGREGATE_FIELDS)), dtype=np.float64)
+        result[:] = _empty_cells(self._capacity)
+        for offset in range(n_days):
+            cells = self._days.get(start_day + offset)
+            if cells is not None:
+                result[offset] = cells
+        return result
+
+    def to_records(self) -> np.ndarray:
+        """Flatten non-empty cells into AGGREGATE_RECORD rows"""
+        rows = []
+        for day in sorted(self._days):
+            cells = self._days[day]
+            for category in np.flatnonzero(cells[:, COUNT]):
+                rows.append((day, category, *cells[category]))
+        return np.array(rows, dtype=AGGREGATE_RECORD)
+
+    @classmethod
+    def from_records(cls, records: np.ndarray, n_categories: int = 8) -> "RollingAggregates":
+        aggregates = cls(max(n_categories, int(records["category"].max()) + 1 if len(records) else 1))
+        for record in records:
+            cells = aggregates._cells(int(record["day"]), int(record["category"]))
+            cells[record["category"]] = [record[field] for field in AGGREGATE_FIELDS]
+        return aggregates
+
+
+def _collapse(window: np.ndarray, axis: int) -> np.ndarray:
+    return np.stack([
+        window[:, :, SUM].sum(axis=axis),
+        window[:, :, COUNT].sum(axis=axis),
+        window[:, :, MIN].min(axis=axis, initial=np.inf),
+        window[:, :, MAX].max(axis=axis, initial=-np.inf),
+        window[:, :, SUM_SQ].sum(axis=axis),
+    ], axis=1)
+
+
+def window_totals(window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Collapse a window into (per-day cells, per-category cells)"""
+    return _collapse(window, axis=1), _collapse(window, axis=0)
@@ -0,0 +1,337 @@
+# run_history.py - Persistent, indexed history of workflow runs
+# Runs are stored in SQLite in WAL mode, so readers never block the writer, as
+# one row per run plus one row per (run, metric). Run IDs are unique across
+# concurrent runs and processes, and lookups by tenant, time range and metric
+# are served from indexes, so comparing runs never means re-running them.
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from response_formats import encode_compact_json
+
+# Set to a file path to record every orchestrator run there
+HISTORY_ENV = "ADK_RUN_HISTORY"
+HISTORY_FILENAME = "run_history.sqlite"
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    started REAL NOT NULL,
+    execution_time REAL,
+    status TEXT NOT NULL,
+    result BLOB
+);
+CREATE INDEX IF NOT EXISTS runs_by_tenant ON runs (tenant_id, started);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (started);
+
+-- tenant_id and started are copied from runs so metric queries never join
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    tenant_id TEXT NOT NULL,
+    started REAL NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS metrics_by_tenant ON metrics (tenant_id, name, started, value);
+CREATE INDEX IF NOT EXISTS metrics_by_name ON metrics (name, started, value);
+"""
+
+# Time bounds may be epoch seconds or datetimes
+TimeBound = Union[float, int, datetime, None]
+
+
+def default_history_path() -> str:
+    """$ADK_RUN_HISTORY, else run_history.sqlite in the user data directory
+
+    That is $XDG_DATA_HOME/adk-analytics (~/.local/share/adk-analytics), or
+    %LOCALAPPDATA%\\adk-analytics on Windows, so runs never land in the CWD.
+    """
+    if os.environ.get(HISTORY_ENV):
+        return os.environ[HISTORY_ENV]
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "adk-analytics", HISTORY_FILENAME)
+
+
+def new_run_id(started: Optional[float] = None) -> str:
+    """Time-ordered workflow ID with 48 random bits, unique under concurrent runs"""
+    started = time.time() if started is None else started
+    stamp = datetime.fromtimestamp(started).strftime("%Y%m%d_%H%M%S")
+    return f"adk_analysis_{stamp}_{os.urandom(6).hex()}"
+
+
+def _epoch(value: TimeBound, default: float) -> float:
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+def run_metrics(results: Mapping[str, Any]) -> Dict[str, float]:
+    """Numeric metrics of one workflow result, flattened to name -> value"""
+    sales = results.get("sales_analysis", {})
+    customers = results.get("customer_intelligence", {})
+    pricing = results.get("pricing_strategy", {})
+    meta = results.get("workflow_metadata", {})
+    metrics = {
+        "total_sales": sales.get("total_sales"),
+        "transactions": sales.get("transactions"),
+        "avg_order_value": sales.get("avg_order_value"),
+        "churn_risk_percentage": customers.get("churn_risk_percentage"),
+        "overall_retention": customers.get("overall_retention"),
+        "pricing_recommendations": len(pricing.get("recommendations", ())),
+        "execution_time_seconds": meta.get("execution_time_seconds"),
+    }
+    for name, segment in customers.get("segments", {}).items():
+        metrics[f"segment.{name}.count"] = segment["count"]
+        metrics[f"segment.{name}.revenue"] = segment["revenue"]
+    interval = pricing.get("revenue_impact_interval") or {}
+    for key in ("p5", "p50", "p95", "probability_positive"):
+        metrics[f"revenue_impact.{key}"] = interval.get(key)
+    return {name: float(value) for name, value in metrics.items() if value is not None}
+
+
+class RunHistory:
+    """Workflow runs in one SQLite file, safe to share across threads and processes
+
+    Each thread gets its own connection. With WAL, readers see a consistent
+    snapshot while a writer commits. Full results are kept as compressed JSON
+    unless store_results=False.
+    """
+
+    def __init__(self, path: Optional[str] = None, store_results: bool = True,
+                 busy_timeout: float = 5.0):
+        self.path = path or default_history_path()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self.store_results = store_results
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            db.execute("PRAGMA journal_mode = WAL")
+            # Durable at checkpoints; a crash can lose only the last commits, never corrupt
+            db.execute("PRAGMA synchronous = NORMAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def close(self):
+        with self._lock:
+            for db in self._connections:
+                db.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def _rows(self, results: Mapping[str, Any]) -> Tuple[tuple, List[tuple]]:
+        meta = results.get("workflow_metadata")
+        if meta is None:
+            # A failed tenant from execute_batch: {"tenant_id", "status": "error", "error"}
+            started = time.time()
+            run = (new_run_id(started), results.get("tenant_id", "default"), started, None,
+                   results.get("status", "error"), None)
+            return run, []
+        started = meta.get("started") or time.time()
+        run_id = meta.get("workflow_id") or new_run_id(started)
+        blob = zlib.compress(encode_compact_json(results)) if self.store_results else None
+        run = (run_id, meta["tenant_id"], started, meta.get("execution_time_seconds"), "success", blob)
+        metrics = [(run_id, name, meta["tenant_id"], started, value)
+                   for name, value in run_metrics(results).items()]
+        return run, metrics
+
+    def record(self, results: Mapping[str, Any]) -> str:
+        """Store one workflow result; returns its run ID"""
+        return self.record_many([results])[0]
+
+    def record_many(self, results: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Store many results in one transaction; returns their run IDs
+
+        A repeated run ID raises sqlite3.IntegrityError and stores nothing.
+        """
+        runs, metrics = [], []
+        for result in results:
+            run, run_metric_rows = self._rows(result)
+            runs.append(run)
+            metrics.extend(run_metric_rows)
+        with self._connect() as db:
+            db.executemany("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?)", runs)
+            db.executemany("INSERT INTO metrics VALUES (?, ?, ?, ?, ?)", metrics)
+        return [run[0] for run in runs]
+
+    def prune(self, before: TimeBound) -> int:
+        """Delete runs started before a time; returns how many were removed"""
+        cutoff = _epoch(before, 0.0)
+        with self._connect() as db:
+            db.execute("DELETE FROM metrics WHERE started < ?", (cutoff,))
+            return db.execute("DELETE FROM runs WHERE started < ?", (cutoff,)).rowcount
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _run_dict(row: tuple) -> Dict[str, Any]:
+        run_id, tenant_id, started, execution_time, status = row
+        return {"run_id": run_id, "tenant_id": tenant_id, "started": started,
+                "execution_time_seconds": execution_time, "status": status}
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """The stored result of one run as plain dicts, or None"""
+        row = self._connect().execute("SELECT result FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def runs(self, tenant_id: Optional[str] = None, start: TimeBound = None, end: TimeBound = None,
+             limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Runs in a time range (optionally for one tenant), newest first"""
+        where, params = "started BETWEEN ? AND ?", [_epoch(start, 0.0), _epoch(end, float("inf"))]
+        if tenant_id is not None:
+            where, params = "tenant_id = ? AND " + where, [tenant_id] + params
+        rows = self._connect().execute(
+            f"SELECT run_id, tenant_id, started, execution_time, status FROM runs WHERE {where} "
+            f"ORDER BY started DESC LIMIT ?", params + [-1 if limit is None else limit]).fetchall()
+        return [self._run_dict(row) for row in rows]
+
+    def latest(self, tenant_id: str, at: TimeBound = None) -> Optional[Dict[str, Any]]:
+        """Most recent successful run of a tenant started at or before `at`"""
+        row = self._connect().execute(
+            "SELECT run_id, tenant_id, started, execution_time, status FROM runs "
+            "WHERE tenant_id = ? AND started <= ? AND status = 'success' ORDER BY started DESC LIMIT 1",
+            (tenant_id, _epoch(at, float("inf")))).fetchone()
+        return self._run_dict(row) if row else None
+
+    def metrics(self, run_id: str) -> Dict[str, float]:
+        rows = self._connect().execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,))
+        return dict(rows.fetchall())
+
+    def metric_series(self, metric: str, tenant_id: Optional[str] = None, start: TimeBound = None,
+                      end: TimeBound = None, min_value: Optional[float] = None,
+                      max_value: Optional[float] = None) -> List[Tuple[float, float, str, str]]:
+        """(started, value, tenant_id, run_id) of one metric over time, oldest first"""
+        where = "name = ? AND started BETWEEN ? AND ?"
+        params: List[Any] = [metric, _epoch(start, 0.0), _epoch(end, float("inf"))]
+        if tenant_id is not None:
+            where, params = "tenant_id = ? AND " + where, [tenant_id] + params
+        if min_value is not None:
+            where, params = where + " AND value >= ?", params + [min_value]
+        if max_value is not None:
+            where, params = where + " AND value <= ?", params + [max_value]
+        return self._connect().execute(
+            f"SELECT started, value, tenant_id, run_id FROM metrics WHERE {where} ORDER BY started",
+            params).fetchall()
+
+    def top(self, metric: str, start: TimeBound = None, end: TimeBound = None, limit: int = 10,
+            descending: bool = True) -> List[Tuple[float, str, str, float]]:
+        """(value, tenant_id, run_id, started) of the runs ranking highest (or lowest) on a metric"""
+        order = "DESC" if descending else "ASC"
+        return self._connect().execute(
+            f"SELECT value, tenant_id, run_id, started FROM metrics "
+            f"WHERE name = ? AND started BETWEEN ? AND ? ORDER BY value {order} LIMIT ?",
+            (metric, _epoch(start, 0.0), _epoch(end, float("inf")), limit)).fetchall()
+
+    def compare(self, tenant_id: str, days: float = 7, at: TimeBound = None) -> Optional[Dict[str, Any]]:
+        """Latest run vs the latest run at least `days` earlier, metric by metric
+
+        Returns None when the tenant has no runs; "previous" is None when
+        nothing is old enough to compare against.
+        """
+        current = self.latest(tenant_id, at)
+        if current is None:
+            return None
+        previous = self.latest(tenant_id, current["started"] - days * 86400)
+        now = self.metrics(current["run_id"])
+        then = self.metrics(previous["run_id"]) if previous else {}
+        comparison = {}
+        for name, value in now.items():
+            old = then.get(name)
+            change = (value - old) / abs(old) if old else None
+            comparison[name] = {"current": value, "previous": old,
+                                "change": round(change, 4) if change is not None else None}
+        return {"current": current, "previous": previous, "metrics": comparison}
+
+
+_default_history: Optional[RunHistory] = None
+_default_lock = threading.Lock()
+
+
+def get_run_history(path: Optional[str] = None) -> RunHistory:
+    """Process-wide history at `path`, else default_history_path()"""
+    global _default_history
+    with _default_lock:
+        if _default_history is None:
+            _default_history = RunHistory(path)
+    return _default_history
+
+
+def history_from_env() -> Optional[RunHistory]:
+    """The process-wide history if ADK_RUN_HISTORY is set, else None"""
+    return get_run_history() if os.environ.get(HISTORY_ENV) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the workflow run history")
+    parser.add_argument("path", nargs="?", default=None,
+                        help="History database (default: $ADK_RUN_HISTORY or the user data directory)")
+    parser.add_argument("--tenant", default=None)
+    parser.add_argument("--compare", action="store_true", help="Latest run vs a week earlier")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--metric", default=None, help="Print one metric over time")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    history = RunHistory(args.path)
+    if args.compare:
+        started = time.perf_counter()
+        report = history.compare(args.tenant or "default", args.days)
+        elapsed = (time.perf_counter() - started) * 1000
+        if report is None:
+            print(f"❌ No runs for tenant {args.tenant or 'default'}")
+            return
+        previous = report["previous"]["run_id"] if report["previous"] else "none"
+        print(f"📊 {report['current']['run_id']} vs {previous} ({elapsed:.2f} ms)")
+        for name, row in sorted(report["metrics"].items()):
+            change = f"{row['change']:+.1%}" if row["change"] is not None else "n/a"
+            print(f"   {name:<32} {row['current']:>14,.2f}  {change:>8}")
+    elif args.metric:
+        for started, value, tenant_id, run_id in history.metric_series(args.metric, args.tenant)[-args.limit:]:
+            print(f"   {datetime.fromtimestamp(started):%Y-%m-%d %H:%M:%S}  {tenant_id:<16} {value:>14,.4f}  {run_id}")
+    else:
+        print(f"🗂️  {len(history):,} runs in {history.path}")
+        for run in history.runs(args.tenant, limit=args.limit):
+            print(f"   {run['run_id']}  {run['tenant_id']:<16} {run['status']:<8} "
+                  f"{run['execution_time_seconds'] or 0:.3f}s")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# sales_query.py - Range, downsampling and pagination for sales history
+# Serves /sales?from=&to=&granularity=hour|day|week&limit=&cursor= from the
+# order store: only the partitions covering the requested page are touched,
+# and long ranges come back a page of buckets at a time.
+
+import base64
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from order_store import GRANULARITY_SECONDS, OrderEventStore, SECONDS_PER_DAY, bucket_start
+
+DEFAULT_RANGE_DAYS = 30
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Query parameters that turn /sales into a history query
+RANGE_PARAMS = frozenset({"from", "to", "granularity", "limit", "cursor"})
+
+# Representable range: 0001-01-01T00:00:00Z .. 9999-12-31T23:59:59Z
+MIN_TIME = int(datetime(1, 1, 1, tzinfo=timezone.utc).timestamp())
+MAX_TIME = int(datetime(9999, 12, 31, 23, 59, 59, tzinfo=timezone.utc).timestamp())
+
+
+class QueryError(ValueError):
+    """Invalid range query parameters (reported to clients as 400)"""
+
+
+def parse_time(value: str) -> int:
+    """Epoch seconds from a number or an ISO-8601 date/datetime (naive means UTC)"""
+    try:
+        timestamp = int(float(value))
+    except OverflowError:
+        raise QueryError(f"Time {value!r} is out of range")
+    except ValueError:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            timestamp = int(parsed.timestamp())
+        except (ValueError, OverflowError, OSError):
+            raise QueryError(f"Unrecognised time {value!r}; use epoch seconds or ISO-8601")
+    if not MIN_TIME <= timestamp <= MAX_TIME:
+        raise QueryError(f"Time {value!r} is out of range (years 1..9999)")
+    return timestamp
+
+
+def isoformat(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def encode_cursor(granularity: str, start: int, end: int, origin: int) -> str:
+    token = f"{granularity}:{start}:{end}:{origin}".encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int, int]:
+    """(granularity, page start, range end, range start) from a next_cursor"""
+    try:
+        token = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = token.split(":")
+        if len(parts) == 3:
+            # Cursors from before the range start was carried hold only (start, end)
+            parts.append(parts[1])
+        granularity, start, end, origin = parts
+        start, end, origin = int(start), int(end), int(origin)
+    except ValueError:
+        raise QueryError("Invalid cursor")
+    if (granularity not in GRANULARITY_SECONDS or not origin <= start < end
+            or origin < MIN_TIME or end > MAX_TIME):
+        raise QueryError("Invalid cursor")
+    return granularity, start, end, origin
+
+
+def resolve_range(query: Dict[str, List[str]], now: Optional[int] = None) -> Tuple[str, int, int, int]:
+    """(granularity, start, end, range start) with [start, end) aligned to whole buckets
+
+    For a cursor page `start` is where the page begins and `range start` is
+    where the client's original range began; otherwise the two are equal.
+    """
+    def param(name: str) -> str:
+        return query.get(name, [""])[0]
+
+    granularity = param("granularity")
+    if granularity and granularity not in GRANULARITY_SECONDS:
+        raise QueryError(f"granularity must be one of {sorted(GRANULARITY_SECONDS)}")
+    if param("cursor"):
+        cursor_granularity, start, end, origin = decode_cursor(param("cursor"))
+        if granularity and granularity != cursor_granularity:
+            raise QueryError("granularity does not match the cursor")
+        return cursor_granularity, start, end, origin
+
+    granularity = granularity or "day"
+    end = parse_time(param("to")) if param("to") else int(time.time() if now is None else now)
+    start = (parse_time(param("from")) if param("from")
+             else end - DEFAULT_RANGE_DAYS * SECONDS_PER_DAY)
+    if start >= end:
+        raise QueryError("'from' must be earlier than 'to'")
+    # Widen to whole buckets so the first and last ones are complete
+    width = GRANULARITY_SECONDS[granularity]
+    start, end = bucket_start(start, granularity), bucket_start(end - 1, granularity) + width
+    if start < MIN_TIME or end > MAX_TIME:
+        raise QueryError("Range must fall within years 1..9999")
+    return granularity, start, end, start
+
+
+def sales_history(store: OrderEventStore, query: Dict[str, List[str]],
+                  now: Optional[int] = None) -> Dict[str, Any]:
+    """One page of a downsampled sales series plus the cursor for the next page"""
+    granularity, start, end, origin = resolve_range(query, now)
+    try:
+        limit = int(query.get("limit", [DEFAULT_PAGE_SIZE])[0])
+    except ValueError:
+        raise QueryError("limit must be an integer")
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+    page_end = min(end, start + limit * GRANULARITY_SECONDS[granularity])
+    series = store.sales_series(start, page_end, granularity)
+    return {
+        "granularity": granularity,
+        "from": isoformat(origin),
+        "to": isoformat(end),
+        "page": {
+            "from": isoformat(start),
+            "to": isoformat(page_end),
+            "buckets": len(series["bucket_start"]),
+            "next_cursor": encode_cursor(granularity, page_end, end, origin) if page_end < end else None,
+        },
+        "total_sales": round(float(series["sales"].sum()), 2),
+        "transactions": int(series["orders"].sum()),
+        "bucket_start": series["bucket_start"],
+        "sales": series["sales"],
+        "orders": series["orders"],
+    }
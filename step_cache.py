@@ -0,0 +1,113 @@
+# step_cache.py - Memoization of workflow step results
+# Results are keyed on a stable fingerprint of the step's inputs, expire after a
+# TTL and are evicted least-recently-used once the cache exceeds its byte budget.
+
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from result_models import RecommendationTable, ResultModel, stored_fields
+
+# Keys (and result model fields) that change on every call without changing what a result means
+VOLATILE_KEYS = frozenset({"timestamp", "created"})
+
+
+def _feed(digest, value: Any, volatile: frozenset):
+    if isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            if key in volatile:
+                continue
+            _feed(digest, key, volatile)
+            _feed(digest, value[key], volatile)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _feed(digest, item, volatile)
+        digest.update(b"]")
+    elif isinstance(value, np.ndarray):
+        digest.update(f"nd:{value.dtype.str}:{value.shape}:".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (ResultModel, RecommendationTable)):
+        # Stored fields only; derived keys are functions of them
+        digest.update(f"{type(value).__name__}(".encode())
+        for name in stored_fields(type(value)):
+            if name not in volatile:
+                _feed(digest, name, volatile)
+                _feed(digest, getattr(value, name), volatile)
+        digest.update(b")")
+    else:
+        if isinstance(value, np.generic):
+            value = value.item()
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def fingerprint(value: Any, volatile: Iterable[str] = VOLATILE_KEYS) -> str:
+    """Stable hash of nested dicts/lists/arrays/scalars and result models, ignoring volatile keys"""
+    digest = hashlib.sha256()
+    _feed(digest, value, frozenset(volatile))
+    return digest.hexdigest()
+
+
+class StepCache:
+    """Thread-safe TTL + LRU cache bounded by the pickled size of its values"""
+
+    MISS = object()
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """Cached value for key, or StepCache.MISS"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return self.MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store value unless it is larger than the budget or cannot be pickled to be sized"""
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # e.g. a result holding a lock or an open handle; it is simply not cached
+            return
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (expires_at, size, value)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
@@ -0,0 +1,84 @@
+# test_agent_registry.py - Lazy ADK agent construction and tools-only mode
+
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from agent_registry import AgentRegistry, AgentSpec, AgentsDisabledError
+
+SPECS = {
+    "data": AgentSpec("DataAgent", "model", "Collect data", [len]),
+    "pricing": AgentSpec("PricingAgent", "model", "Price things", [sum]),
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def fake_adk(monkeypatch):
+    """A google.adk.agents module whose LlmAgent records its constructor arguments"""
+    built = []
+
+    class LlmAgent:
+        model_fields = {}
+
+        def __init__(self, **kwargs):
+            self.__dict__.update(kwargs)
+            built.append(kwargs["name"])
+
+    agents = types.ModuleType("google.adk.agents")
+    agents.LlmAgent = LlmAgent
+    monkeypatch.setitem(sys.modules, "google", types.ModuleType("google"))
+    monkeypatch.setitem(sys.modules, "google.adk", types.ModuleType("google.adk"))
+    monkeypatch.setitem(sys.modules, "google.adk.agents", agents)
+    return built
+
+
+def test_orchestrators_do_not_import_adk_until_an_agent_is_used():
+    code = (
+        "import sys\n"
+        "from adk_hackathon_full_file import ADK_AGENT_SPECS, EcommerceAnalyticsOrchestrator\n"
+        "from agent_registry import AgentRegistry, AgentsDisabledError\n"
+        "registry = AgentRegistry(ADK_AGENT_SPECS, tools_only=True)\n"
+        "assert sorted(registry) == sorted(ADK_AGENT_SPECS) and 'data' in registry\n"
+        "try:\n"
+        "    registry['data']\n"
+        "except AgentsDisabledError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise AssertionError('tools-only registry built an agent')\n"
+        "for tools_only in (True, False):\n"
+        "    orchestrator = EcommerceAnalyticsOrchestrator(tools_only=tools_only)\n"
+        "    orchestrator.close()\n"
+        "    assert orchestrator.agents.built == []\n"
+        "assert not [name for name in sys.modules if name.startswith('google.adk')]\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    assert "Initialized" not in result.stdout
+
+
+def test_tools_only_lookup_raises_without_building(fake_adk):
+    registry = AgentRegistry(SPECS, tools_only=True)
+    with pytest.raises(AgentsDisabledError):
+        registry["data"]
+    with pytest.raises(KeyError):
+        registry["missing"]
+    assert fake_adk == [] and registry.built == []
+
+
+def test_agents_are_built_once_on_first_access(fake_adk):
+    announced = []
+    registry = AgentRegistry(SPECS, callbacks=lambda: ("before", "after"), on_first_build=announced.append)
+    assert len(registry) == 2 and fake_adk == [] and announced == []
+
+    agent = registry["pricing"]
+    assert registry["pricing"] is agent
+    assert (agent.name, agent.tools, agent.before_model_callback) == ("PricingAgent", [sum], "before")
+    assert announced == [registry] and registry.built == ["pricing"]
+
+    registry.build_all()
+    assert fake_adk == ["PricingAgent", "DataAgent"] and announced == [registry]
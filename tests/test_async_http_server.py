@@ -0,0 +1,126 @@
+# test_async_http_server.py - Request parsing, pipelining and error responses over a real socket
+
+import asyncio
+import json
+
+from async_http_server import MAX_HEADER_BYTES, AsyncHTTPServer, HTTPResponse
+
+
+async def chunks():
+    for part in (b"first,", b"", b"second"):
+        yield part
+
+
+async def handler(request):
+    if request.path == "/boom":
+        raise RuntimeError("handler failed")
+    if request.path == "/stream":
+        return HTTPResponse(200, [("Content-Type", "text/plain")], chunks())
+    body = json.dumps({"path": request.path, "query": request.query,
+                       "agent": request.headers.get("user-agent")}).encode()
+    return HTTPResponse(200, [("Content-Type", "application/json")], body)
+
+
+def exchange(payload: bytes) -> bytes:
+    """Send raw bytes to a fresh server and read until it closes the connection"""
+    async def run():
+        server = AsyncHTTPServer(handler, host="127.0.0.1", port=0, keepalive_timeout=2.0)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(payload)
+        await writer.drain()
+        received = await asyncio.wait_for(reader.read(), 5.0)
+        writer.close()
+        await server.shutdown(drain_timeout=1.0)
+        return received
+
+    return asyncio.run(run())
+
+
+def request(target="/", method="GET", version="HTTP/1.1", headers=(), body=b"") -> bytes:
+    lines = [f"{method} {target} {version}", "Host: test", *headers]
+    if body:
+        lines.append(f"Content-Length: {len(body)}")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+
+def responses(raw: bytes):
+    """Split a stream of Content-Length responses into (status, headers, body)"""
+    parsed = []
+    while raw:
+        head, _, raw = raw.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:])
+        length = int(headers.get("Content-Length", 0))
+        parsed.append((int(lines[0].split(" ")[1]), headers, raw[:length]))
+        raw = raw[length:]
+    return parsed
+
+
+def test_parses_path_query_and_headers():
+    [(status, headers, body)] = responses(exchange(
+        request("/sales?from=2024-01-01&granularity=day", headers=["User-Agent: pytest", "Connection: close"])))
+    assert status == 200
+    assert headers["Connection"] == "close"
+    assert json.loads(body) == {"path": "/sales", "agent": "pytest",
+                                "query": {"from": ["2024-01-01"], "granularity": ["day"]}}
+
+
+def test_pipelined_requests_are_answered_in_order_after_a_handler_error():
+    raw = exchange(request("/one") + request("/boom") + request("/two", headers=["Connection: close"]))
+    (first, _, first_body), (failed, failed_headers, failed_body), (last, _, last_body) = responses(raw)
+    assert (first, failed, last) == (200, 500, 200)
+    assert failed_body == b"Internal Server Error"
+    assert failed_headers["Connection"] == "keep-alive"
+    assert json.loads(first_body)["path"] == "/one" and json.loads(last_body)["path"] == "/two"
+
+
+def test_request_body_is_consumed_before_the_next_request():
+    raw = exchange(request("/a", body=b"ignored") + request("/b", headers=["Connection: close"]))
+    assert [json.loads(body)["path"] for _, _, body in responses(raw)] == ["/a", "/b"]
+
+
+def test_head_sends_length_without_body():
+    [(status, headers, body)] = responses(exchange(request("/x", method="HEAD", headers=["Connection: close"])))
+    assert status == 200
+    assert int(headers["Content-Length"]) > 0
+    assert body == b""
+
+
+def test_other_methods_get_405():
+    raw = exchange(request("/x", method="POST", body=b"{}") + request("/y", headers=["Connection: close"]))
+    (status, headers, _), (after, _, _) = responses(raw)
+    assert status == 405 and headers["Allow"] == "GET, HEAD"
+    assert after == 200
+
+
+def test_malformed_request_line_gets_400_and_closes():
+    raw = exchange(b"GARBAGE\r\n\r\n" + request("/never"))
+    assert raw.startswith(b"HTTP/1.1 400 Bad Request")
+    assert raw.endswith(b"Malformed request line")
+
+
+def test_oversized_headers_get_400():
+    raw = exchange(request("/x", headers=["X-Padding: " + "a" * MAX_HEADER_BYTES]))
+    assert raw.startswith(b"HTTP/1.1 400 Bad Request")
+    assert raw.endswith(b"Request header too large")
+
+
+def test_http10_closes_by_default():
+    [(status, headers, _)] = responses(exchange(request("/x", version="HTTP/1.0")))
+    assert status == 200 and headers["Connection"] == "close"
+
+
+def test_streamed_body_is_chunked_on_http11():
+    raw = exchange(request("/stream", headers=["Connection: close"]))
+    head, _, body = raw.partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding: chunked" in head
+    assert body == b"6\r\nfirst,\r\n6\r\nsecond\r\n0\r\n\r\n"
+
+
+def test_streamed_body_on_http10_is_sent_raw_and_closed():
+    raw = exchange(request("/stream", version="HTTP/1.0", headers=["Connection: keep-alive"]))
+    head, _, body = raw.partition(b"\r\n\r\n")
+    assert b"Transfer-Encoding" not in head and b"Connection: close" in head
+    assert body == b"first,second"
@@ -0,0 +1,56 @@
+# test_customer_segmentation.py - Streaming mini-batch k-means segmentation
+
+import numpy as np
+import pytest
+
+from customer_segmentation import (SEGMENT_NAMES, MiniBatchKMeans, cluster_customers, iter_customer_chunks,
+                                   segment_customers)
+
+
+def customers(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.gamma(2.0, 80.0, n), rng.integers(1, 8, n), rng.uniform(0, 30, n)
+
+
+def test_chunks_smaller_than_the_cluster_count_still_fit():
+    spend, frequency, recency = customers(5)
+    result = cluster_customers(iter_customer_chunks(spend, frequency, recency, chunk_size=2), n_clusters=3,
+                               seed=1)
+    assert result["segments"].column("count").sum() == 5
+    assert len(result["centroids"]) == 3
+
+
+def test_partial_fit_buffers_rows_until_it_can_seed():
+    model = MiniBatchKMeans(n_clusters=3, seed=0)
+    model.partial_fit(np.zeros((2, 3)))
+    assert model.centroids is None
+    model.partial_fit(np.ones((1, 3)))
+    assert model.centroids.shape == (3, 3)
+
+
+def test_chunking_does_not_change_the_customer_totals():
+    spend, frequency, recency = customers(2000)
+    whole = cluster_customers(iter_customer_chunks(spend, frequency, recency), seed=3)
+    chunked = cluster_customers(iter_customer_chunks(spend, frequency, recency, chunk_size=64), seed=3)
+    for result in (whole, chunked):
+        assert result["segments"].names == SEGMENT_NAMES
+        assert result["segments"].column("count").sum() == 2000
+        assert result["segments"].column("revenue").sum() == pytest.approx(spend.sum())
+    # Premium is the highest-spend cluster
+    assert [c["segment"] for c in whole["centroids"]] == list(SEGMENT_NAMES)
+    assert whole["centroids"][0]["spend"] > whole["centroids"][-1]["spend"]
+
+
+@pytest.mark.parametrize("n", [0, 2])
+def test_too_few_customers_give_empty_segments_like_rfm(n):
+    spend, frequency, recency = customers(n)
+    result = cluster_customers(iter_customer_chunks(spend, frequency, recency), n_clusters=3)
+    assert result["segments"].names == SEGMENT_NAMES
+    assert not result["segments"].data.any()
+    assert result["centroids"] == [] and result["inertia"] == 0.0
+    assert result["churn_risk_percentage"] == result["overall_retention"] == 0.0
+
+    empty = segment_customers(np.empty(0), np.empty(0), np.empty(0))
+    np.testing.assert_array_equal(
+        cluster_customers(iter_customer_chunks(np.empty(0), np.empty(0), np.empty(0)))["segments"].data,
+        empty["segments"].data)
@@ -0,0 +1,120 @@
+# test_incremental_analysis.py - Incremental segment and pricing refresh against a full recompute
+
+import time
+
+import numpy as np
+import pytest
+
+from customer_segmentation import segment_customers
+from incremental_analysis import REBASELINE_FRACTION, IncrementalAnalysis
+from order_store import SECONDS_PER_DAY, OrderEventStore, day_of, seed_demo_orders
+from pricing_simulator import estimate_elasticities
+from rolling_aggregates import COUNT, SUM
+
+# Orders appended past the baseline may move customers across the fixed RFM
+# edges, but never by more than this share of the active customers
+SEGMENT_DRIFT = 0.05
+ELASTICITY_TOLERANCE = 1e-10
+
+
+@pytest.fixture
+def seeded():
+    now = time.time()
+    store = OrderEventStore()
+    seed_demo_orders(store, end_day=day_of(now), seed=11)
+    analysis = IncrementalAnalysis(store)
+    return store, analysis, now
+
+
+def append_orders(store, customer_ids, now, seed=3):
+    rng = np.random.default_rng(seed)
+    count = len(customer_ids)
+    first = 10 ** 9 + len(store)
+    store.append_batch(np.full(count, int(now)), np.arange(first, first + count), customer_ids,
+                       rng.integers(0, len(store.categories), count).astype(np.int16),
+                       rng.uniform(10, 200, count).round(2))
+
+
+def full_segments(store, end_day, now):
+    activity = store.customer_activity(end_day - 29, end_day)
+    recency_days = np.maximum(now - activity["last_order"], 0) / SECONDS_PER_DAY
+    return segment_customers(activity["spend"], activity["frequency"], recency_days)
+
+
+def full_elasticities(store, end_day):
+    window = store.aggregates.window(end_day - 89, end_day)[:, :len(store.categories)]
+    return estimate_elasticities(window[:, :, SUM], window[:, :, COUNT])
+
+
+def refresh(analysis, end_day, now):
+    analysis.segments.refresh(end_day, now)
+    analysis.moments.refresh(end_day)
+    return analysis.segments.intelligence(), analysis.moments.elasticities()
+
+
+def assert_elasticities_match(analysis_elasticities, store, end_day):
+    for incremental, full in zip(analysis_elasticities, full_elasticities(store, end_day)):
+        np.testing.assert_allclose(incremental, full, rtol=0, atol=ELASTICITY_TOLERANCE)
+
+
+def test_initial_build_matches_full_recompute(seeded):
+    store, analysis, now = seeded
+    end_day = day_of(now)
+    customers, elasticities = refresh(analysis, end_day, now)
+    full = full_segments(store, end_day, now)
+
+    np.testing.assert_array_equal(customers.segments.data, full["segments"].data)
+    assert customers.churn_risk_percentage == full["churn_risk_percentage"]
+    assert customers.overall_retention == full["overall_retention"]
+    assert_elasticities_match(elasticities, store, end_day)
+
+
+def test_small_delta_stays_within_drift(seeded):
+    store, analysis, now = seeded
+    end_day = day_of(now)
+    refresh(analysis, end_day, now)
+    baseline_edges = analysis.segments.edges
+    active = int(analysis.segments.totals[0].sum())
+
+    # A handful of returning customers, well under the rebaseline threshold
+    changed = np.unique(store.customer_activity(end_day - 29, end_day)["customer_id"])[:10]
+    assert len(changed) < REBASELINE_FRACTION * active
+    append_orders(store, changed, now)
+    customers, elasticities = refresh(analysis, end_day, now)
+    full = full_segments(store, end_day, now)
+
+    assert analysis.segments.edges is baseline_edges
+    # Customer counts, revenue and retained customers are sums, so they stay exact overall
+    np.testing.assert_allclose(customers.segments.data.sum(axis=0), full["segments"].data.sum(axis=0))
+    moved = np.abs(customers.segments.column("count") - full["segments"].column("count")).sum() / 2
+    assert moved <= SEGMENT_DRIFT * active
+    assert_elasticities_match(elasticities, store, end_day)
+
+
+def test_large_delta_rebaselines_to_exact_match(seeded):
+    store, analysis, now = seeded
+    end_day = day_of(now)
+    refresh(analysis, end_day, now)
+    baseline_edges = analysis.segments.edges
+    active = int(analysis.segments.totals[0].sum())
+
+    # New customers past the rebaseline threshold re-derive the edges
+    first = 10 ** 6
+    append_orders(store, np.arange(first, first + int(REBASELINE_FRACTION * active) + 1), now)
+    customers, elasticities = refresh(analysis, end_day, now)
+    full = full_segments(store, end_day, now)
+
+    assert analysis.segments.edges is not baseline_edges
+    np.testing.assert_array_equal(customers.segments.data, full["segments"].data)
+    assert customers.churn_risk_percentage == full["churn_risk_percentage"]
+    assert customers.overall_retention == full["overall_retention"]
+    assert_elasticities_match(elasticities, store, end_day)
+
+
+def test_refresh_without_new_orders_changes_nothing(seeded):
+    store, analysis, now = seeded
+    end_day = day_of(now)
+    first, _ = refresh(analysis, end_day, now)
+    assert analysis.segments.refresh(end_day, now) == 0
+    assert analysis.moments.refresh(end_day) == 0
+    np.testing.assert_array_equal(analysis.segments.intelligence().segments.data, first.segments.data)
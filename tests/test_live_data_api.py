@@ -0,0 +1,38 @@
+# test_live_data_api.py - Tenant lookup on the live data API endpoints
+
+import pytest
+
+import order_store
+from live_data_api import build_response
+from order_store import OrderEventStore, find_order_store, reset_order_stores, set_order_store
+
+
+@pytest.fixture(autouse=True)
+def clean_stores(monkeypatch):
+    monkeypatch.delenv("ADK_ORDER_STORE_DIR", raising=False)
+    reset_order_stores()
+    yield
+    reset_order_stores()
+
+
+@pytest.mark.parametrize("path", ["/sales", "/customers", "/all"])
+def test_unknown_tenant_is_404_and_creates_no_store(path):
+    status, payload = build_response(path, {"tenant": ["nobody"]})
+    assert status == 404 and "nobody" in payload["error"]
+    assert "nobody" not in order_store._stores
+
+
+def test_history_query_for_unknown_tenant_is_404():
+    status, _ = build_response("/sales", {"tenant": ["../etc"], "from": ["2024-01-01"]})
+    assert status == 404
+
+
+def test_loaded_and_on_disk_tenants_are_served(tmp_path, monkeypatch):
+    set_order_store(OrderEventStore(), "loaded")
+    assert build_response("/sales", {"tenant": ["loaded"]})[0] == 200
+
+    monkeypatch.setenv("ADK_ORDER_STORE_DIR", str(tmp_path))
+    (tmp_path / "tenants" / "acme").mkdir(parents=True)
+    assert find_order_store("acme") is not None
+    assert find_order_store("other") is None
+    assert build_response("/customers", {"tenant": ["acme"]})[0] == 200
@@ -0,0 +1,188 @@
+# test_llm_cache.py - LLM call cache against a local stub model
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_cache import CacheBackend, DiskCacheBackend, LLMCallCache, MemoryCacheBackend, adk_model_callbacks
+
+
+class StubModel:
+    """Async model that answers after `release` is set, or raises if `error` is given"""
+
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"answer-{self.calls}"
+
+
+def make_cache(wait_timeout=30.0):
+    return LLMCallCache(MemoryCacheBackend(), wait_timeout=wait_timeout)
+
+
+def call(cache, model, prompt="how are sales?"):
+    return cache.call("stub", "instruction", prompt, None, model)
+
+
+def test_repeated_prompt_is_a_cache_hit():
+    async def run():
+        cache, model = make_cache(), StubModel()
+        model.release.set()
+        first = await call(cache, model)
+        second = await call(cache, model)
+        return cache, model, first, second
+
+    cache, model, first, second = asyncio.run(run())
+    assert first == second == "answer-1"
+    assert model.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_different_prompts_are_not_shared():
+    async def run():
+        cache, model = make_cache(), StubModel()
+        model.release.set()
+        return model, [await call(cache, model, prompt) for prompt in ("a", "b")]
+
+    model, answers = asyncio.run(run())
+    assert answers == ["answer-1", "answer-2"]
+    assert model.calls == 2
+
+
+def test_concurrent_identical_prompts_share_one_call():
+    async def run():
+        cache, model = make_cache(), StubModel()
+        tasks = [asyncio.ensure_future(call(cache, model)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        model.release.set()
+        return cache, model, await asyncio.gather(*tasks)
+
+    cache, model, answers = asyncio.run(run())
+    assert answers == ["answer-1"] * 5
+    assert model.calls == 1
+    assert cache.deduplicated == 4
+    assert cache._in_flight == {}
+
+
+def test_owner_failure_releases_waiters_immediately():
+    async def run():
+        cache = make_cache(wait_timeout=30.0)
+        failing, fallback = StubModel(error=RuntimeError("model down")), StubModel()
+        fallback.release.set()
+        owner = asyncio.ensure_future(call(cache, failing))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(call(cache, fallback)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        failing.release.set()
+        answers = await asyncio.gather(*waiters)
+        with pytest.raises(RuntimeError):
+            await owner
+        return cache, fallback, answers, time.perf_counter() - started
+
+    cache, fallback, answers, elapsed = asyncio.run(run())
+    # Each waiter falls back to its own call rather than waiting out wait_timeout
+    assert elapsed < 1.0
+    assert fallback.calls == 3 and len(answers) == 3
+    assert cache._in_flight == {}
+    assert cache.backend._values == {}
+
+
+# =============================================================================
+# ADK CALLBACKS
+# =============================================================================
+
+def request(text="how are sales?"):
+    part = SimpleNamespace(function_response=None, function_call=None, text=text)
+    return SimpleNamespace(model="stub", config=SimpleNamespace(system_instruction="instruction"),
+                           contents=[SimpleNamespace(role="user", parts=[part])], tools_dict={})
+
+
+def context(invocation_id):
+    return SimpleNamespace(invocation_id=invocation_id, agent_name="PricingStrategyAgent")
+
+
+def test_model_error_callback_releases_deduplicated_waiters():
+    async def run():
+        cache = make_cache(wait_timeout=30.0)
+        before, _, on_error = adk_model_callbacks(cache)
+        # The first invocation owns the call and lets the model run
+        assert await before(context("owner"), request()) is None
+        waiter = asyncio.ensure_future(before(context("waiter"), request()))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        started = time.perf_counter()
+        on_error(context("owner"), request(), RuntimeError("model down"))
+        result = await waiter
+        return cache, result, time.perf_counter() - started
+
+    cache, result, elapsed = asyncio.run(run())
+    # None means "call the model yourself"
+    assert result is None
+    assert elapsed < 1.0
+    assert cache.deduplicated == 1
+
+
+def test_successful_response_is_stored_for_later_calls():
+    async def run():
+        cache = make_cache()
+        before, after, _ = adk_model_callbacks(cache)
+        assert await before(context("owner"), request()) is None
+        response = SimpleNamespace(partial=False, error_code=None,
+                                   model_dump_json=lambda exclude_none: '{"text": "ok"}')
+        after(context("owner"), response)
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache._in_flight == {}
+    assert list(cache.backend._values.values()) == ['{"text": "ok"}']
+
+
+def test_error_response_is_not_cached():
+    async def run():
+        cache = make_cache()
+        before, after, _ = adk_model_callbacks(cache)
+        await before(context("owner"), request())
+        after(context("owner"), SimpleNamespace(partial=False, error_code="RESOURCE_EXHAUSTED"))
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache._in_flight == {}
+    assert cache.backend._values == {}
+
+
+def test_next_call_releases_a_call_left_pending():
+    # Without on_model_error_callback (older ADK) a raised call never reaches after_model
+    async def run():
+        cache = make_cache()
+        before, _, _ = adk_model_callbacks(cache)
+        await before(context("owner"), request("first prompt"))
+        await before(context("owner"), request("retry"))
+        return cache
+
+    cache = asyncio.run(run())
+    assert len(cache._in_flight) == 1
+
+
+def test_backends_must_implement_get_and_set(tmp_path):
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError):
+        GetOnly()
+    for backend in (MemoryCacheBackend(), DiskCacheBackend(str(tmp_path))):
+        assert backend.get("ab12") is None
+        backend.set("ab12", "value")
+        assert backend.get("ab12") == "value"
@@ -0,0 +1,101 @@
+# test_order_segments.py - On-disk segment format and OrderEventStore flush/reopen round trip
+
+import os
+
+import numpy as np
+import pytest
+
+import order_segments
+from order_store import SECONDS_PER_DAY, OrderEventStore
+
+DAY = 20000
+
+
+def orders(day, count, first_id=0, seed=0):
+    rng = np.random.default_rng(seed)
+    return (day * SECONDS_PER_DAY + np.sort(rng.integers(0, SECONDS_PER_DAY, count)),
+            np.arange(first_id, first_id + count), rng.integers(0, 50, count),
+            rng.choice(["Books", "Clothing", "Home"], count), rng.uniform(5, 300, count).round(2))
+
+
+def test_segment_columns_round_trip(tmp_path):
+    columns = {
+        "timestamp": np.array([30, 10, 20], dtype=np.int64),
+        "category": np.array([2, 0, 1], dtype=np.int16),
+        "amount": np.array([1.5, 2.25, 3.0]),
+    }
+    written = order_segments.write_segment(str(tmp_path), DAY, 4, columns)
+    order_segments.write_index(str(tmp_path), [written])
+
+    [segment] = order_segments.read_index(str(tmp_path))
+    assert (segment.day, segment.seq, segment.min_ts, segment.max_ts, segment.size) == (DAY, 4, 10, 30, 3)
+    for name, values in columns.items():
+        mapped = segment.column(name)
+        assert isinstance(mapped, np.memmap) and not mapped.flags.writeable
+        assert mapped.dtype == values.dtype
+        np.testing.assert_array_equal(mapped, values)
+    assert segment.overlaps(30, 31) and not segment.overlaps(31, 40)
+
+
+def test_index_rejects_unknown_format(tmp_path):
+    order_segments.write_index(str(tmp_path), [])
+    path = tmp_path / order_segments.INDEX_FILE
+    path.write_bytes(b"XXXX" + path.read_bytes()[4:])
+    with pytest.raises(ValueError):
+        order_segments.read_index(str(tmp_path))
+
+
+def test_categories_round_trip_and_limit(tmp_path):
+    order_segments.write_categories(str(tmp_path), ["Books", "Home & Garden"])
+    assert order_segments.read_categories(str(tmp_path)) == ["Books", "Home & Garden"]
+    with pytest.raises(ValueError):
+        order_segments.write_categories(str(tmp_path), ["x" * (order_segments.CATEGORY_SLOT + 1)])
+
+
+def test_store_flush_and_reopen(tmp_path):
+    data_dir = str(tmp_path / "store")
+    store = OrderEventStore(data_dir)
+    store.append_batch(*orders(DAY, 100))
+    store.append_batch(*orders(DAY + 1, 60, first_id=100, seed=1))
+    expected = store.scan(DAY, DAY + 1)
+    summary = store.sales_summary(DAY, DAY + 1)
+    assert store.flush() == 160
+    assert store.flush() == 0
+
+    reopened = OrderEventStore(data_dir)
+    assert len(reopened) == 160
+    assert reopened.categories == store.categories
+    assert reopened.days() == [DAY, DAY + 1]
+    for name, values in reopened.scan(DAY, DAY + 1).items():
+        np.testing.assert_array_equal(values, expected[name])
+    reloaded = reopened.sales_summary(DAY, DAY + 1)
+    np.testing.assert_allclose(reloaded["daily_sales"], summary["daily_sales"])
+    assert reloaded["category_sales"] == pytest.approx(summary["category_sales"])
+
+
+def test_reopened_store_reads_segments_and_new_rows_in_order(tmp_path):
+    data_dir = str(tmp_path / "store")
+    store = OrderEventStore(data_dir)
+    store.append_batch(*orders(DAY, 40))
+    store.flush()
+
+    reopened = OrderEventStore(data_dir)
+    reopened.append_batch(*orders(DAY, 10, first_id=40, seed=2))
+    assert reopened.day_size(DAY) == 50
+    np.testing.assert_array_equal(reopened.read_day(DAY, 35, 45, ("order_id",))["order_id"],
+                                  np.arange(35, 45))
+    reopened.flush()
+
+    # A second flush of the same day adds a new segment rather than rewriting the first
+    segments = order_segments.read_index(data_dir)
+    assert [(seg.day, seg.seq, seg.size) for seg in segments] == [(DAY, 0, 40), (DAY, 1, 10)]
+    assert sorted(os.listdir(data_dir)) == sorted([
+        order_segments.INDEX_FILE, order_segments.CATEGORIES_FILE, order_segments.AGGREGATES_FILE,
+        order_segments.segment_dirname(DAY, 0), order_segments.segment_dirname(DAY, 1)])
+    np.testing.assert_array_equal(OrderEventStore(data_dir).scan(DAY, DAY, ("order_id",))["order_id"],
+                                  np.arange(50))
+
+
+def test_flush_requires_data_dir():
+    with pytest.raises(ValueError):
+        OrderEventStore().flush()
@@ -0,0 +1,88 @@
+# test_pricing_simulator.py - Elasticity fits, revenue projections and action ranking
+
+import numpy as np
+import pytest
+
+from pricing_simulator import (DEFAULT_ADJUSTMENTS, PRIOR_ELASTICITY, elasticities_from_moments,
+                               daily_log_points, estimate_elasticities, project_revenue,
+                               revenue_multiplier, simulate_pricing, top_actions)
+from rolling_aggregates import AGGREGATE_FIELDS, COUNT, SUM
+
+TRUE_ELASTICITY = np.array([-1.8, -0.7])
+
+
+def price_history(days=90, seed=0):
+    """(sales, orders) per (day, category) with constant-elasticity demand and a little noise"""
+    rng = np.random.default_rng(seed)
+    price = np.exp(rng.normal(np.log([40.0, 120.0]), 0.15, size=(days, 2)))
+    orders = 5000 * price ** TRUE_ELASTICITY * np.exp(rng.normal(0, 0.02, size=(days, 2)))
+    return orders * price, orders
+
+
+def test_estimate_elasticities_recovers_known_values():
+    sales, orders = price_history()
+    elasticity, std_error = estimate_elasticities(sales, orders)
+    np.testing.assert_allclose(elasticity, TRUE_ELASTICITY, atol=0.05)
+    assert (std_error < 0.05).all()
+
+
+def test_sparse_history_falls_back_to_the_prior():
+    sales, orders = price_history(days=2)
+    elasticity, std_error = estimate_elasticities(sales, orders)
+    np.testing.assert_allclose(elasticity, PRIOR_ELASTICITY)
+    empty, _ = estimate_elasticities(np.zeros((30, 1)), np.zeros((30, 1)))
+    np.testing.assert_allclose(empty, PRIOR_ELASTICITY)
+
+
+def test_moments_match_the_daily_fit():
+    sales, orders = price_history()
+    observed, price, volume = daily_log_points(sales, orders)
+    w = observed.astype(float)
+    moments = np.stack([w.sum(0), (w * price).sum(0), (w * volume).sum(0), (w * price * price).sum(0),
+                        (w * price * volume).sum(0), (w * volume * volume).sum(0)])
+    for got, want in zip(elasticities_from_moments(moments), estimate_elasticities(sales, orders)):
+        np.testing.assert_allclose(got, want, rtol=1e-6)
+
+
+def test_revenue_multiplier_and_projection():
+    # No change is no change; a 10% rise at e=-1 loses 1% without churn
+    assert revenue_multiplier(0.0, -1.5, 0.2) == pytest.approx(1.0)
+    assert revenue_multiplier(0.1, -1.0, 0.0) == pytest.approx(0.99)
+    # Churn only penalises price rises
+    assert revenue_multiplier(0.1, -1.0, 0.2) < revenue_multiplier(0.1, -1.0, 0.0)
+    assert revenue_multiplier(-0.1, -1.0, 0.2) == revenue_multiplier(-0.1, -1.0, 0.0)
+
+    delta = project_revenue(np.array([100.0, 200.0]), np.array([-0.5, -1.5]), DEFAULT_ADJUSTMENTS)
+    assert delta.shape == (2, len(DEFAULT_ADJUSTMENTS))
+    # Revenue peaks at a = -(1 + e) / (2e), clipped to the adjustment grid
+    assert DEFAULT_ADJUSTMENTS[delta[0].argmax()] == pytest.approx(0.2)
+    assert DEFAULT_ADJUSTMENTS[delta[1].argmax()] == pytest.approx(-1 / 6, abs=0.005)
+
+
+def test_top_actions_drops_no_change_and_losses():
+    adjustments = np.array([-0.1, 0.0, 0.1])
+    delta = np.array([[[-5.0, 0.0, 3.0]],     # gain at +10%
+                      [[-1.0, 0.0, -2.0]],    # best is "do nothing"
+                      [[-4.0, -1.0, -3.0]],   # every option loses revenue
+                      [[7.0, 0.0, 1.0]]])     # gain at -10%
+    assert top_actions(delta, adjustments, 10) == [(3, 0, 0, 7.0), (0, 0, 2, 3.0)]
+    assert top_actions(delta, adjustments, 1) == [(3, 0, 0, 7.0)]
+    assert top_actions(delta[1:3], adjustments, 5) == []
+
+
+def test_simulate_pricing_on_an_aggregate_window():
+    sales, orders = price_history()
+    window = np.zeros(sales.shape + (len(AGGREGATE_FIELDS),))
+    window[:, :, SUM], window[:, :, COUNT] = sales, orders
+    segments = {"premium": {"count": 10, "revenue": 6000.0, "avg_value": 600.0},
+                "budget": {"count": 90, "revenue": 4000.0, "avg_value": 44.0}}
+    result = simulate_pricing(window, ["elastic", "inelastic"], segments, top_k=3)
+
+    assert result["combinations_evaluated"] == 2 * 2 * len(DEFAULT_ADJUSTMENTS)
+    assert result["elasticities"]["elastic"] == pytest.approx(-1.8, abs=0.05)
+    assert 0 < len(result["actions"]) <= 3
+    gains = [action["revenue_delta"] for action in result["actions"]]
+    assert gains == sorted(gains, reverse=True) and min(gains) > 0
+    # Inelastic demand rewards a price rise, elastic demand a cut
+    for action in result["actions"]:
+        assert (action["adjustment"] > 0) == (action["elasticity"] > -1)
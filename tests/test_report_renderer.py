@@ -0,0 +1,81 @@
+# test_report_renderer.py - Template compiler escaping, report file naming and batch rendering
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from report_renderer import Template, TemplateError, render_batch, render_report, report_path
+
+SCRIPT = "<script>alert('x')</script>"
+
+
+def workflow_results(tenant_id="default", category="electronics"):
+    return {
+        "workflow_metadata": {
+            "workflow_id": f"wf-{tenant_id}", "tenant_id": tenant_id, "adk_version": "1.0",
+            "model_used": "gemini", "agents_orchestrated": ["data", "pricing"],
+            "execution_time_seconds": 1.25,
+        },
+        "sales_analysis": {"total_sales": 1234.5, "transactions": 10, "avg_order_value": 123.45,
+                           "top_categories": {category: 1234.5}},
+        "customer_intelligence": {"segments": {"premium": {"count": 3}},
+                                  "overall_retention": 80.0, "churn_risk_percentage": 20.0},
+        "pricing_strategy": {
+            "recommendations": [{"action": "increase_price", "category": category, "adjustment": "+5%",
+                                 "reason": "High demand", "expected_impact": "+3% revenue"}],
+            "total_expected_revenue_impact": "+3%", "risk_assessment": "low",
+            "implementation_priority": "high",
+        },
+        "business_insights": {"key_opportunities": [category], "recommended_actions": ["Raise prices"],
+                              "business_metrics": {"revenue_growth": {"p5": -0.01, "p95": 0.05}}},
+        "performance_metrics": {"total_revenue_analyzed": 1234.5, "customers_segmented": 3,
+                                "pricing_recommendations": 1, "business_opportunities": 1},
+    }
+
+
+def test_fields_are_escaped_unless_raw():
+    template = Template("{{ name }}|{{ name|raw }}|{% for item in items %}<i>{{ item }}</i>{% endfor %}")
+    html = template.render({"name": SCRIPT, "items": ['"quoted" & <b>']})
+    assert html.startswith("&lt;script&gt;alert(&#x27;x&#x27;)&lt;/script&gt;|<script>")
+    assert "<i>&quot;quoted&quot; &amp; &lt;b&gt;</i>" in html
+
+
+def test_report_escapes_tenant_supplied_strings():
+    html = render_report(workflow_results(tenant_id=SCRIPT, category=SCRIPT))
+    assert "<script>" not in html
+    assert "wf-&lt;script&gt;" in html
+    assert "-1.0% to +5.0%" in html
+
+
+def test_generate_chunks_concatenate_to_render():
+    template = Template("{% for item in items %}{{ item }},{% endfor %}")
+    context = {"items": list(range(1000))}
+    chunks = list(template.generate(context, chunk_size=100))
+    assert len(chunks) > 1
+    assert "".join(chunks) == template.render(context)
+
+
+@pytest.mark.parametrize("source", ["{% for x in xs %}", "{% endfor %}", "{% if x %}", "{{ x|upper }}"])
+def test_malformed_templates_are_rejected(source):
+    with pytest.raises(TemplateError):
+        Template(source)
+
+
+def test_report_paths_do_not_collide_after_sanitising():
+    tenants = ["a/b", "a_b", "a:b", "..", "."]
+    paths = [report_path("out", tenant) for tenant in tenants]
+    assert len(set(paths)) == len(tenants)
+    assert all(os.path.dirname(path) == "out" for path in paths)
+    assert os.path.basename(paths[0]).startswith("adk_ecommerce_demo_a_b_")
+    assert report_path("out", "a/b") == paths[0]
+
+
+def test_render_batch_writes_one_file_per_tenant(tmp_path):
+    reports = [(tenant, workflow_results(tenant)) for tenant in ("a/b", "a_b")]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        paths = render_batch(reports, str(tmp_path), executor=pool)
+    assert len(set(paths.values())) == 2
+    for tenant, path in paths.items():
+        with open(path, encoding="utf-8") as f:
+            assert f"wf-{tenant}" in f.read()
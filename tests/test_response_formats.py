@@ -0,0 +1,64 @@
+# test_response_formats.py - Accept/?format= negotiation and the payload encoders
+
+import json
+
+import numpy as np
+import pytest
+
+from response_formats import (available_formats, encode_compact_json, encode_json, encode_payload,
+                              negotiate, pack_msgpack)
+
+PAYLOAD = {"total_sales": 1234.5, "transactions": 17, "label": "sales",
+           "daily_sales": np.array([10.5, 20.25, 30.0]), "orders": np.array([1, 2, 3]),
+           "nested": {"ok": True, "none": None, "big": 2 ** 40, "neg": -300}}
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", "json"),
+    ("*/*", "json"),
+    ("application/json", "json"),
+    ("application/msgpack", "msgpack"),
+    ("application/x-msgpack", "msgpack"),
+    ("text/html, application/msgpack;q=0.9, */*;q=0.1", "msgpack"),
+    ("application/json;q=0.5, application/msgpack", "msgpack"),
+    ("application/msgpack;q=0, application/json", "json"),
+    ("text/html,application/xhtml+xml,*/*;q=0.8", "json"),
+])
+def test_accept_header_selects_format(accept, expected):
+    assert negotiate("", accept) == expected
+
+
+@pytest.mark.parametrize("accept", ["text/html", "text/html, application/xml;q=0.9", "image/png"])
+def test_accept_without_a_supported_type_is_not_acceptable(accept):
+    # The API answers None with 406 and the available formats
+    assert negotiate("", accept) is None
+
+
+def test_format_parameter_overrides_accept():
+    assert negotiate("compact", "application/msgpack") == "compact"
+    assert negotiate("xml", "") is None
+    assert {"json", "compact", "msgpack"} <= set(available_formats())
+
+
+def test_json_encoders_agree():
+    pretty, compact = json.loads(encode_json(PAYLOAD)), json.loads(encode_compact_json(PAYLOAD))
+    assert pretty == compact
+    assert compact["daily_sales"] == [10.5, 20.25, 30.0]
+    assert len(encode_compact_json(PAYLOAD)) < len(encode_json(PAYLOAD))
+
+
+def test_builtin_msgpack_matches_the_reference_decoder():
+    msgpack = pytest.importorskip("msgpack")
+    decoded = msgpack.unpackb(pack_msgpack(PAYLOAD))
+    assert decoded == json.loads(encode_compact_json(PAYLOAD))
+    assert msgpack.unpackb(encode_payload(PAYLOAD, "msgpack")) == decoded
+
+
+def test_arrow_stream_holds_columns_and_metadata():
+    pa = pytest.importorskip("pyarrow")
+    assert negotiate("", "application/vnd.apache.arrow.stream") == "arrow"
+    table = pa.ipc.open_stream(encode_payload(PAYLOAD, "arrow")).read_all()
+    assert table.column("daily_sales").to_pylist() == [10.5, 20.25, 30.0]
+    assert table.column("orders").to_pylist() == [1, 2, 3]
+    rest = json.loads(table.schema.metadata[b"payload"])
+    assert rest["total_sales"] == 1234.5 and rest["nested"]["big"] == 2 ** 40
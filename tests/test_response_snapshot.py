@@ -0,0 +1,122 @@
+# test_response_snapshot.py - ETag / If-None-Match, gzip negotiation and snapshot publishing
+
+import asyncio
+import gzip
+import json
+import os
+
+import pytest
+
+from async_http_server import HTTPRequest
+from live_data_api import AsyncDataAPI
+from response_snapshot import EncodedResponse, ResponseSnapshot, SnapshotFile, conditional_response
+
+
+def build(path):
+    return 200, {"path": path, "values": [1, 2, 3]}
+
+
+@pytest.fixture
+def entry():
+    return EncodedResponse(200, b'{"total_sales": 10}')
+
+
+def test_plain_response_carries_etag(entry):
+    status, headers, body = conditional_response(entry)
+    headers = dict(headers)
+    assert status == 200 and body == entry.body
+    assert headers["ETag"] == entry.etag and "Content-Encoding" not in headers
+    assert headers["Vary"] == "Accept, Accept-Encoding"
+
+
+@pytest.mark.parametrize("if_none_match", [
+    lambda etag: etag, lambda etag: "W/" + etag, lambda etag: etag[:-1] + '-gz"',
+    lambda etag: '"other", ' + etag, lambda etag: "*",
+])
+def test_matching_etag_gets_304_without_body(entry, if_none_match):
+    status, headers, body = conditional_response(entry, if_none_match(entry.etag))
+    assert status == 304 and body == b""
+    assert "Content-Type" not in dict(headers)
+
+
+def test_stale_etag_gets_the_body(entry):
+    status, _, body = conditional_response(entry, '"stale"')
+    assert status == 200 and body == entry.body
+
+
+@pytest.mark.parametrize("accept_encoding, gzipped", [
+    ("gzip", True), ("gzip, deflate, br", True), ("*", True), ("br;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False), ("identity", False), ("", False),
+])
+def test_gzip_is_served_only_when_accepted(entry, accept_encoding, gzipped):
+    _, headers, body = conditional_response(entry, accept_encoding=accept_encoding)
+    headers = dict(headers)
+    assert (headers.get("Content-Encoding") == "gzip") is gzipped
+    assert headers["ETag"].endswith('-gz"') is gzipped
+    assert (gzip.decompress(body) if gzipped else body) == entry.body
+
+
+def test_snapshot_encodes_every_format_from_one_build():
+    snapshot = ResponseSnapshot(build, ["/sales", "/all"], formats=["json", "compact"])
+    snapshot.refresh()
+    pretty, compact = snapshot.get("/all", "json"), snapshot.get("/all", "compact")
+    assert json.loads(pretty.body) == json.loads(compact.body) == {"path": "/all", "values": [1, 2, 3]}
+    assert pretty.etag != compact.etag
+    assert snapshot.get("/missing") is None
+
+    # Unchanged payloads keep their ETag across refreshes
+    etag = pretty.etag
+    snapshot.refresh()
+    assert snapshot.get("/all", "json").etag == etag
+
+
+def test_failed_refresh_keeps_serving_the_previous_snapshot():
+    calls = []
+
+    def flaky(path):
+        calls.append(path)
+        if len(calls) > 1:
+            raise RuntimeError("store unavailable")
+        return build(path)
+
+    snapshot = ResponseSnapshot(flaky, ["/sales"], interval=0)
+    snapshot.refresh()
+    assert snapshot.refresh_if_due() is False
+    assert snapshot.refresh_errors == 1
+    assert json.loads(snapshot.get("/sales").body)["path"] == "/sales"
+
+
+def test_snapshot_file_reloads_when_replaced(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    snapshot = ResponseSnapshot(build, ["/sales"])
+    snapshot.refresh()
+    snapshot.save(path)
+
+    reader = SnapshotFile(path, check_interval=0)
+    assert reader.get("/sales").etag == snapshot.get("/sales").etag
+
+    snapshot.build = lambda p: (200, {"path": p, "values": []})
+    snapshot.refresh()
+    snapshot.save(path)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+    assert reader.get("/sales").etag == snapshot.get("/sales").etag
+    assert [name for name in os.listdir(tmp_path)] == ["snapshot.bin"]
+
+
+def test_async_api_answers_conditional_requests_from_the_snapshot():
+    snapshot = ResponseSnapshot(build, ["/sales"])
+    snapshot.refresh()
+    api = AsyncDataAPI(workers=1, snapshot=snapshot)
+
+    def get(headers):
+        return asyncio.run(api.handle(HTTPRequest("GET", "/sales", "HTTP/1.1", headers)))
+
+    try:
+        first = get({"accept-encoding": "gzip"})
+        etag = dict(first.headers)["ETag"]
+        assert first.status == 200 and gzip.decompress(first.body) == snapshot.get("/sales").body
+        again = get({"accept-encoding": "gzip", "if-none-match": etag})
+        assert again.status == 304 and again.body == b""
+        assert get({"accept": "text/html"}).status == 406
+    finally:
+        api.pool.shutdown()
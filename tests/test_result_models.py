@@ -0,0 +1,103 @@
+# test_result_models.py - Slotted stage results: mapping view, to_plain/JSON and pickling round-trips
+
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from result_models import (KEY_OPPORTUNITIES, BusinessInsights, CustomerIntelligence, ImpactInterval,
+                           PricingStrategy, RecommendationTable, SalesAnalysis, SegmentTable,
+                           WorkflowMetadata, WorkflowResult, stored_fields, to_plain)
+from tracing import MetricsRegistry, Tracer
+
+CREATED = 1_700_000_000.0
+
+
+def sales():
+    return SalesAnalysis(total_sales=1500.0, transactions=12, top_categories=["books", "games"],
+                         daily_sales=np.array([500.0, 1000.0]), created=CREATED)
+
+
+def customers(centroids=None):
+    table = SegmentTable(["premium", "budget"], [[2, 500.0, 90.0, 1000.0], [10, 50.0, 60.0, 500.0]],
+                         ["High value", "Price sensitive"])
+    return CustomerIntelligence(table, churn_risk_percentage=25.0, overall_retention=75.0,
+                                revenue_base=1500.0, centroids=centroids,
+                                inertia=None if centroids is None else 1.5, created=CREATED)
+
+
+def pricing():
+    actions = [{"category": "books", "segment": "premium", "adjustment": 0.05, "elasticity": -0.6,
+                "revenue_delta": np.float64(42.0)}]
+    interval = ImpactInterval(0.01, 0.03, 0.05, 0.03, 0.97, 20000, seed=7)
+    return PricingStrategy(RecommendationTable.from_actions(actions), interval,
+                           {"books": -0.6, "games": -1.4}, combinations_evaluated=82, created=CREATED)
+
+
+def workflow_result():
+    tracer = Tracer(metrics=MetricsRegistry())
+    with tracer.span("sales", input_bytes=10):
+        pass
+    tracer.finish()
+    strategy = pricing()
+    metadata = WorkflowMetadata("wf-1", CREATED, "default", ["sales"], 0.25, tracer.summary(),
+                                ("data", "pricing"), tools_only=True)
+    insights = BusinessInsights(1500.0, strategy.total_expected_revenue_impact,
+                                strategy.revenue_impact_interval, 2, len(strategy.recommendations),
+                                created=CREATED)
+    return WorkflowResult(metadata, sales(), customers(), strategy, insights, {"extra": {"n": np.int64(3)}})
+
+
+@pytest.mark.parametrize("make", [sales, customers, lambda: customers([{"spend": 1.0}]), pricing,
+                                  workflow_result])
+def test_models_round_trip_through_plain_json(make):
+    model = make()
+    plain = to_plain(model)
+    assert json.loads(json.dumps(plain)) == plain
+    assert json.loads(model.to_json()) == plain
+    assert model == plain
+    assert list(plain) == list(model.keys())
+
+
+@pytest.mark.parametrize("make", [sales, customers, pricing, workflow_result])
+def test_models_pickle_to_equal_values(make):
+    model = make()
+    assert pickle.loads(pickle.dumps(model)).to_dict() == model.to_dict()
+
+
+def test_models_are_slotted():
+    for model in (sales(), customers(), pricing(), workflow_result()):
+        assert not hasattr(model, "__dict__")
+        assert "created" in stored_fields(type(model)) or isinstance(model, WorkflowResult)
+    with pytest.raises(AttributeError):
+        sales().unexpected = 1
+
+
+def test_derived_keys_match_the_old_dict_shape():
+    result = workflow_result().to_dict()
+    assert result["sales_analysis"]["avg_order_value"] == 125.0
+    assert result["sales_analysis"]["daily_sales"] == [500.0, 1000.0]
+    assert result["customer_intelligence"]["segments"]["budget"] == {
+        "count": 10, "avg_value": 50.0, "characteristics": "Price sensitive",
+        "retention_rate": 60.0, "revenue": 500.0}
+    assert "centroids" not in result["customer_intelligence"]
+    assert result["pricing_strategy"]["recommendations"] == [{
+        "action": "increase_price", "category": "books", "segment": "premium", "adjustment": "+5%",
+        "reason": "Premium demand is inelastic (elasticity -0.60)", "expected_impact": "+$42 revenue",
+        "revenue_delta": 42.0}]
+    assert result["pricing_strategy"]["total_expected_revenue_impact"] == "+3.0%"
+    assert result["workflow_metadata"]["trace"]["spans"][0]["input_bytes"] == 10
+    assert result["performance_metrics"] == {
+        "total_revenue_analyzed": 1500.0, "customers_segmented": 12, "pricing_recommendations": 1,
+        "business_opportunities": len(KEY_OPPORTUNITIES)}
+    assert result["additional_analyses"] == {"extra": {"n": 3}}
+
+
+def test_unknown_keys_raise_key_error():
+    model = customers()
+    with pytest.raises(KeyError):
+        model["centroids"]
+    assert model.get("centroids", "absent") == "absent"
+    with pytest.raises(KeyError):
+        model["segments"]["vip"]
@@ -0,0 +1,73 @@
+# test_revenue_monte_carlo.py - Seeded reproducibility and action screening of the revenue Monte Carlo
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from revenue_monte_carlo import (SCREEN_STREAM, build_model, recommend_actions, run_monte_carlo,
+                                 screen_actions, simulate_batch, subset_model)
+
+CATEGORIES = ["books", "games"]
+REVENUE = np.array([10000.0, 5000.0])
+DEMAND_SD = np.array([0.05, 0.1])
+
+
+def candidate_actions():
+    return [
+        # Inelastic demand: a price rise gains revenue
+        {"category": "books", "base_revenue": 6000.0, "adjustment": 0.1, "elasticity": -0.5,
+         "elasticity_sd": 0.1},
+        # Very elastic demand: the same rise loses revenue
+        {"category": "games", "base_revenue": 5000.0, "adjustment": 0.1, "elasticity": -3.5,
+         "elasticity_sd": 0.1},
+    ]
+
+
+def model():
+    return build_model(candidate_actions(), CATEGORIES, REVENUE, DEMAND_SD, churn_rate=0.1)
+
+
+def test_same_seed_gives_identical_results():
+    first = run_monte_carlo(model(), trials=5000, seed=42)
+    assert run_monte_carlo(model(), trials=5000, seed=42) == first
+    assert run_monte_carlo(model(), trials=5000, seed=43) != first
+    assert first["seed"] == 42 and first["trials"] == 5000
+
+
+def test_results_do_not_depend_on_workers():
+    serial = run_monte_carlo(model(), trials=10000, seed=7, chunk_trials=1000)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        pooled = run_monte_carlo(model(), trials=10000, seed=7, chunk_trials=1000, executor=pool)
+    assert pooled == serial
+
+
+def test_unseeded_runs_report_a_reproducible_seed():
+    result = run_monte_carlo(model(), trials=2000)
+    assert run_monte_carlo(model(), trials=2000, seed=result["seed"]) == result
+
+
+def test_recommend_actions_is_reproducible_and_screens_losers():
+    args = (candidate_actions(), CATEGORIES, REVENUE, DEMAND_SD, 0.1)
+    actions, impact = recommend_actions(*args, trials=5000, seed=11)
+    assert recommend_actions(*args, trials=5000, seed=11) == (actions, impact)
+    assert [action["category"] for action in actions] == ["books"]
+    assert impact["p50"] > 0
+
+
+def test_screen_uses_its_own_stream():
+    # The screen draws from child stream SCREEN_STREAM, not the reported samples' root
+    screen_rng = np.random.default_rng(np.random.SeedSequence([11, SCREEN_STREAM]))
+    report_rng = np.random.default_rng(np.random.SeedSequence(11).spawn(1)[0])
+    assert not np.array_equal(simulate_batch(model(), screen_rng, 100),
+                              simulate_batch(model(), report_rng, 100))
+    # Screening first leaves the reported interval unchanged
+    kept = subset_model(model(), screen_actions(model(), seed=11))
+    assert run_monte_carlo(kept, trials=5000, seed=11) == recommend_actions(
+        candidate_actions(), CATEGORIES, REVENUE, DEMAND_SD, 0.1, trials=5000, seed=11)[1]
+
+
+def test_no_actions_reports_no_change():
+    losers = candidate_actions()[1:]
+    actions, impact = recommend_actions(losers, CATEGORIES, REVENUE, DEMAND_SD, 0.1, trials=1000, seed=3)
+    assert actions == []
+    assert impact["p50"] == 0.0 and impact["trials"] == 0
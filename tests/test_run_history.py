@@ -0,0 +1,143 @@
+# test_run_history.py - Recording, indexed queries, comparisons and concurrent use of the run history
+
+import os
+import sqlite3
+import threading
+from multiprocessing import get_context
+
+import pytest
+
+from run_history import RunHistory, default_history_path, new_run_id
+
+DAY = 86400
+T0 = 1_700_000_000.0
+
+
+def result(tenant="acme", started=T0, total_sales=1000.0, run_id=None, premium=10):
+    return {
+        "sales_analysis": {"total_sales": total_sales, "transactions": 10, "avg_order_value": total_sales / 10},
+        "customer_intelligence": {"churn_risk_percentage": 20.0, "overall_retention": 60.0,
+                                  "segments": {"premium": {"count": premium, "revenue": 500.0}}},
+        "pricing_strategy": {"recommendations": [{"category": "Books"}],
+                             "revenue_impact_interval": {"p5": -0.01, "p50": 0.02, "p95": 0.05,
+                                                         "probability_positive": 0.8}},
+        "workflow_metadata": {"tenant_id": tenant, "started": started, "execution_time_seconds": 0.25,
+                              "workflow_id": run_id or new_run_id(started)},
+    }
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def test_record_and_get_round_trip(history):
+    stored = result()
+    run_id = history.record(stored)
+    assert len(history) == 1
+    assert history.get(run_id) == stored
+    assert history.get("missing") is None
+    metrics = history.metrics(run_id)
+    assert metrics["total_sales"] == 1000.0 and metrics["segment.premium.count"] == 10
+    assert metrics["revenue_impact.p50"] == 0.02 and metrics["pricing_recommendations"] == 1
+
+
+def test_record_many_is_one_transaction(history):
+    run_ids = history.record_many([result(started=T0 + i) for i in range(5)])
+    assert len(set(run_ids)) == 5 and len(history) == 5
+    with pytest.raises(sqlite3.IntegrityError):
+        history.record_many([result(run_id="dup"), result(run_id="dup")])
+    assert len(history) == 5
+
+
+def test_failed_tenant_is_recorded_without_metrics(history):
+    run_id = history.record({"tenant_id": "broken", "status": "error", "error": "boom"})
+    [run] = history.runs("broken")
+    assert run["run_id"] == run_id and run["status"] == "error"
+    assert history.metrics(run_id) == {} and history.get(run_id) is None
+
+
+def test_runs_filter_by_tenant_and_time_newest_first(history):
+    history.record_many([result("acme", T0), result("acme", T0 + DAY), result("globex", T0 + 2 * DAY)])
+    assert [run["tenant_id"] for run in history.runs()] == ["globex", "acme", "acme"]
+    assert [run["started"] for run in history.runs("acme")] == [T0 + DAY, T0]
+    assert [run["started"] for run in history.runs(start=T0 + 1, end=T0 + DAY)] == [T0 + DAY]
+    assert len(history.runs(limit=1)) == 1
+    assert history.metric_series("total_sales", "acme", min_value=0)[0][0] == T0
+    assert history.top("total_sales", limit=1)[0][1] in ("acme", "globex")
+
+
+def test_compare_against_a_run_at_least_days_earlier(history):
+    history.record_many([result(started=T0, total_sales=800.0),
+                         result(started=T0 + 3 * DAY, total_sales=900.0),
+                         result(started=T0 + 8 * DAY, total_sales=1000.0)])
+    report = history.compare("acme", days=7)
+    assert report["current"]["started"] == T0 + 8 * DAY
+    assert report["previous"]["started"] == T0
+    assert report["metrics"]["total_sales"] == {"current": 1000.0, "previous": 800.0, "change": 0.25}
+
+    recent = history.compare("acme", days=30)
+    assert recent["previous"] is None and recent["metrics"]["total_sales"]["change"] is None
+    assert history.compare("nobody") is None
+
+
+def test_prune_removes_old_runs_and_their_metrics(history):
+    old, new = history.record_many([result(started=T0), result(started=T0 + DAY)])
+    assert history.prune(T0 + 1) == 1
+    assert history.metrics(old) == {} and history.metrics(new)
+
+
+def test_threads_write_and_read_concurrently(history):
+    errors = []
+
+    def writer(tenant):
+        try:
+            for i in range(20):
+                history.record(result(tenant, T0 + i))
+                history.runs(tenant)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(f"t{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and len(history) == 80
+    assert history._connect().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def _write_runs(path, tenant):
+    history = RunHistory(path)
+    history.record_many([result(tenant, T0 + i) for i in range(10)])
+    history.close()
+
+
+def test_processes_share_one_database(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    RunHistory(path).close()
+    context = get_context("spawn")
+    processes = [context.Process(target=_write_runs, args=(path, f"p{i}")) for i in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    history = RunHistory(path)
+    assert len(history) == 30 and {run["tenant_id"] for run in history.runs(limit=None)} == {"p0", "p1", "p2"}
+    history.close()
+
+
+def test_default_path_is_outside_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv("ADK_RUN_HISTORY", raising=False)
+    monkeypatch.setenv("XDG_DATA_HOME", str(tmp_path / "data"))
+    monkeypatch.chdir(tmp_path)
+    history = RunHistory()
+    history.close()
+    assert history.path == str(tmp_path / "data" / "adk-analytics" / "run_history.sqlite")
+    assert os.path.exists(history.path) and not any(name.endswith(".sqlite") for name in os.listdir(tmp_path))
+
+    monkeypatch.setenv("ADK_RUN_HISTORY", str(tmp_path / "explicit.sqlite"))
+    assert default_history_path() == str(tmp_path / "explicit.sqlite")
@@ -0,0 +1,111 @@
+# test_sales_query.py - Range parsing, bucketing and cursor paging for /sales history
+
+import base64
+
+import numpy as np
+import pytest
+
+from order_store import SECONDS_PER_DAY, OrderEventStore
+from sales_query import (MAX_TIME, MIN_TIME, QueryError, decode_cursor, encode_cursor, parse_time,
+                         resolve_range, sales_history)
+
+DAY = 20000
+START = DAY * SECONDS_PER_DAY
+
+
+@pytest.fixture
+def store():
+    # Ten days with one order every six hours, each worth (day + 1) * 10
+    store = OrderEventStore()
+    timestamps = START + np.arange(40) * 6 * 3600
+    amounts = (np.arange(40) // 4 + 1) * 10.0
+    store.append_batch(timestamps, np.arange(40), np.arange(40) % 7, ["Books"] * 40, amounts)
+    return store
+
+
+def query(**params):
+    return {name: [str(value)] for name, value in params.items()}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1728000000", 1728000000),
+    ("1728000000.9", 1728000000),
+    ("2024-10-04", 1728000000),
+    ("2024-10-04T00:00:00Z", 1728000000),
+    ("2024-10-04T02:00:00+02:00", 1728000000),
+])
+def test_parse_time_accepts_epoch_and_iso(value, expected):
+    assert parse_time(value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "yesterday", "", "nan", "inf", "-inf", "1e300", "-1e18", str(MAX_TIME + 1), str(MIN_TIME - 1),
+    "10000-01-01",
+])
+def test_parse_time_rejects_bad_and_out_of_range_values(value):
+    with pytest.raises(QueryError):
+        parse_time(value)
+
+
+def test_range_is_widened_to_whole_buckets():
+    granularity, start, end, origin = resolve_range(
+        query(**{"from": START + 3600, "to": START + 2 * SECONDS_PER_DAY + 1, "granularity": "day"}))
+    assert (granularity, start, end, origin) == ("day", START, START + 3 * SECONDS_PER_DAY, START)
+
+
+def test_default_range_ends_now():
+    now = START + 5 * SECONDS_PER_DAY
+    granularity, start, end, _ = resolve_range({}, now=now)
+    assert granularity == "day"
+    assert (start, end) == (now - 30 * SECONDS_PER_DAY, now)
+
+
+@pytest.mark.parametrize("params", [
+    {"granularity": "month"},
+    {"from": START + 10, "to": START},
+    {"to": MAX_TIME},
+    {"from": "-1e18", "to": START},
+    {"cursor": "not-a-cursor"},
+    {"limit": "ten", "from": START, "to": START + SECONDS_PER_DAY},
+])
+def test_invalid_queries_raise_query_error(store, params):
+    with pytest.raises(QueryError):
+        sales_history(store, query(**params))
+
+
+def test_cursor_round_trip_and_validation():
+    cursor = encode_cursor("hour", START + 3600, START + 7200, START)
+    assert decode_cursor(cursor) == ("hour", START + 3600, START + 7200, START)
+
+    # Three-part cursors from before the range start was carried still decode
+    legacy = base64.urlsafe_b64encode(f"day:{START}:{START + SECONDS_PER_DAY}".encode()).decode()
+    assert decode_cursor(legacy) == ("day", START, START + SECONDS_PER_DAY, START)
+
+    for token in ("week:5:5:0", "year:0:10:0", f"day:{START}:{START + 10}:{START + 5}",
+                  f"day:0:{MAX_TIME + 1}:0", "foo"):
+        with pytest.raises(QueryError):
+            decode_cursor(base64.urlsafe_b64encode(token.encode()).decode())
+
+
+def test_pages_cover_the_range_and_keep_its_start(store):
+    params = query(**{"from": START, "to": START + 10 * SECONDS_PER_DAY, "granularity": "day", "limit": 4})
+    pages = [sales_history(store, params)]
+    while pages[-1]["page"]["next_cursor"]:
+        pages.append(sales_history(store, query(cursor=pages[-1]["page"]["next_cursor"], limit=4)))
+
+    assert [page["page"]["buckets"] for page in pages] == [4, 4, 2]
+    assert {page["from"] for page in pages} == {"2024-10-04T00:00:00Z"}
+    assert {page["to"] for page in pages} == {"2024-10-14T00:00:00Z"}
+    assert pages[1]["page"]["from"] == pages[0]["page"]["to"]
+    sales = np.concatenate([page["sales"] for page in pages])
+    np.testing.assert_allclose(sales, np.arange(1, 11) * 40.0)
+    assert sum(page["transactions"] for page in pages) == 40
+
+
+def test_cursor_granularity_must_match(store):
+    first = sales_history(store, query(**{"from": START, "to": START + 2 * SECONDS_PER_DAY,
+                                          "granularity": "hour", "limit": 24}))
+    assert first["page"]["buckets"] == 24
+    assert first["orders"].sum() == 4
+    with pytest.raises(QueryError):
+        sales_history(store, query(cursor=first["page"]["next_cursor"], granularity="day"))
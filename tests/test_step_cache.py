@@ -0,0 +1,91 @@
+# test_step_cache.py - Step result cache: fingerprints, TTL, LRU and byte-budget eviction
+
+import asyncio
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from step_cache import StepCache, fingerprint
+from workflow_dag import WorkflowDAG
+
+
+def entry_size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_fingerprint_ignores_volatile_keys_and_key_order():
+    a = {"total": 1.5, "daily": np.arange(3.0), "timestamp": "now"}
+    b = {"timestamp": "later", "daily": np.arange(3.0), "total": 1.5}
+    assert fingerprint(a) == fingerprint(b)
+    assert fingerprint(a) != fingerprint({**a, "daily": np.arange(3)})
+    assert fingerprint([1, 2]) != fingerprint([2, 1])
+
+
+def test_hit_and_miss_are_counted():
+    cache = StepCache()
+    assert cache.get("k") is StepCache.MISS
+    cache.put("k", {"value": 1})
+    assert cache.get("k") == {"value": 1}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_entries_are_dropped():
+    cache = StepCache(ttl_seconds=300)
+    cache.put("stale", "x", ttl_seconds=-1)
+    cache.put("fresh", "y")
+    assert cache.get("stale") is StepCache.MISS
+    assert cache.get("fresh") == "y"
+    assert len(cache) == 1 and cache.size_bytes == entry_size("y")
+
+
+def test_least_recently_used_entry_is_evicted_over_budget():
+    value = "v" * 100
+    cache = StepCache(max_bytes=2 * entry_size(value))
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.get("a")  # b is now least recently used
+    cache.put("c", value)
+    assert cache.get("b") is StepCache.MISS
+    assert cache.get("a") == value and cache.get("c") == value
+    assert cache.size_bytes == 2 * entry_size(value)
+
+
+def test_values_larger_than_the_budget_are_not_cached():
+    cache = StepCache(max_bytes=64)
+    cache.put("big", "x" * 1000)
+    assert len(cache) == 0 and cache.size_bytes == 0
+
+
+def test_unpicklable_values_are_skipped():
+    cache = StepCache()
+    cache.put("lock", {"lock": threading.Lock()})
+    cache.put("lambda", lambda: None)
+    assert len(cache) == 0 and cache.size_bytes == 0
+
+
+def test_workflow_runs_steps_with_unpicklable_results_and_uncacheable_steps():
+    calls = []
+
+    def handle():
+        calls.append("handle")
+        return {"lock": threading.Lock()}
+
+    def notify():
+        calls.append("notify")
+        return "sent"
+
+    def run_once(pool, cache):
+        dag = WorkflowDAG(pool, cache=cache)
+        dag.add_step("handle", handle)
+        dag.add_step("notify", notify, cacheable=False)
+        dag.add_step("total", lambda: 42)
+        asyncio.run(dag.run())
+        return dag.cache_hits
+
+    cache = StepCache()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert run_once(pool, cache) == set()
+        assert run_once(pool, cache) == {"total"}
+    assert calls.count("handle") == 2 and calls.count("notify") == 2
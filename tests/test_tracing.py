@@ -0,0 +1,91 @@
+# test_tracing.py - Step and tool spans, and the Prometheus series behind /metrics
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from async_http_server import HTTPRequest
+from live_data_api import AsyncDataAPI
+from tracing import LATENCY_BUCKETS, METRICS, PROMETHEUS_CONTENT_TYPE, MetricsRegistry, Tracer, tool_span
+from workflow_dag import WorkflowDAG
+
+
+def load(tenant_id):
+    with tool_span("read_store", tenant=tenant_id):
+        return [1, 2, 3]
+
+
+def total(rows):
+    return sum(rows)
+
+
+def run_workflow(tracer):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dag = WorkflowDAG(thread_pool=pool, tracer=tracer)
+        dag.add_step("load", load, tenant_id="t1")
+        dag.add_step("total", total, inputs={"rows": "load"})
+        results = asyncio.run(dag.run())
+    tracer.finish()
+    return results
+
+
+def bucket_counts(text, metric, **labels):
+    selector = "".join(f'{name}="{value}",' for name, value in labels.items())
+    return [int(count) for count in re.findall(rf'^{metric}_bucket\{{{selector}le="[^"]+"\}} (\d+)$',
+                                               text, re.M)]
+
+
+def test_spans_nest_tool_calls_under_their_step():
+    tracer = Tracer(metrics=MetricsRegistry())
+    assert run_workflow(tracer)["total"] == 6
+    summary = tracer.summary()
+    rows = {row["name"]: row for row in summary["spans"]}
+    assert set(rows) == {"load", "read_store", "total"}
+    assert rows["read_store"]["kind"] == "tool" and rows["read_store"]["parent"] == "load"
+    assert rows["total"]["kind"] == "step" and rows["total"]["parent"] is None
+
+
+def test_metrics_expose_a_latency_histogram_per_step():
+    registry = MetricsRegistry()
+    run_workflow(Tracer("demo", metrics=registry))
+    text = registry.render()
+    for kind, name in (("step", "load"), ("step", "total"), ("tool", "read_store")):
+        counts = bucket_counts(text, "adk_span_duration_seconds", kind=kind, name=name)
+        assert len(counts) == len(LATENCY_BUCKETS) + 1
+        assert counts == sorted(counts) and counts[-1] == 1
+        assert f'adk_span_duration_seconds_count{{kind="{kind}",name="{name}"}} 1' in text
+    assert bucket_counts(text, "adk_workflow_duration_seconds", workflow="demo")[-1] == 1
+    assert 'adk_span_total{kind="step",name="load",cache="miss",status="ok"} 1.0' in text
+
+
+def test_failed_steps_are_counted_as_errors():
+    registry = MetricsRegistry()
+    tracer = Tracer(metrics=registry)
+    with pytest.raises(RuntimeError):
+        with tracer.span("broken"):
+            raise RuntimeError("boom")
+    assert 'adk_span_total{kind="step",name="broken",cache="none",status="error"} 1.0' in registry.render()
+
+
+def test_const_labels_prefix_every_series():
+    registry = MetricsRegistry(const_labels={"pid": "42"})
+    run_workflow(Tracer(metrics=registry))
+    assert bucket_counts(registry.render(), "adk_span_duration_seconds", pid="42", kind="step", name="load")
+
+
+def test_metrics_endpoint_serves_the_process_registry():
+    METRICS.reset()
+    run_workflow(Tracer())
+    api = AsyncDataAPI(workers=1)
+    try:
+        response = asyncio.run(api.handle(HTTPRequest("GET", "/metrics", "HTTP/1.1", {})))
+    finally:
+        api.pool.shutdown()
+        METRICS.reset()
+    assert response.status == 200
+    assert dict(response.headers)["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+    text = response.body.decode()
+    for name in ("load", "total"):
+        assert bucket_counts(text, "adk_span_duration_seconds", kind="step", name=name)[-1] == 1
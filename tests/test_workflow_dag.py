@@ -0,0 +1,92 @@
+# test_workflow_dag.py - Dependency ordering, concurrency and failure handling of the step scheduler
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from workflow_dag import WorkflowDAG
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+def test_steps_run_after_their_dependencies(pool):
+    order = []
+
+    def step(label, **inputs):
+        order.append(label)
+        return {"label": label, "total": sum(value["total"] for value in inputs.values()) + 1}
+
+    dag = WorkflowDAG(pool)
+    # Added out of order on purpose
+    dag.add_step("report", step, inputs={"a": "left", "b": "right"}, label="report")
+    dag.add_step("left", step, inputs={"source": "sales"}, label="left")
+    dag.add_step("right", step, inputs={"source": "sales"}, label="right")
+    dag.add_step("sales", step, label="sales")
+    results = asyncio.run(dag.run())
+
+    assert order[0] == "sales" and order[-1] == "report"
+    assert set(order[1:3]) == {"left", "right"}
+    assert results["report"]["total"] == 5
+
+
+def test_inputs_can_select_a_key_of_an_upstream_result(pool):
+    dag = WorkflowDAG(pool)
+    dag.add_step("sales", lambda: {"total_sales": 12.5, "transactions": 3})
+    dag.add_step("average", lambda total, count: total / count,
+                 inputs={"total": "sales.total_sales", "count": "sales.transactions"})
+    assert asyncio.run(dag.run())["average"] == pytest.approx(12.5 / 3)
+
+
+def test_independent_steps_run_concurrently(pool):
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_siblings():
+        # Only returns if all three steps are running at the same time
+        barrier.wait()
+        return True
+
+    dag = WorkflowDAG(pool)
+    for name in ("a", "b", "c"):
+        dag.add_step(name, wait_for_siblings)
+    started = time.perf_counter()
+    assert asyncio.run(dag.run()) == {"a": True, "b": True, "c": True}
+    assert time.perf_counter() - started < 5
+
+
+def test_failed_step_stops_its_dependents(pool):
+    ran = []
+
+    def fail():
+        raise RuntimeError("sales unavailable")
+
+    dag = WorkflowDAG(pool)
+    dag.add_step("sales", fail)
+    dag.add_step("segments", lambda sales: ran.append("segments"), inputs={"sales": "sales"})
+    dag.add_step("insights", lambda segments: ran.append("insights"), inputs={"segments": "segments"})
+    with pytest.raises(RuntimeError, match="sales unavailable"):
+        asyncio.run(dag.run())
+    assert ran == []
+
+
+def test_invalid_graphs_are_rejected(pool):
+    dag = WorkflowDAG(pool)
+    dag.add_step("a", lambda b: b, inputs={"b": "b"})
+    dag.add_step("b", lambda a: a, inputs={"a": "a"})
+    with pytest.raises(ValueError, match="cycle"):
+        dag.topological_order()
+
+    dag = WorkflowDAG(pool)
+    dag.add_step("a", lambda missing: missing, inputs={"missing": "missing"})
+    with pytest.raises(ValueError, match="unknown step"):
+        asyncio.run(dag.run())
+    with pytest.raises(ValueError, match="Duplicate"):
+        dag.add_step("a", lambda: None)
+    with pytest.raises(ValueError, match="executor"):
+        dag.add_step("b", lambda: None, executor="gpu")
@@ -0,0 +1,283 @@
+# tracing.py - Span tracing and Prometheus metrics for workflow steps
+# A Tracer records one span per workflow step (and any nested tool spans) with
+# monotonic timings, queue wait, payload sizes and cache hits. Finished spans
+# also feed process-wide counters and histograms rendered for /metrics.
+
+import bisect
+import contextvars
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from result_models import MISSING, RecommendationTable, ResultModel, TraceSummary, stored_fields
+
+# Histogram buckets (seconds) for step and workflow durations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_trace_ids = itertools.count(1)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+def payload_size(value: Any) -> int:
+    """Approximate serialized size of a result in bytes, without serializing it"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    if isinstance(value, (ResultModel, RecommendationTable)):
+        return sum(payload_size(getattr(value, name)) for name in stored_fields(type(value)))
+    return 8
+
+
+def timed_call(call) -> Tuple[int, Any]:
+    """Run call() and return (start time in ns, result); module-level so it pickles"""
+    return time.perf_counter_ns(), call()
+
+
+class Span:
+    """One timed unit of work within a trace"""
+
+    __slots__ = ("name", "kind", "trace", "parent", "start_ns", "end_ns", "queue_wait_ns",
+                 "attributes", "error")
+
+    def __init__(self, name: str, kind: str, trace: "Tracer", parent: Optional["Span"] = None):
+        self.name = name
+        self.kind = kind
+        self.trace = trace
+        self.parent = parent
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.queue_wait_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.end_ns = time.perf_counter_ns()
+        if error is not None:
+            self.error = type(error).__name__
+        self.trace._finished(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "parent": self.parent.name if self.parent else None,
+            "start_ms": round((self.start_ns - self.trace.start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ns / 1e6, 3),
+            "queue_wait_ms": round(self.queue_wait_ns / 1e6, 3),
+            **self.attributes,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class Tracer:
+    """Collects the spans of one workflow run"""
+
+    def __init__(self, name: str = "workflow", metrics: Optional["MetricsRegistry"] = None):
+        self.name = name
+        self.trace_id = f"{os.getpid():x}-{next(_trace_ids):x}"
+        self.metrics = metrics if metrics is not None else METRICS
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "step", **attributes) -> Iterator[Span]:
+        """Time a block as a span; nested tool spans attach to it via context"""
+        span = Span(name, kind, self, _current_span.get())
+        span.set(**attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        else:
+            span.finish()
+        finally:
+            _current_span.reset(token)
+
+    def _finished(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        self.metrics.observe_span(span)
+
+    def finish(self) -> float:
+        """Close the trace; returns total seconds"""
+        self.end_ns = time.perf_counter_ns()
+        seconds = (self.end_ns - self.start_ns) / 1e9
+        self.metrics.observe_workflow(self.name, seconds)
+        return seconds
+
+    def summary(self) -> TraceSummary:
+        """Spans in start order, as columns; its "spans" key gives Span.to_dict() rows"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        attribute_names = list(dict.fromkeys(key for span in spans for key in span.attributes))
+        attributes = np.empty((len(spans), len(attribute_names)), dtype=object)
+        for i, span in enumerate(spans):
+            attributes[i] = [span.attributes.get(key, MISSING) for key in attribute_names]
+        timings = np.array([(span.start_ns - self.start_ns, span.duration_ns, span.queue_wait_ns)
+                            for span in spans], dtype=np.float64).reshape(len(spans), 3)
+        return TraceSummary(
+            trace_id=self.trace_id,
+            duration_ms=round(((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6, 3),
+            names=[span.name for span in spans],
+            kinds=[span.kind for span in spans],
+            parents=[span.parent.name if span.parent else None for span in spans],
+            timings=(timings / 1e6).round(3),
+            attribute_names=attribute_names,
+            attributes=attributes,
+            errors=[span.error for span in spans],
+        )
+
+
+@contextmanager
+def tool_span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Child span of the step running in this context; a no-op outside a trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with parent.trace.span(name, kind="tool", **attributes) as span:
+        yield span
+
+
+# =============================================================================
+# PROMETHEUS METRICS
+# =============================================================================
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by label values
+
+    `const_labels` are added to every exported series, e.g. the worker pid when
+    each pre-forked process keeps its own registry and answers /metrics itself.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS,
+                 const_labels: Optional[Dict[str, str]] = None):
+        self.buckets = tuple(buckets)
+        self.const_labels = dict(const_labels or {})
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple[str, ...]], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+
+    def _observe(self, metric: str, labels: Tuple[str, ...], value: float):
+        key = (metric, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram(self.buckets)
+        histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def _add(self, metric: str, labels: Tuple[str, ...], value: float = 1.0):
+        key = (metric, labels)
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe_span(self, span: Span):
+        labels = (span.kind, span.name)
+        cache = {True: "hit", False: "miss"}.get(span.attributes.get("cache_hit"), "none")
+        with self._lock:
+            self._observe("adk_span_duration_seconds", labels, span.duration_ns / 1e9)
+            self._add("adk_span_total", labels + (cache, "error" if span.error else "ok"))
+            self._add("adk_span_queue_wait_seconds_total", labels, span.queue_wait_ns / 1e9)
+            self._add("adk_span_input_bytes_total", labels, span.attributes.get("input_bytes", 0))
+            self._add("adk_span_output_bytes_total", labels, span.attributes.get("output_bytes", 0))
+
+    def observe_workflow(self, name: str, seconds: float):
+        with self._lock:
+            self._observe("adk_workflow_duration_seconds", (name,), seconds)
+
+    def set_const_labels(self, **labels: str):
+        """Label every series from now on; counts observed so far are dropped"""
+        with self._lock:
+            self.const_labels = {name: str(value) for name, value in labels.items()}
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            const_names, const_values = tuple(self.const_labels), tuple(self.const_labels.values())
+            for metric, help_text, label_names in _HISTOGRAMS:
+                label_names = const_names + label_names
+                series = sorted((const_values + labels, h) for (name, labels), h
+                                in self._histograms.items() if name == metric)
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for labels, histogram in series:
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{metric}_bucket{_labels(label_names + ('le',), labels + (le,))} "
+                                     f"{cumulative}")
+                    lines.append(f"{metric}_sum{_labels(label_names, labels)} {histogram.sum!r}")
+                    lines.append(f"{metric}_count{_labels(label_names, labels)} {histogram.count}")
+            for metric, help_text, label_names in _COUNTERS:
+                label_names = const_names + label_names
+                series = sorted((const_values + labels, value) for (name, labels), value
+                                in self._counters.items() if name == metric)
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                for labels, value in series:
+                    lines.append(f"{metric}{_labels(label_names, labels)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+_HISTOGRAMS = (
+    ("adk_span_duration_seconds", "Wall time of workflow steps and tool calls.", ("kind", "name")),
+    ("adk_workflow_duration_seconds", "Wall time of complete workflow runs.", ("workflow",)),
+)
+_COUNTERS = (
+    ("adk_span_total", "Finished spans by cache use and outcome.", ("kind", "name", "cache", "status")),
+    ("adk_span_queue_wait_seconds_total", "Time steps spent waiting for an executor worker.",
+     ("kind", "name")),
+    ("adk_span_input_bytes_total", "Approximate bytes of step inputs.", ("kind", "name")),
+    ("adk_span_output_bytes_total", "Approximate bytes of step outputs.", ("kind", "name")),
+)
+
+# Process-wide registry behind /metrics
+METRICS = MetricsRegistry()
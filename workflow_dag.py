@@ -0,0 +1,177 @@
+# workflow_dag.py - Dependency-graph scheduler for the multi-agent workflow
+# Each step declares which upstream results it consumes; steps whose inputs are
+# ready run concurrently, with blocking tool functions pushed to an executor.
+# With a StepCache, a step whose inputs fingerprint identically is not re-run.
+# With a Tracer, every step is recorded as a span (see tracing.py).
+
+import asyncio
+import contextvars
+import functools
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor
+from typing import Dict, List, Any, Callable, Mapping, Optional, Set
+
+from step_cache import StepCache, fingerprint
+from tracing import Span, Tracer, payload_size, timed_call
+
+EXECUTOR_KINDS = ("inline", "thread", "process")
+
+
+class WorkflowStep:
+    """A named unit of work and the upstream results it needs
+
+    ``inputs`` maps a keyword argument of ``func`` to either a step name
+    ("sales") or a key inside that step's result ("sales.total_sales").
+    ``cache_key`` returns any outside state the result depends on (e.g. a data
+    version); ``cacheable=False`` always runs the step.
+    """
+
+    __slots__ = ("name", "func", "inputs", "kwargs", "executor", "cache_key", "cacheable")
+
+    def __init__(self, name: str, func: Callable, inputs: Optional[Mapping[str, str]] = None,
+                 executor: str = "thread", kwargs: Optional[Mapping[str, Any]] = None,
+                 cache_key: Optional[Callable[[], Any]] = None, cacheable: bool = True):
+        if executor not in EXECUTOR_KINDS:
+            raise ValueError(f"executor must be one of {EXECUTOR_KINDS}, got {executor!r}")
+        self.name = name
+        self.func = func
+        self.inputs = dict(inputs or {})
+        self.kwargs = dict(kwargs or {})
+        self.executor = executor
+        self.cache_key = cache_key
+        self.cacheable = cacheable
+
+    @property
+    def dependencies(self) -> List[str]:
+        return sorted({ref.split(".", 1)[0] for ref in self.inputs.values()})
+
+    def resolve_inputs(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        arguments = dict(self.kwargs)
+        for param, ref in self.inputs.items():
+            step, _, key = ref.partition(".")
+            arguments[param] = results[step][key] if key else results[step]
+        return arguments
+
+    def input_fingerprint(self, output_fingerprints: Dict[str, str]) -> str:
+        """Cache key from the step identity, static arguments and upstream outputs"""
+        return fingerprint([
+            self.name, f"{self.func.__module__}.{self.func.__qualname__}",
+            self.kwargs, sorted(self.inputs.items()),
+            [output_fingerprints[name] for name in self.dependencies],
+            self.cache_key() if self.cache_key else None,
+        ])
+
+
+class WorkflowDAG:
+    """Runs workflow steps as soon as their dependencies have finished"""
+
+    def __init__(self, thread_pool: Optional[Executor] = None,
+                 process_pool: Optional[Executor] = None,
+                 cache: Optional[StepCache] = None, tracer: Optional[Tracer] = None):
+        self.steps: Dict[str, WorkflowStep] = {}
+        self.cache = cache
+        self.tracer = tracer
+        self.cache_hits: Set[str] = set()
+        self._executors = {"thread": thread_pool, "process": process_pool}
+
+    def add(self, step: WorkflowStep) -> WorkflowStep:
+        if step.name in self.steps:
+            raise ValueError(f"Duplicate workflow step: {step.name}")
+        self.steps[step.name] = step
+        return step
+
+    def add_step(self, name: str, func: Callable, inputs: Optional[Mapping[str, str]] = None,
+                 executor: str = "thread", cache_key: Optional[Callable[[], Any]] = None,
+                 cacheable: bool = True, **kwargs) -> WorkflowStep:
+        return self.add(WorkflowStep(name, func, inputs, executor, kwargs, cache_key, cacheable))
+
+    def topological_order(self) -> List[str]:
+        """Validate the graph and return one valid execution order"""
+        order, state = [], {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Workflow cycle: {' -> '.join(path + [name])}")
+            if name not in self.steps:
+                raise ValueError(f"Step {path[-1]!r} depends on unknown step {name!r}")
+            state[name] = "visiting"
+            for dependency in self.steps[name].dependencies:
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.steps:
+            visit(name, [])
+        return order
+
+    async def _run_step(self, step: WorkflowStep, arguments: Dict[str, Any],
+                        span: Optional[Span] = None) -> Any:
+        call = functools.partial(step.func, **arguments)
+        if step.executor == "inline":
+            return call()
+        if step.executor == "process" and self._executors["process"] is None:
+            raise ValueError(f"Step {step.name!r} needs a process pool")
+        if step.executor == "thread":
+            # Carry the current span into the worker so tool spans nest under it
+            call = functools.partial(contextvars.copy_context().run, call)
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter_ns()
+        started, result = await loop.run_in_executor(self._executors[step.executor],
+                                                     functools.partial(timed_call, call))
+        if span is not None:
+            span.queue_wait_ns = max(started - submitted, 0)
+        return result
+
+    async def run(self, on_start: Optional[Callable[[str], None]] = None,
+                  on_complete: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+        """Execute every step; wall-clock time follows the critical path"""
+        self.topological_order()
+        results: Dict[str, Any] = {}
+        output_fingerprints: Dict[str, str] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(step: WorkflowStep):
+            if step.dependencies:
+                await asyncio.gather(*(tasks[name] for name in step.dependencies))
+            if on_start:
+                on_start(step.name)
+
+            with self.tracer.span(step.name, executor=step.executor) if self.tracer else nullcontext() as span:
+                use_cache = self.cache is not None and step.cacheable
+                cached = StepCache.MISS
+                if use_cache:
+                    key = step.input_fingerprint(output_fingerprints)
+                    cached = self.cache.get(key)
+                if cached is not StepCache.MISS:
+                    # Identical inputs: reuse the result and its fingerprint so
+                    # downstream steps hit the cache as well
+                    results[step.name], output_fingerprints[step.name] = cached
+                    self.cache_hits.add(step.name)
+                else:
+                    arguments = step.resolve_inputs(results)
+                    if span is not None:
+                        span.set(input_bytes=payload_size(arguments))
+                    results[step.name] = await self._run_step(step, arguments, span)
+                    if self.cache is not None:
+                        output_fingerprints[step.name] = fingerprint(results[step.name])
+                    if use_cache:
+                        self.cache.put(key, (results[step.name], output_fingerprints[step.name]))
+                if span is not None:
+                    span.set(cache_hit=cached is not StepCache.MISS,
+                             output_bytes=payload_size(results[step.name]))
+
+            if on_complete:
+                on_complete(step.name, results[step.name])
+
+        for name, step in self.steps.items():
+            tasks[name] = asyncio.ensure_future(execute(step))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        return results